@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+
+#==============================================================
+#
+# Authors:      Christine Smythe and Colin Smythe (Dunelm Services Limited)
+# Version:      1.0
+# Release Date: 1st November, 2013
+#
+# Description:  This Python3 module provides the adaptive speed used by the
+#               LED Counting Game when the player chooses an adaptive game.
+#
+#               Instead of one speed for the whole game the speed (the time the
+#               player has to choose a column) is set for each configuration
+#               from the player's latest results, kept in a RollingWindow:
+#
+#               - whilst the player gets at least CTARGETACCURACY of the latest
+#                 configurations right the speed is made CSTEP faster,
+#                 otherwise it is made CSTEP slower;
+#               - the speed is never less than CMARGIN times the player's
+#                 average time over the latest configurations, nor outside the
+#                 speeds the player can choose (200 to 5000 ms).
+#
+#               The window is updated in constant time so choosing the next
+#               speed takes no noticeable time between configurations.
+#
+# History:      Original release.
+#
+# Copyright:    2013 (c) Premier Farnell Limited
+#
+# License:      GPLv3+
+#
+#==============================================================
+
+from ledresultsv1p0p0 import RollingWindow
+
+#==============================================================
+# Declaration of Constants
+
+CMINSPEED = 200;            # fastest speed (ms)
+CMAXSPEED = 5000;           # slowest speed (ms)
+CWINDOW = 8;                # latest configurations the speed is worked out from
+CMINRESULTS = 3;            # results needed before the speed is changed
+CTARGETACCURACY = 0.8;      # fraction correct above which the speed is made faster
+CSTEP = 0.1;                # fraction the speed is changed by after each configuration
+CMARGIN = 1.25;             # the speed is at least this times the average time
+
+#==============================================================
+
+class AdaptiveSpeed(object):
+    """ Sets the speed of each configuration from the latest results. """
+
+    def __init__(self, speed, window = CWINDOW):
+        self.window = RollingWindow(window)
+        self.speed = speed
+
+    #.................... Method: add ................
+    # This method adds the result of a configuration and works out the
+    # speed of the next one.
+    # It is passed the following parameters:
+    #   - correct = 1 if the player was correct otherwise 0
+    #   - player_time = the player's time in ms, or None for a timeout
+    # It returns the speed (ms) for the next configuration.
+    #
+    def add(self, correct, player_time):
+        window = self.window
+        window.add(correct, player_time)
+        if window.count >= CMINRESULTS:
+            if window.accuracy() >= CTARGETACCURACY:
+                speed = self.speed * (1.0 - CSTEP)
+            else:
+                speed = self.speed * (1.0 + CSTEP)
+            mean_time = window.mean_time()
+            if mean_time is not None:
+                speed = max(speed, CMARGIN * mean_time)
+            self.speed = int(min(CMAXSPEED, max(CMINSPEED, speed)))
+        return self.speed
+
+    # ................. end of method: add .................
+
+#=================================================================
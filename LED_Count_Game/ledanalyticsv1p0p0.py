@@ -0,0 +1,272 @@
+#!/usr/bin/env python
+
+#==============================================================
+#
+# Authors:      Christine Smythe and Colin Smythe (Dunelm Services Limited)
+# Version:      1.0
+# Release Date: 1st November, 2013
+#
+# Description:  This Python3 module analyses the reaction times of all of the
+#               LED Counting Games kept in the game history.  It needs NumPy.
+#
+#               The trials of the sessions asked for are loaded into NumPy
+#               arrays (one array per column) and everything is worked out on
+#               whole arrays at once:
+#
+#               - the 50th, 90th and 99th percentile times of each player;
+#               - a histogram of the times;
+#               - the accuracy and average time at each speed played;
+#               - the learning curve of a player (accuracy and average time
+#                 from their first session to their latest).
+#
+#               Sessions are never changed once saved, so the arrays loaded
+#               are kept for the range of sessions they cover and only newer
+#               sessions are loaded when the analysis is asked for again.  The
+#               reports are also kept for each range of sessions so showing
+#               the same report again is instant.
+#
+#               Usage:  python3 ledanalyticsv1p0p0.py [player]
+#                       prints the report for all players or just one
+#
+# History:      Original release.
+#
+# Copyright:    2013 (c) Premier Farnell Limited
+#
+# License:      GPLv3+
+#
+#==============================================================
+
+import sys
+from collections import namedtuple
+from itertools import chain
+from time import strftime, localtime
+import numpy as np
+
+#==============================================================
+# Declaration of Constants
+
+CPERCENTILES = (50, 90, 99);    # the percentiles reported for each player
+CHISTOGRAMBIN = 250;            # ms covered by each bar of the histogram
+CHISTOGRAMMAX = 5000;           # ms covered by the whole histogram (the slowest speed)
+CHISTOGRAMWIDTH = 30;           # characters in the longest bar of the histogram
+CLEARNINGPOINTS = 10;           # points on a learning curve (groups of sessions)
+
+# the trials of a range of sessions, one NumPy array per column.  'players'
+# is the list of player names and 'player' the index of the trial's player in it
+Trials = namedtuple("Trials", "first last players player session started speed answer correct time")
+
+#==============================================================
+
+#.................... Function: group_percentiles ................
+# This function works out percentiles of the values in each group without
+# looping over the groups (linear interpolation, as numpy.percentile()).
+# It is passed
+#   - values : the values
+#   - groups : the group (0 to numgroups-1) of each value
+#   - numgroups : the number of groups
+#   - percentiles : the percentiles wanted
+# It returns an array of numgroups rows, one column for each percentile
+# (NaN for a group with no values).
+#
+def group_percentiles(values, groups, numgroups, percentiles = CPERCENTILES):
+    order = np.lexsort((values, groups))
+    ordered = values[order]
+    counts = np.bincount(groups, minlength = numgroups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    # the (fractional) position of each percentile within its group
+    position = starts[:, None] + (np.asarray(percentiles) / 100.0)[None, :] * (counts[:, None] - 1)
+    position = np.maximum(position, starts[:, None])
+    below = np.floor(position).astype(np.int64)
+    above = np.minimum(below + 1, np.maximum(starts + counts - 1, 0)[:, None])
+    result = np.full(position.shape, np.nan)
+    found = counts > 0
+    if ordered.size:
+        low = ordered[np.minimum(below, ordered.size - 1)]
+        high = ordered[np.minimum(above, ordered.size - 1)]
+        result[found] = (low + (position - below) * (high - low))[found]
+    return result
+
+# ..................... end of function : group_percentiles .........
+
+#.................... Function: group_means ................
+# This function returns the number of values in each group and their mean
+# (NaN for a group with no values)
+#
+def group_means(values, groups, numgroups):
+    counts = np.bincount(groups, minlength = numgroups)
+    totals = np.bincount(groups, weights = values, minlength = numgroups)
+    with np.errstate(invalid = "ignore", divide = "ignore"):
+        return counts, totals / counts
+
+# ..................... end of function : group_means .........
+
+#==============================================================
+
+class SessionAnalytics(object):
+    """ NumPy analysis of the sessions in a GameHistory. """
+
+    def __init__(self, history):
+        self.history = history
+        # the trials loaded so far and the reports worked out for them
+        self.trials = None
+        self.reports = {}
+
+    #.................... Method: load ................
+    # This method loads the trials of the sessions first to last into arrays
+    # It returns the Trials
+    #
+    def load(self, first, last):
+        sessions = self.history.sessions(first, last)
+        players = sorted(set(row[1] for row in sessions))
+        code = dict((player, index) for index, player in enumerate(players))
+        session_ids = np.array([row[0] for row in sessions], dtype = np.int64)
+        session_player = np.array([code[row[1]] for row in sessions], dtype = np.int64)
+        session_started = np.array([row[2] for row in sessions], dtype = np.float64)
+        # the trials are read straight into one array without a list of rows
+        columns = np.fromiter(chain.from_iterable(self.history.trials(first, last)),
+                              dtype = np.float64).reshape(-1, 5)
+        session = np.searchsorted(session_ids, columns[:, 0].astype(np.int64))
+        return Trials(first, last, players,
+                      session_player[session], session_ids[session], session_started[session],
+                      columns[:, 1].astype(np.int64), columns[:, 2].astype(np.int64),
+                      columns[:, 3].astype(bool), columns[:, 4])
+
+    # ................. end of method: load .................
+
+    #.................... Method: load_range ................
+    # This method returns the trials of the sessions first to last, loading
+    # only the sessions not already loaded
+    #
+    def load_range(self, first, last):
+        old = self.trials
+        if old is not None and old.first == first and old.last == last:
+            return old
+        if old is not None and old.first == first and old.last < last:
+            new = self.load(old.last + 1, last)
+            players = sorted(set(old.players) | set(new.players))
+            code = dict((player, index) for index, player in enumerate(players))
+            old_codes = np.array([code[player] for player in old.players], dtype = np.int64)
+            new_codes = np.array([code[player] for player in new.players], dtype = np.int64)
+            self.trials = Trials(first, last, players,
+                                 np.concatenate((old_codes[old.player], new_codes[new.player])),
+                                 *[np.concatenate((a, b)) for a, b in zip(old[4:], new[4:])])
+        else:
+            self.trials = self.load(first, last)
+        return self.trials
+
+    # ................. end of method: load_range .................
+
+    #.................... Method: report ................
+    # This method returns the analysis of the sessions as text.
+    # It is passed
+    #   - player : the player to analyse, or None for everyone
+    #   - first, last : the range of sessions to analyse (all if not given)
+    #
+    def report(self, player = None, first = None, last = None):
+        oldest, newest = self.history.session_range()
+        if newest is None:
+            return "Analytics\n\nNo games played yet"
+        if first is None:
+            first = oldest
+        if last is None:
+            last = newest
+        key = (first, last, player)
+        if key not in self.reports:
+            trials = self.load_range(first, last)
+            self.reports[key] = self.build_report(trials, player)
+        return self.reports[key]
+
+    # ................. end of method: report .................
+
+    #.................... Method: build_report ................
+    # This method works out the analysis of the trials and returns it as text
+    #
+    def build_report(self, trials, player):
+        lines = []
+        selected = np.ones(trials.time.size, dtype = bool)
+        title = "Analytics : all players"
+        if player is not None:
+            title = "Analytics : " + player
+            if player in trials.players:
+                selected = trials.player == trials.players.index(player)
+            else:
+                selected[:] = False
+        lines.append(title)
+        lines.append("")
+        # timeouts (no answer) have no reaction time
+        answered = selected & (trials.answer != 0)
+
+        # the percentiles of each player
+        lines.append("Percentiles (seconds)")
+        lines.append("Player\t\t" + "\t".join("p" + str(p) for p in CPERCENTILES) + "\tTrials")
+        table = group_percentiles(trials.time[answered], trials.player[answered], len(trials.players))
+        counts = np.bincount(trials.player[answered], minlength = len(trials.players))
+        for index in np.flatnonzero(counts):
+            lines.append("{0:14.14}\t".format(trials.players[index]) +
+                         "\t".join("{0:.3f}".format(0.001 * value) for value in table[index]) +
+                         "\t" + str(counts[index]))
+
+        # the histogram of the times
+        lines.append("")
+        lines.append("Reaction times")
+        edges = np.arange(0, CHISTOGRAMMAX + CHISTOGRAMBIN, CHISTOGRAMBIN)
+        histogram = np.histogram(trials.time[answered], bins = edges)[0]
+        scale = CHISTOGRAMWIDTH / max(1, histogram.max())
+        for low, count in zip(edges[:-1], histogram):
+            if count:
+                lines.append("{0:5.2f}s {1:6d} {2}".format(0.001 * low, count, "#" * max(1, int(count * scale))))
+
+        # accuracy and average reaction time at each speed
+        lines.append("")
+        lines.append("Speed\tTrials\tCorrect\tAverage")
+        speeds, group = np.unique(trials.speed[selected], return_inverse = True)
+        group = group.reshape(-1)
+        played, accuracy = group_means(trials.correct[selected].astype(np.float64), group, speeds.size)
+        timed = answered[selected]
+        average = group_means(trials.time[selected][timed], group[timed], speeds.size)[1]
+        for speed, count, correct, mean in zip(speeds, played, accuracy, average):
+            lines.append("{0}\t{1}\t{2:.0%}\t{3:.3f}".format(speed, count, correct, 0.001 * mean))
+
+        # the learning curve: the sessions in the order they were played,
+        # split into (at most) CLEARNINGPOINTS groups of sessions
+        lines.append("")
+        lines.append("Learning curve")
+        lines.append("Sessions\tFrom\t\tCorrect\tAverage")
+        sessions, first_trial, group = np.unique(trials.session[selected], return_index = True,
+                                                 return_inverse = True)
+        group = group.reshape(-1)
+        started = trials.started[selected][first_trial]
+        order = np.argsort(started, kind = "stable")
+        rank = np.empty_like(order)
+        rank[order] = np.arange(order.size)
+        points = min(CLEARNINGPOINTS, sessions.size)
+        if points:
+            # the point each session (in the order played) belongs to
+            session_point = np.arange(sessions.size) * points // sessions.size
+            in_point = np.bincount(session_point, minlength = points)
+            point_start = started[order][np.searchsorted(session_point, np.arange(points))]
+            point = session_point[rank[group]]
+            accuracy = group_means(trials.correct[selected].astype(np.float64), point, points)[1]
+            average = group_means(trials.time[selected][timed], point[timed], points)[1]
+            for number in range(0, points):
+                lines.append("{0}\t\t{1}\t{2:.0%}\t{3:.3f}".format(
+                    in_point[number], strftime("%d/%m/%Y", localtime(point_start[number])),
+                    accuracy[number], 0.001 * average[number]))
+        else:
+            lines.append("\nNo games played yet")
+        return "\n".join(lines)
+
+    # ................. end of method: build_report .................
+
+#=================================================================
+# main
+#=================================================================
+
+if __name__ == "__main__":
+    from ledhistoryv1p0p0 import GameHistory
+    history = GameHistory()
+    player = None
+    if len(sys.argv) > 1:
+        player = sys.argv[1]
+    print(SessionAnalytics(history).report(player))
+    history.close()
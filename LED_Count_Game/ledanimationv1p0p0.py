@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+
+#==============================================================
+#
+# Authors:      Christine Smythe and Colin Smythe (Dunelm Services Limited)
+# Version:      1.0
+# Release Date: 1st November, 2013
+#
+# Description:  This Python3 module provides the animations shown on the LEDs
+#               of the LED Counting Game (e.g. the quadrant chase shown whilst
+#               waiting for the player to press start).
+#
+#               An animation is described by the regions of LEDs lit in each
+#               of its steps and how long each step is shown.  It is compiled
+#               once into a list of frames (one output port byte for each
+#               board) so playing it is just writing the next frame.  New
+#               animations are added by naming their regions and steps in
+#               CANIMATIONS - no code is needed.
+#
+#               An AnimationPlayer works out which frame is due from the time
+#               the animation started, so each frame is shown at an absolute
+#               deadline and the animation does not drift however long the
+#               board writes take.
+#
+# History:      Original release.
+#
+# Copyright:    2013 (c) Premier Farnell Limited
+#
+# License:      GPLv3+
+#
+#==============================================================
+
+from collections import namedtuple
+from ledboardsv1p0p0 import CGEOMETRY, CALLLEDSOFF, CNS_PER_SECOND
+
+#==============================================================
+# Declaration of Constants
+
+# an animation before it is compiled: its regions, the regions lit in each
+# step (in order, the animation then repeats) and the seconds each step is shown
+AnimationSpec = namedtuple("AnimationSpec", "regions steps period")
+
+CQUADRANTTIME = 0.5;    # seconds each quadrant is lit whilst waiting for start
+CSWEEPTIME = 0.25;      # seconds each column is lit in the column sweep
+CFLASHTIME = 0.5;       # seconds the LEDs are on (and off) in the flash
+
+CATTRACT_ANIMATION = "quadrant chase";  # shown whilst waiting for the start button
+
+#==============================================================
+
+#.................... Function: animation_specs ................
+# This function returns the animations for a board geometry, each an
+# AnimationSpec whose regions are lists of (board, output port mask) pairs.
+# The quadrants are the left and right halves of the columns and the top and
+# bottom halves of the LEDs in each column (e.g. on one PiRack the top left
+# quadrant is LEDs 4 to 7 on boards 0 and 1).
+# It is passed geometry = the BoardGeometry
+#
+def animation_specs(geometry = CGEOMETRY):
+    columns = geometry.columns
+    left = range(0, (columns + 1) // 2)
+    right = range((columns + 1) // 2, columns)
+    middle = geometry.ledspercolumn // 2
+    quadrants = {
+        1 : geometry.region(left, middle),          # top left quadrant
+        2 : geometry.region(right, middle),         # top right quadrant
+        3 : geometry.region(right, 0, middle - 1),  # bottom right quadrant
+        4 : geometry.region(left, 0, middle - 1),   # bottom left quadrant
+    }
+    column_regions = dict((column + 1, geometry.region((column,))) for column in range(0, columns))
+    all_regions = {"all" : geometry.region(range(0, columns))}
+    # the sweep goes across the columns and back again
+    sweep = tuple((column,) for column in list(range(1, columns + 1)) + list(range(columns - 1, 1, -1)))
+    return {
+        "quadrant chase" : AnimationSpec(quadrants, ((1,), (2,), (3,), (4,)), CQUADRANTTIME),
+        "column sweep"   : AnimationSpec(column_regions, sweep, CSWEEPTIME),
+        "flash"          : AnimationSpec(all_regions, (("all",), ()), CFLASHTIME),
+    }
+
+# ..................... end of function : animation_specs .........
+
+# the animations on one PiRack
+CANIMATIONS = animation_specs()
+CQUADRANT_REGIONS = CANIMATIONS["quadrant chase"].regions
+CCOLUMN_REGIONS = CANIMATIONS["column sweep"].regions
+CALL_REGIONS = CANIMATIONS["flash"].regions
+
+# a compiled animation: a tuple of frames and the time (ns) each is shown
+Animation = namedtuple("Animation", "frames period")
+
+#==============================================================
+
+#.................... Function: compile_animation ................
+# This function turns the description of an animation into its frames.
+# It is passed
+#   - spec : the AnimationSpec to compile
+#   - numboards : the number of boards in each frame
+# It returns the compiled Animation
+#
+def compile_animation(spec, numboards = CGEOMETRY.numboards):
+    frames = []
+    for step in spec.steps:
+        frame = [CALLLEDSOFF] * numboards
+        for region in step:
+            for board, mask in spec.regions[region]:
+                frame[board] = frame[board] | mask
+        frames.append(tuple(frame))
+    return Animation(tuple(frames), int(spec.period * CNS_PER_SECOND))
+
+# ..................... end of function : compile_animation .........
+
+#.................... Function: compile_animations ................
+# This function returns the animations for a board geometry ready to be
+# played, by name
+#
+def compile_animations(geometry = CGEOMETRY):
+    return dict((name, compile_animation(spec, geometry.numboards))
+                for name, spec in animation_specs(geometry).items())
+
+# ..................... end of function : compile_animations .........
+
+# the animations on one PiRack ready to be played
+CCOMPILED = compile_animations()
+
+#==============================================================
+
+class AnimationPlayer(object):
+    """ Plays a compiled animation on absolute deadlines. """
+
+    def __init__(self, animation):
+        self.animation = animation
+        self.origin = 0
+        self.deadline = 0
+
+    #.................... Method: start ................
+    # This method starts the animation from its first frame
+    # It is passed now = the current time (ns)
+    #
+    def start(self, now):
+        self.origin = now
+        self.deadline = now
+
+    # ................. end of method: start .................
+
+    #.................... Method: due ................
+    # This method returns the frame which should be showing now if it is not
+    # already showing, otherwise None.  If deadlines have been missed the
+    # frames for them are skipped so the animation keeps to time.
+    # It is passed now = the current time (ns)
+    #
+    def due(self, now):
+        if now < self.deadline:
+            return None
+        step = (now - self.origin) // self.animation.period
+        self.deadline = self.origin + (step + 1) * self.animation.period
+        frames = self.animation.frames
+        return frames[step % len(frames)]
+
+    # ................. end of method: due .................
+
+#=================================================================
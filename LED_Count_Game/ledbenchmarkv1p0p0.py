@@ -0,0 +1,541 @@
+#!/usr/bin/env python
+
+#==============================================================
+#
+# Authors:      Christine Smythe and Colin Smythe (Dunelm Services Limited)
+# Version:      1.0
+# Release Date: 1st November, 2013
+#
+# Description:  This Python3 program contains micro-benchmarks for the LED
+#               Counting Game.  It does not need the PiFace boards.
+#
+#               patterns - compares the cost of generating one pattern using
+#                          the original rejection loops (random.randint() until
+#                          the numbers are all different) against the
+#                          PatternGenerator used by the game (random.sample()
+#                          and a table of output port values).
+#
+#               simulation - measures how many whole games per second the
+#                          headless simulator (ledsimulatorv1p0p0.py) can play.
+#
+#               stations - plays one game (of 'count' configurations) on each
+#                          of 1 to 16 stations run by one StationScheduler
+#                          (ledstationsv1p0p0.py) in real time, with simulated
+#                          boards which take as long as an SPI write, and
+#                          prints how late the configurations were shown.
+#
+#               schedule - plays a game of 'count' configurations in real time
+#                          with each of the gaps in CSCHEDULES (blank, fixation
+#                          and jitter) and prints how late the configurations
+#                          were shown and the trials per minute achieved
+#                          against the most the gap allows.
+#
+#               geometry - generates 'count' patterns and draws them (compose
+#                          the bits and flip) for each board geometry in CGEOMETRIES, and
+#                          prints the cost of each per pattern and per board, on
+#                          boards which take no time to write and on boards
+#                          which take as long as an SPI write.
+#
+#               process - plays a game of 'count' configurations in real time
+#                          with the game loop in the GUI's thread (as Tk runs
+#                          it) and then in its own process (see
+#                          ledgameprocessv1p0p0.py), whilst the GUI is kept
+#                          busy redrawing and collecting garbage, and prints
+#                          the jitter of each: how late the configurations
+#                          were shown, how late the presses were timestamped
+#                          and how long the game took to act on them.
+#
+#               Usage:  python3 ledbenchmarkv1p0p0.py [benchmark] [count]
+#                       where benchmark is one of the above or 'all' (the default)
+#
+# History:      Original release.
+#
+# Copyright:    2013 (c) Premier Farnell Limited
+#
+# License:      GPLv3+
+#
+#==============================================================
+
+import heapq
+import random
+import sys
+import threading
+from time import perf_counter, perf_counter_ns, sleep
+from timeit import timeit
+from ledboardsv1p0p0 import LEDBoards, BoardGeometry, CNUMBOARDS, CNS_PER_SECOND, CNS_PER_MS
+from ledgameenginev1p0p0 import GameEngine, CSTARTBUTTON, CSTATE_ATTRACT, CSTATE_AWAITING
+from ledgameprocessv1p0p0 import GameProcess, CFRAMETIME
+from ledinputv1p0p0 import EventQueue, ButtonEvent
+from ledpatternsv1p0p0 import PatternGenerator
+from ledsimulatorv1p0p0 import Simulation, ErrorPronePlayer, FixedLatencyPlayer
+from ledsimulatorv1p0p0 import SimulatedButtons, SimulatedBoard, SimulatedPort, NullView, CSTARTDELAY
+from ledstationsv1p0p0 import Station, StationScheduler
+from ledtrialsv1p0p0 import TrialScheduler
+
+#==============================================================
+# Declaration of Constants
+
+CDEFAULTTRIALS = 100000;    # default number of patterns generated by each benchmark
+CDEFAULTGAMES = 2000;       # default number of games played by the simulation benchmark
+CSIMCONFIGS = 10;           # configurations in each simulated game
+CSIMSPEED = 2000;           # speed (ms) of each simulated game
+CSEED = 2013;               # fixed seed so that every run does the same work
+CDEFAULTSTATIONCONFIGS = 3; # default configurations played on each station
+CSTATIONCOUNTS = (1, 2, 4, 8, 16);  # numbers of stations run together
+CSTATIONSPEED = 1000;       # speed (ms) of each station game
+CSPIWRITETIME = 0.00004;    # seconds one SPI write to a board takes
+CDEFAULTSCHEDULECONFIGS = 10;   # default configurations played with each gap
+CSCHEDULELATENCY = 0.3;     # seconds the player takes to answer in the schedule benchmark
+# the gaps (blank, fixation, blank jitter, fixation jitter in seconds) timed
+CSCHEDULES = ((1.0, 0.0, 0.0, 0.0), (0.2, 0.0, 0.0, 0.0), (0.2, 0.3, 0.1, 0.1));
+CDEFAULTGEOMETRYPATTERNS = 2000;    # default patterns drawn on each geometry
+# the geometries (boards, LEDs in each column) timed
+CGEOMETRIES = ((4, 8), (8, 8), (8, 16), (16, 16), (16, 32), (32, 32));
+CDEFAULTPROCESSCONFIGS = 20;    # default configurations played in each mode
+# the work of the GUI whilst a game is played: a redraw of CGUIREDRAW seconds
+# every CGUIPERIOD seconds and, every CGUIPAUSEEVERY redraws, a pause of
+# CGUIPAUSE seconds (a full garbage collection)
+CGUIPERIOD = 0.05;
+CGUIREDRAW = 0.008;
+CGUIPAUSEEVERY = 20;
+CGUIPAUSE = 0.04;
+
+#==============================================================
+
+#.................... Function: rejection_pattern ................
+# This function generates one pattern the way the original game did, choosing
+# random numbers 1 to 8 and choosing again until they are all different.
+# It returns the number of LEDs in each column and the correct column.
+# It is passed rng = the random number generator to use
+#
+def rejection_pattern(rng):
+    LEDs_in_column = []
+    while len(LEDs_in_column) < 4:
+        count = rng.randint(1,8)
+        while count in LEDs_in_column:
+            count = rng.randint(1,8)
+        LEDs_in_column.append(count)
+    correct_column = LEDs_in_column.index(max(LEDs_in_column)) + 1
+    # now choose that many different LEDs for each column
+    random_LEDs = []
+    for column in range (0,4):
+        chosen = []
+        while len(chosen) < LEDs_in_column[column]:
+            led = rng.randint(1,8)
+            while led in chosen:
+                led = rng.randint(1,8)
+            chosen.append(led)
+        random_LEDs.append(chosen)
+    return LEDs_in_column, correct_column
+
+# ..................... end of function : rejection_pattern .........
+
+#.................... Function: benchmark_patterns ................
+# This function times the generation of patterns by both methods and
+# prints the cost of one pattern in microseconds.
+# It is passed trials = the number of patterns to generate
+#
+def benchmark_patterns(trials):
+    rng = random.Random(CSEED)
+    rejection = timeit(lambda: rejection_pattern(rng), number = trials)
+    generator = PatternGenerator(CSEED)
+    sample = timeit(generator.generate, number = trials)
+    generator = PatternGenerator(CSEED)
+    batch = timeit(lambda: generator.generate_batch(trials), number = 1)
+
+    print("Pattern generation (" + str(trials) + " patterns)")
+    print("  rejection loops     %8.2f us per pattern" % (rejection * 1e6 / trials))
+    print("  PatternGenerator    %8.2f us per pattern" % (sample * 1e6 / trials))
+    print("  generate_batch      %8.2f us per pattern" % (batch * 1e6 / trials))
+
+# ..................... end of function : benchmark_patterns .........
+
+#.................... Function: benchmark_simulation ................
+# This function plays whole games with the headless simulator and prints
+# the number of games and configurations played per second.
+# It is passed games = the number of games to play
+#
+def benchmark_simulation(games):
+    player = ErrorPronePlayer(0.6, 0.25, 0.1, seed = CSEED)
+    start = perf_counter()
+    for game in range(0, games):
+        Simulation(player).play(CSIMCONFIGS, CSIMSPEED, seed = CSEED + game)
+    elapsed = perf_counter() - start
+
+    print("Simulation (" + str(games) + " games of " + str(CSIMCONFIGS) + " configurations)")
+    print("  %10.0f games per second" % (games / elapsed))
+    print("  %10.0f configurations per second" % (games * CSIMCONFIGS / elapsed))
+
+# ..................... end of function : benchmark_simulation .........
+
+#==============================================================
+
+class RealClock(object):
+    """ The real (perf_counter_ns) clock, read like a VirtualClock. """
+
+    @property
+    def now(self):
+        return perf_counter_ns()
+
+#==============================================================
+
+class SlowPort(SimulatedPort):
+    """ A simulated output port which takes as long to write as the SPI bus. """
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        finish = perf_counter() + CSPIWRITETIME
+        while perf_counter() < finish:
+            pass
+        self._value = value
+
+#==============================================================
+
+class SlowBoard(object):
+    """ A simulated PiFace board with a SlowPort. """
+
+    def __init__(self):
+        self.output_port = SlowPort()
+
+#==============================================================
+
+class PlayerButtons(SimulatedButtons):
+    """ Simulated buttons pressed by a simulated player as the game needs. """
+
+    def __init__(self, clock, player):
+        super(PlayerButtons, self).__init__(clock)
+        self.player = player
+        self.game = None
+        self.answered = -1
+
+    #.................... Method: poll ................
+    # This method presses start when the game is waiting for it and the
+    # player's column when a configuration is shown, then polls as usual
+    #
+    def poll(self, buttons, since = 0):
+        game = self.game
+        if game.state == CSTATE_ATTRACT and self.answered < 0:
+            self.answered = 0
+            self.press(CSTARTBUTTON, self.clock.now + int(CSTARTDELAY * CNS_PER_SECOND))
+        elif game.state == CSTATE_AWAITING and self.answered != game.count:
+            self.answered = game.count
+            column, latency = self.player.respond(game.pattern(game.count))
+            self.press(game.column_buttons[column-1], game.starttime + int(latency * CNS_PER_SECOND))
+        return super(PlayerButtons, self).poll(buttons, since)
+
+    # ................. end of method: poll .................
+
+#.................... Function: benchmark_stations ................
+# This function plays one game on each of a number of stations at once, in
+# real time, and prints how late (after the blank) the configurations were
+# shown on each station and the worst error in the times measured.
+# It is passed configs = the number of configurations in each game
+#
+def benchmark_stations(configs):
+    print("Stations (" + str(configs) + " configurations on each, "
+          + str(CSPIWRITETIME * 1e6) + " us per board write)")
+    print("  stations   mean late ms    worst late ms   worst time error ms")
+    clock = RealClock()
+    for numstations in CSTATIONCOUNTS:
+        stations = []
+        for number in range(0, numstations):
+            boards = [SlowBoard() for board in range(0, CNUMBOARDS)]
+            buttons = PlayerButtons(clock, FixedLatencyPlayer(0.3))
+            station = Station("Station " + str(number + 1), LEDBoards(CNUMBOARDS, boards),
+                              buttons, NullView(), configs = configs, speed = CSTATIONSPEED)
+            buttons.game = station.game
+            stations.append(station)
+        scheduler = StationScheduler(stations)
+        scheduler.service()
+        while any(station.game.running() for station in stations):
+            wait = scheduler.next_update(perf_counter_ns()) - perf_counter_ns()
+            if wait > 0:
+                sleep(wait / CNS_PER_SECOND)
+            scheduler.service()
+        late = [station.lateness for station in stations]
+        error = max(abs(row[3] - 300.0) for station in stations
+                    for row in station.game.results.rows())
+        print("  %8d   %12.3f    %13.3f   %19.6f"
+              % (numstations, sum(stats.mean for stats in late) / numstations / CNS_PER_MS,
+                 max(stats.maximum for stats in late) / CNS_PER_MS, error))
+
+# ..................... end of function : benchmark_stations .........
+
+#.................... Function: benchmark_schedule ................
+# This function plays a game in real time with each of the gaps in
+# CSCHEDULES and prints how late the configurations were shown and how
+# many were shown per minute, against the most the gap and the player's
+# time allow.
+# It is passed configs = the number of configurations in each game
+#
+def benchmark_schedule(configs):
+    print("Trial schedule (" + str(configs) + " configurations, player takes "
+          + str(CSCHEDULELATENCY) + " s)")
+    print("  blank  fixation  jitter    mean late ms   worst late ms   trials/min   most/min")
+    clock = RealClock()
+    for blank, fixation, blank_jitter, fixation_jitter in CSCHEDULES:
+        boards = [SlowBoard() for board in range(0, CNUMBOARDS)]
+        buttons = PlayerButtons(clock, FixedLatencyPlayer(CSCHEDULELATENCY))
+        station = Station("Station", LEDBoards(CNUMBOARDS, boards), buttons, NullView(),
+                          configs = configs, speed = CSTATIONSPEED)
+        station.game.schedule = TrialScheduler(blank, fixation, blank_jitter, fixation_jitter)
+        buttons.game = station.game
+        scheduler = StationScheduler([station])
+        scheduler.service()
+        while station.game.running():
+            wait = scheduler.next_update(perf_counter_ns()) - perf_counter_ns()
+            if wait > 0:
+                sleep(wait / CNS_PER_SECOND)
+            scheduler.service()
+        game = station.game
+        rate = (configs - 1) * 60.0 * CNS_PER_SECOND / (game.starttime - game.first_shown)
+        most = 60.0 / (game.schedule.interval() + CSCHEDULELATENCY)
+        print("  %5.2f  %8.2f  %6.2f    %12.3f   %13.3f   %10.1f   %8.1f"
+              % (blank, fixation, blank_jitter + fixation_jitter, station.lateness.mean / CNS_PER_MS,
+                 station.lateness.maximum / CNS_PER_MS, rate, most))
+
+# ..................... end of function : benchmark_schedule .........
+
+#.................... Function: benchmark_geometry ................
+# This function generates patterns and draws them on each of the board
+# geometries in CGEOMETRIES and prints the cost of each per pattern and per
+# board, so it can be seen that both grow in line with the number of boards.
+# It is passed patterns = the number of patterns generated and drawn
+#
+def benchmark_geometry(patterns):
+    print("Board geometry (" + str(patterns) + " patterns, "
+          + str(CSPIWRITETIME * 1e6) + " us per board write)")
+    print("  boards  LEDs  columns   pattern us   draw us  per board   SPI draw us  per board")
+    for numboards, ledspercolumn in CGEOMETRIES:
+        geometry = BoardGeometry(numboards, ledspercolumn)
+        generator = PatternGenerator(CSEED, geometry)
+        generate = timeit(generator.generate, number = patterns) * 1e6 / patterns
+        frames = [pattern.bits for pattern in PatternGenerator(CSEED, geometry).generate_batch(patterns)]
+        draw = []
+        for board in (SimulatedBoard, SlowBoard):
+            leds = LEDBoards(numboards, [board() for number in range(0, numboards)])
+            start = perf_counter()
+            for bits in frames:
+                leds.compose_bits(bits)
+                leds.flip()
+            draw.append((perf_counter() - start) * 1e6 / patterns)
+        print("  %6d  %4d  %7d   %10.2f  %8.2f  %9.3f   %11.2f  %9.3f"
+              % (numboards, ledspercolumn, geometry.columns, generate,
+                 draw[0], draw[0] / numboards, draw[1], draw[1] / numboards))
+
+# ..................... end of function : benchmark_geometry .........
+
+#==============================================================
+
+class ScheduledPresses(EventQueue):
+    """ Button presses made by a thread at chosen times, as a button's interrupt would. """
+
+    def __init__(self):
+        super(ScheduledPresses, self).__init__()
+        # the (time, button) presses still to be made, in time order
+        self.pending = []
+        # how late (ns) each press was timestamped
+        self.errors = []
+        self.condition = threading.Condition()
+        self.active = True
+        self.thread = threading.Thread(target = self.run, name = "scheduled presses", daemon = True)
+        self.thread.start()
+
+    #.................... Method: press ................
+    # This method arranges for a button to be pressed at the time (ns) given
+    #
+    def press(self, button, when):
+        with self.condition:
+            heapq.heappush(self.pending, (when, button))
+            self.condition.notify()
+
+    # ................. end of method: press .................
+
+    #.................... Method: run ................
+    # This method (in its own thread) makes each press when it is due,
+    # timestamping it when the thread gets to run
+    #
+    def run(self):
+        with self.condition:
+            while self.active:
+                if not self.pending:
+                    self.condition.wait()
+                    continue
+                wait = self.pending[0][0] - perf_counter_ns()
+                if wait > 0:
+                    self.condition.wait(wait / CNS_PER_SECOND)
+                    continue
+                when, button = heapq.heappop(self.pending)
+                timestamp = perf_counter_ns()
+                self.errors.append(timestamp - when)
+                self.post(ButtonEvent(button, timestamp))
+
+    # ................. end of method: run .................
+
+    #.................... Method: close ................
+    # This method stops making presses
+    #
+    def close(self):
+        with self.condition:
+            self.active = False
+            self.condition.notify()
+        self.thread.join()
+
+    # ................. end of method: close .................
+
+#==============================================================
+
+class GuiLoad(object):
+    """ The work the GUI does whilst a game is played, done when it is due. """
+
+    def __init__(self):
+        self.due = perf_counter_ns() + int(CGUIPERIOD * CNS_PER_SECOND)
+        self.redraws = 0
+
+    def work(self, now):
+        if now >= self.due:
+            busy = CGUIREDRAW
+            self.redraws = self.redraws + 1
+            if self.redraws % CGUIPAUSEEVERY == 0:
+                busy = busy + CGUIPAUSE
+            finish = perf_counter() + busy
+            while perf_counter() < finish:
+                pass
+            self.due = self.due + int(CGUIPERIOD * CNS_PER_SECOND)
+
+#=================================================================
+
+#.................... Function: jitter_game ................
+# This function builds a game on boards which take as long to write as the
+# SPI bus, with a simulated player whose presses are made by a thread.  The
+# game keeps in 'jitter' how late (ns) each configuration was shown ("flip"),
+# each press was timestamped ("timestamp") and each press was acted on
+# ("response").  It is used by the process benchmark in both processes.
+#
+def jitter_game(view):
+    leds = LEDBoards(CNUMBOARDS, [SlowBoard() for board in range(0, CNUMBOARDS)])
+    buttons = ScheduledPresses()
+    game = GameEngine(leds, buttons, view)
+    game.schedule = TrialScheduler(0.2, 0.0, 0.1)
+    game.jitter = {"flip" : [], "timestamp" : buttons.errors, "response" : []}
+    player = FixedLatencyPlayer(CSCHEDULELATENCY)
+    start_game = game.start_game
+    show_config = game.show_config
+    process_config = game.process_config
+    def started(configs, speed, now, *args):
+        start_game(configs, speed, now, *args)
+        buttons.press(CSTARTBUTTON, now + int(CSTARTDELAY * CNS_PER_SECOND))
+    def shown():
+        due = game.timeout
+        show_config()
+        game.jitter["flip"].append(game.starttime - due)
+        column, latency = player.respond(game.pattern(game.count))
+        buttons.press(game.column_buttons[column-1], game.starttime + int(latency * CNS_PER_SECOND))
+    def processed(configno, speed, event):
+        if event is not None:
+            game.jitter["response"].append(perf_counter_ns() - event.timestamp)
+        process_config(configno, speed, event)
+    game.start_game = started
+    game.show_config = shown
+    game.process_config = processed
+    return game
+
+# ..................... end of function : jitter_game .........
+
+#.................... Function: play_in_gui_thread ................
+# This function plays a jitter_game in this thread, which also does the
+# GUI's work, as Tk runs the game from after() timers and button events.
+# It returns the game's jitter.
+#
+def play_in_gui_thread(configs):
+    game = jitter_game(NullView())
+    wakeup = threading.Event()
+    game.buttons.on_press = lambda event: wakeup.set()
+    load = GuiLoad()
+    game.start_game(configs, CSTATIONSPEED, perf_counter_ns(), CSEED)
+    while game.running():
+        now = perf_counter_ns()
+        wake = min(now + CFRAMETIME * CNS_PER_MS, load.due)
+        deadline = game.next_update(now)
+        if deadline is not None:
+            wake = min(wake, deadline)
+        wakeup.wait(max(wake - now, 0) / CNS_PER_SECOND)
+        wakeup.clear()
+        load.work(perf_counter_ns())
+        game.update(perf_counter_ns())
+    game.buttons.close()
+    return game.jitter
+
+# ..................... end of function : play_in_gui_thread .........
+
+#.................... Function: play_in_process ................
+# This function plays a jitter_game in a GameProcess whilst this thread
+# does the GUI's work.  It returns the game's jitter.
+#
+def play_in_process(configs):
+    process = GameProcess(NullView(), jitter_game)
+    load = GuiLoad()
+    process.start_game(configs, CSTATIONSPEED, perf_counter_ns(), CSEED)
+    while process.running():
+        now = perf_counter_ns()
+        wake = min(now + CFRAMETIME * CNS_PER_MS, load.due)
+        if wake > now:
+            sleep((wake - now) / CNS_PER_SECOND)
+        load.work(perf_counter_ns())
+        process.update(perf_counter_ns())
+    jitter = process.fetch("jitter")
+    process.close()
+    return jitter
+
+# ..................... end of function : play_in_process .........
+
+#.................... Function: benchmark_process ................
+# This function plays a game with the game loop in the GUI's thread and
+# then in its own process, with the GUI kept busy, and prints the median,
+# 99th percentile and worst lateness (ms) of each.
+# It is passed configs = the number of configurations in each game
+#
+def benchmark_process(configs):
+    print("Game process (" + str(configs) + " configurations, GUI busy "
+          + str(CGUIREDRAW * 1000) + " ms every " + str(CGUIPERIOD * 1000) + " ms and "
+          + str(CGUIPAUSE * 1000) + " ms every " + str(CGUIPERIOD * CGUIPAUSEEVERY) + " s)")
+    print("  game loop     late ms     median       p99     worst")
+    for mode, play in (("GUI thread", play_in_gui_thread), ("own process", play_in_process)):
+        jitter = play(configs)
+        for name in ("flip", "timestamp", "response"):
+            times = sorted(jitter[name])
+            if not times:
+                continue
+            print("  %-12s %-10s %8.3f  %8.3f  %8.3f"
+                  % (mode, name, times[len(times) // 2] / CNS_PER_MS,
+                     times[min(len(times) - 1, len(times) * 99 // 100)] / CNS_PER_MS,
+                     times[-1] / CNS_PER_MS))
+            mode = ""
+
+# ..................... end of function : benchmark_process .........
+
+#=================================================================
+# main
+#=================================================================
+
+# the benchmarks and the default count for each
+CBENCHMARKS = [("patterns", benchmark_patterns, CDEFAULTTRIALS),
+               ("simulation", benchmark_simulation, CDEFAULTGAMES),
+               ("stations", benchmark_stations, CDEFAULTSTATIONCONFIGS),
+               ("schedule", benchmark_schedule, CDEFAULTSCHEDULECONFIGS),
+               ("geometry", benchmark_geometry, CDEFAULTGEOMETRYPATTERNS),
+               ("process", benchmark_process, CDEFAULTPROCESSCONFIGS)]
+
+if __name__ == "__main__":
+    chosen = "all"
+    if len(sys.argv) > 1:
+        chosen = sys.argv[1]
+    for name, benchmark, count in CBENCHMARKS:
+        if chosen == "all" or chosen == name:
+            if len(sys.argv) > 2:
+                count = int(sys.argv[2])
+            benchmark(count)
@@ -0,0 +1,281 @@
+#!/usr/bin/env python
+
+#==============================================================
+#
+# Authors:      Christine Smythe and Colin Smythe (Dunelm Services Limited)
+# Version:      1.0
+# Release Date: 1st November, 2013
+#
+# Description:  This Python3 module provides the LED output layer used by the
+#               LED Counting Game for the set of 4 PiFace boards linked to the
+#               R-Pi using a PiRack.
+#
+#               A 'shadow' copy of the output port byte is kept for each board.
+#               Changing LEDs updates the shadow byte and the whole output port
+#               is then written in one SPI transaction - and only if the byte
+#               has actually changed.  This means that blanking or drawing all
+#               4 boards costs at most 4 SPI transactions instead of one per LED.
+#
+#               A trial is drawn by composing the whole frame (one byte for each
+#               board) in a back buffer and then flipping it onto the boards
+#               with the board writes made back to back, so the player never
+#               sees the pattern build up.  The flip records the time the frame
+#               became visible, which is the zero point for reaction timing.
+#
+#               Any objects with an 'output_port' whose 'value' can be set may
+#               be used instead of the PiFace boards (e.g. simulated boards), in
+#               which case the pifacedigitalio package is not needed.
+#
+#               A whole frame can also be held as one integer (a 'bitboard'),
+#               one byte per board with board 0 in the lowest byte, so the 4
+#               boards of one PiRack are one 32 bit number (see pack_frame()).
+#               The LED Counting Game's patterns and the LED chooser both hold
+#               their LEDs this way.
+#
+#               The BoardGeometry gives the number of boards and the number of
+#               LEDs in each column, e.g. 8 boards on two stacked PiRacks or
+#               columns of 16 LEDs made from 2 boards each.  It is read from
+#               CGEOMETRYFILE (if there is one) by load_geometry(), e.g.
+#                   {"boards" : 8, "leds_per_column" : 8}
+#
+# History:      Original release.
+#
+# Copyright:    2013 (c) Premier Farnell Limited
+#
+# License:      GPLv3+
+#
+#==============================================================
+
+import json
+import os
+from time import perf_counter_ns
+
+#==============================================================
+# Declaration of Constants
+
+CLEDOFF = 0;            # Switch LED off
+CLEDON = 1;             # Switch LED on
+
+CNUMBOARDS = 4;         # number of PiFace boards on the PiRack
+CBOARDSPERCHIPSELECT = 4;   # boards with hardware addresses 0 to 3 on each SPI chip select
+CLEDSPERBOARD = 8;      # number of LEDs (outputs) on each PiFace board
+
+CALLLEDSOFF = 0x00;     # output port value with all LEDs off
+CALLLEDSON = 0xFF;      # output port value with all LEDs on
+
+# the frames are timestamped in nanoseconds as given by time.perf_counter_ns()
+# (or by the clock given to the LEDBoards)
+CNS_PER_SECOND = 1000000000;
+CNS_PER_MS = 1000000;
+
+# the geometry of the boards is read from this file beside the game
+CGEOMETRYFILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "geometry.json")
+
+#==============================================================
+
+class BoardGeometry(object):
+    """ The number of boards and how they make up the columns of LEDs. """
+
+    def __init__(self, numboards = CNUMBOARDS, ledspercolumn = CLEDSPERBOARD):
+        # a column taller than one board is made from several boards, LEDs 0
+        # to 7 on the first board of the column, 8 to 15 on the next and so on
+        boardspercolumn = -(-ledspercolumn // CLEDSPERBOARD)
+        if ledspercolumn < 1 or numboards < 1 or numboards % boardspercolumn != 0:
+            raise ValueError("the columns of " + str(ledspercolumn) + " LEDs do not fit on "
+                             + str(numboards) + " boards")
+        columns = numboards // boardspercolumn
+        if columns < 2 or columns > ledspercolumn:
+            # each column must have a different number of LEDs lit
+            raise ValueError(str(columns) + " columns cannot each have a different number of "
+                             + str(ledspercolumn) + " LEDs lit")
+        self.numboards = numboards
+        self.ledspercolumn = ledspercolumn
+        self.boardspercolumn = boardspercolumn
+        self.columns = columns
+        # the number of LEDs on each board of a column, first board first
+        last = ledspercolumn - CLEDSPERBOARD * (boardspercolumn - 1)
+        self.segments = (CLEDSPERBOARD,) * (boardspercolumn - 1) + (last,)
+
+    #.................... Method: region ................
+    # This method returns the LEDs lit in some columns as (board, output port
+    # mask) pairs, one for each board of those columns.
+    # It is passed
+    #   - columns : the column numbers (0 upwards)
+    #   - first, last : the lowest and highest LEDs (0 upwards) lit in each
+    #                   column (all of the LEDs by default)
+    #
+    def region(self, columns, first = 0, last = None):
+        if last is None:
+            last = self.ledspercolumn - 1
+        # the LEDs lit as bits of the whole column, split into board bytes
+        lit = (1 << (last + 1)) - (1 << first)
+        pairs = []
+        for column in columns:
+            board = column * self.boardspercolumn
+            for segment in range(0, self.boardspercolumn):
+                mask = (lit >> (segment * CLEDSPERBOARD)) & CALLLEDSON
+                if mask:
+                    pairs.append((board + segment, mask))
+        return tuple(pairs)
+
+    # ................. end of method: region .................
+
+    #.................... Method: fixation_frame ................
+    # This method returns the frame with the top LED of every column lit
+    #
+    def fixation_frame(self):
+        frame = [CALLLEDSOFF] * self.numboards
+        for board, mask in self.region(range(0, self.columns), self.ledspercolumn - 1):
+            frame[board] = mask
+        return tuple(frame)
+
+    # ................. end of method: fixation_frame .................
+
+#=================================================================
+
+#.................... Function: load_geometry ................
+# This function returns the BoardGeometry given in a file, or the 4 boards
+# of 8 LEDs of one PiRack if there is no file
+#
+def load_geometry(filename = CGEOMETRYFILE):
+    if not os.path.exists(filename):
+        return BoardGeometry()
+    with open(filename) as file:
+        geometry = json.load(file)
+    return BoardGeometry(geometry.get("boards", CNUMBOARDS),
+                         geometry.get("leds_per_column", CLEDSPERBOARD))
+
+# ..................... end of function : load_geometry .........
+
+#.................... Function: init_boards ................
+# This function initialises the PiFace boards on each chip select used by
+# 'numboards' boards (a second PiRack is on chip select 1)
+#
+def init_boards(numboards = CNUMBOARDS):
+    import pifacedigitalio as pfio
+    for chip_select in range(0, -(-numboards // CBOARDSPERCHIPSELECT)):
+        pfio.init(True, 0, chip_select)
+
+# ..................... end of function : init_boards .........
+
+#.................... Function: pack_frame ................
+# This function returns a frame (one output port value for each board) as
+# one integer, board 0 in the lowest byte
+#
+def pack_frame(frame):
+    return int.from_bytes(bytes(frame), "little")
+
+# ..................... end of function : pack_frame .........
+
+#.................... Function: unpack_frame ................
+# This function returns the frame (bytes, one output port value for each
+# board) of the integer 'bits' for 'numboards' boards
+#
+def unpack_frame(bits, numboards = CNUMBOARDS):
+    return bits.to_bytes(numboards, "little")
+
+# ..................... end of function : unpack_frame .........
+
+# the geometry of one PiRack: 4 columns, each one board of 8 LEDs
+CGEOMETRY = BoardGeometry();
+
+#==============================================================
+
+class LEDBoards(object):
+    """ Shadow register output layer for a set of PiFace boards. """
+
+    def __init__(self, numboards = CNUMBOARDS, boards = None, clock = perf_counter_ns):
+        if boards is None:
+            # one PiFace object per board so that the whole output port can be written.
+            # The boards have already been initialised by pfio.init().  Boards
+            # 4 to 7 are those of a second PiRack on chip select 1.
+            import pifacedigitalio as pfio
+            boards = []
+            for board in range (0, numboards):
+                boards.append(pfio.PiFaceDigital(hardware_addr = board % CBOARDSPERCHIPSELECT,
+                                                 chip_select = board // CBOARDSPERCHIPSELECT,
+                                                 init_board = False))
+        self.boards = boards
+        numboards = len(boards)
+        # the shadow output byte for each board. 'None' means the state of the
+        # board is unknown so the first write always goes to the board
+        self.shadow = [None] * numboards
+        # the next frame is composed here before being flipped onto the boards
+        self.back = [CALLLEDSOFF] * numboards
+        # the clock used to timestamp each flip, and the time (ns) the last
+        # flipped frame became visible
+        self.clock = clock
+        self.visible = None
+        # count of the SPI output transactions actually made
+        self.writes = 0
+
+    #.................... Method: compose ................
+    # This method puts the next frame in the back buffer without changing
+    # any LEDs.
+    # It is passed a list containing one output port value for each board.
+    #
+    def compose(self, frame):
+        self.back[:] = frame
+
+    # ................. end of method: compose .................
+
+    #.................... Method: compose_bits ................
+    # This method puts the next frame, given as one integer with board 0 in
+    # the lowest byte, in the back buffer without changing any LEDs
+    #
+    def compose_bits(self, bits):
+        self.back[:] = bits.to_bytes(len(self.back), "little")
+
+    # ................. end of method: compose_bits .................
+
+    #.................... Method: flip ................
+    # This method shows the frame in the back buffer, writing the boards one
+    # straight after the other, and records when the frame became visible.
+    # It returns the time (ns) at which the last board was written.
+    #
+    def flip(self):
+        shadow = self.shadow
+        boards = self.boards
+        writes = 0
+        for board, value in enumerate(self.back):
+            if shadow[board] != value:
+                boards[board].output_port.value = value
+                shadow[board] = value
+                writes = writes + 1
+        self.visible = self.clock()
+        self.writes = self.writes + writes
+        return self.visible
+
+    # ................. end of method: flip .................
+
+    #.................... Method: write_frame ................
+    # This method sets the output ports of all the boards.
+    # It is passed a list containing one output port value for each board.
+    # It returns the time (ns) at which the frame became visible.
+    #
+    def write_frame(self, frame):
+        self.compose(frame)
+        return self.flip()
+
+    # ................. end of method: write_frame .................
+
+    #.................... Method: write_bits ................
+    # This method sets the output ports of all the boards from one integer,
+    # board 0 in the lowest byte.
+    # It returns the time (ns) at which the frame became visible.
+    #
+    def write_bits(self, bits):
+        self.compose_bits(bits)
+        return self.flip()
+
+    # ................. end of method: write_bits .................
+
+    #.................... Method: all_off ................
+    # This method turns all the LEDs on all the boards OFF
+    #
+    def all_off(self):
+        self.write_frame([CALLLEDSOFF] * len(self.boards))
+
+    # ................. end of method: all_off .................
+
+#=================================================================
@@ -0,0 +1,358 @@
+#!/usr/bin/env python
+
+#==============================================================
+#
+# Authors:      Christine Smythe and Colin Smythe (Dunelm Services Limited)
+# Version:      1.0
+# Release Date: 1st November, 2013
+#
+# Description:  This Python3 program calibrates the latency of the LED
+#               Counting Game's own hardware, so reaction times measured on
+#               different R-Pis and boards can be compared.
+#
+#               A reaction time is measured from the time the LED output layer
+#               reports a configuration visible to the timestamp of the button
+#               interrupt, so it includes the time taken to write the boards,
+#               for the input to be read over SPI and for the interrupt to be
+#               seen.  To measure these an output is wired back to an input
+#               (the loopback) and switched on many times through the same
+#               LED output layer and button input as the game uses: the time
+#               from the flip to the loopback "press" is the latency of the
+#               system itself, as a player with no reaction time would see it.
+#
+#               The median latency is stored in CCALIBRATIONFILE for the board
+#               set it was measured on and is taken off every reaction time the
+#               game measures (see GameEngine.latency_correction).
+#
+#               The calibration can also be run against simulated boards with
+#               delays injected into the board writes and the input, to check
+#               the calibration itself.
+#
+#               Usage:  python3 ledcalibratev1p0p0.py loopback [samples]
+#                           calibrates the boards in the game's geometry
+#                           (see load_geometry()): output 7 of board 0 must
+#                           be wired to input 7 of board 0;
+#                       python3 ledcalibratev1p0p0.py simulate [samples]
+#                           calibrates simulated boards.
+#
+# History:      Original release.
+#
+# Copyright:    2013 (c) Premier Farnell Limited
+#
+# License:      GPLv3+
+#
+#==============================================================
+
+import json
+import os
+import random
+import sys
+from time import perf_counter_ns, sleep, time, strftime, localtime
+from ledboardsv1p0p0 import LEDBoards, load_geometry, init_boards, CNUMBOARDS, CALLLEDSOFF, CNS_PER_SECOND, CNS_PER_MS
+from ledresultsv1p0p0 import RunningStats
+
+#==============================================================
+# Declaration of Constants
+
+# the corrections are kept in this file beside the game
+CCALIBRATIONFILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "calibration.json")
+
+CDEFAULTSAMPLES = 200;  # number of times the loopback is switched on
+CLOOPBACKBOARD = 0;     # the board whose output is wired back to an input
+CLOOPBACKMASK = 0x80;   # the output wired back (output 7)
+CLOOPBACKINPUT = 7;     # the input it is wired to
+CSAMPLETIMEOUT = 0.5;   # seconds to wait for the loopback input
+CSAMPLEGAP = 0.02;      # seconds the loopback is off between samples
+CWAITTIME = 0.0005;     # seconds between looks for the loopback input
+CPERCENTILES = (50, 90, 99);
+
+# the delays injected into the simulated boards
+CSIMWRITETIME = 0.00004;    # seconds one SPI write to a board takes
+CSIMREADTIME = 0.00008;     # seconds to read the inputs over SPI
+CSIMLISTENERTIME = 0.001;   # most seconds before the interrupt is seen
+
+#==============================================================
+
+#.................... Function: calibration_key ................
+# This function returns the name the correction for a set of boards is
+# stored under.
+# It is passed
+#   - backend : the kind of boards ("piface" or "simulated")
+#   - chip_select : the SPI chip select of the boards
+#   - numboards : the number of boards
+#
+def calibration_key(backend, chip_select = 0, numboards = CNUMBOARDS):
+    return backend + " cs" + str(chip_select) + " " + str(numboards) + " boards"
+
+# ..................... end of function : calibration_key .........
+
+#.................... Function: load_correction ................
+# This function returns the correction (ms) stored for a set of boards, or
+# 0.0 if they have not been calibrated
+#
+def load_correction(key, filename = CCALIBRATIONFILE):
+    try:
+        with open(filename) as calibrations:
+            return json.load(calibrations)[key]["correction"]
+    except (IOError, ValueError, KeyError):
+        return 0.0
+
+# ..................... end of function : load_correction .........
+
+#.................... Function: save_calibration ................
+# This function stores the result of a calibration for a set of boards,
+# keeping those of any other boards
+# It is passed
+#   - key : the name of the set of boards (see calibration_key())
+#   - calibration : the Calibration to store
+#
+def save_calibration(key, calibration, filename = CCALIBRATIONFILE):
+    calibrations = {}
+    try:
+        with open(filename) as previous:
+            calibrations = json.load(previous)
+    except (IOError, ValueError):
+        pass
+    calibrations[key] = calibration.summary()
+    with open(filename, "w") as current:
+        json.dump(calibrations, current, indent = 2, sort_keys = True)
+
+# ..................... end of function : save_calibration .........
+
+#==============================================================
+
+class Calibration(object):
+    """ The latencies measured by a calibration and their distribution. """
+
+    def __init__(self, samples, missed):
+        # the latencies measured (ms) in order, and the number of times the
+        # loopback input was not seen
+        self.samples = sorted(samples)
+        self.missed = missed
+        self.stats = RunningStats()
+        for sample in samples:
+            self.stats.add(sample)
+        self.when = time()
+
+    #.................... Method: percentile ................
+    # This method returns a percentile of the latencies (ms), interpolating
+    # between the nearest two
+    #
+    def percentile(self, percent):
+        samples = self.samples
+        position = (len(samples) - 1) * percent / 100.0
+        below = int(position)
+        above = min(below + 1, len(samples) - 1)
+        return samples[below] + (position - below) * (samples[above] - samples[below])
+
+    # ................. end of method: percentile .................
+
+    #.................... Method: correction ................
+    # This method returns the correction (ms) to take off reaction times:
+    # the median latency
+    #
+    def correction(self):
+        return self.percentile(50)
+
+    # ................. end of method: correction .................
+
+    #.................... Method: summary ................
+    # This method returns the calibration as a dictionary to be stored
+    #
+    def summary(self):
+        summary = {"correction" : self.correction(), "samples" : len(self.samples),
+                   "missed" : self.missed, "mean" : self.stats.mean,
+                   "stdev" : self.stats.stdev(), "minimum" : self.stats.minimum,
+                   "maximum" : self.stats.maximum,
+                   "date" : strftime("%d/%m/%Y %H:%M", localtime(self.when))}
+        for percent in CPERCENTILES:
+            summary["p" + str(percent)] = self.percentile(percent)
+        return summary
+
+    # ................. end of method: summary .................
+
+    #.................... Method: report ................
+    # This method returns the distribution of the latencies as text
+    #
+    def report(self):
+        lines = ["Latency of " + str(len(self.samples)) + " samples (" +
+                 str(self.missed) + " missed)"]
+        lines.append("Mean\t\t%.3f ms (stdev %.3f ms)" % (self.stats.mean, self.stats.stdev()))
+        lines.append("Fastest\t\t%.3f ms" % self.stats.minimum)
+        for percent in CPERCENTILES:
+            lines.append("p%d\t\t%.3f ms" % (percent, self.percentile(percent)))
+        lines.append("Slowest\t\t%.3f ms" % self.stats.maximum)
+        lines.append("Correction\t%.3f ms" % self.correction())
+        return "\n".join(lines)
+
+    # ................. end of method: report .................
+
+#==============================================================
+
+class LatencyCalibrator(object):
+    """ Measures the latency of the LED output and button input through a loopback. """
+
+    def __init__(self, leds, buttons, button = CLOOPBACKINPUT, board = CLOOPBACKBOARD,
+                 mask = CLOOPBACKMASK, clock = perf_counter_ns, wait = sleep):
+        # the LED output layer and button input used by the game, the button
+        # the loopback input is reported as and the output wired to it
+        self.leds = leds
+        self.buttons = buttons
+        self.button = button
+        self.board = board
+        self.mask = mask
+        # the game clock and how to wait (seconds) for it to move on
+        self.clock = clock
+        self.wait = wait
+
+    #.................... Method: sample ................
+    # This method switches the loopback output on through the LED output
+    # layer and waits for the loopback input.
+    # It returns the latency (ns) from the flip to the input interrupt, or
+    # None if the input was not seen.
+    #
+    def sample(self):
+        frame = [CALLLEDSOFF] * len(self.leds.boards)
+        frame[self.board] = self.mask
+        self.buttons.clear()
+        self.leds.compose(frame)
+        visible = self.leds.flip()
+        deadline = visible + int(CSAMPLETIMEOUT * CNS_PER_SECOND)
+        event = self.buttons.poll((self.button,))
+        while event is None and self.clock() < deadline:
+            self.wait(CWAITTIME)
+            event = self.buttons.poll((self.button,))
+        # switch the loopback off and let the input settle
+        self.leds.all_off()
+        self.wait(CSAMPLEGAP)
+        if event is None:
+            return None
+        return event.timestamp - visible
+
+    # ................. end of method: sample .................
+
+    #.................... Method: calibrate ................
+    # This method measures the latency a number of times
+    # It is passed samples = the number of times to measure it
+    # It returns the Calibration
+    #
+    def calibrate(self, samples = CDEFAULTSAMPLES):
+        latencies = []
+        missed = 0
+        self.leds.all_off()
+        for number in range(0, samples):
+            latency = self.sample()
+            if latency is None:
+                missed = missed + 1
+            else:
+                latencies.append(latency / CNS_PER_MS)
+        return Calibration(latencies, missed)
+
+    # ................. end of method: calibrate .................
+
+#==============================================================
+
+class DelayPort(object):
+    """ A simulated output port which takes as long as an SPI write. """
+
+    def __init__(self, clock, write_time = CSIMWRITETIME):
+        self.clock = clock
+        self.write_time = write_time
+        self._value = 0
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self.clock.advance_to(self.clock.now + int(self.write_time * CNS_PER_SECOND))
+        self._value = value
+
+#==============================================================
+
+class LoopbackPort(DelayPort):
+    """ A simulated output port wired back to a simulated input. """
+
+    def __init__(self, clock, buttons, button, mask, rng, write_time = CSIMWRITETIME,
+                 read_time = CSIMREADTIME, listener_time = CSIMLISTENERTIME):
+        super(LoopbackPort, self).__init__(clock, write_time)
+        self.buttons = buttons
+        self.button = button
+        self.mask = mask
+        self.rng = rng
+        self.read_time = read_time
+        self.listener_time = listener_time
+
+    @DelayPort.value.setter
+    def value(self, value):
+        switched_on = (value & self.mask) and not (self._value & self.mask)
+        DelayPort.value.fset(self, value)
+        if switched_on:
+            # the input changes when the write completes and is timestamped
+            # once it has been read and the listener has seen it
+            delay = self.read_time + self.rng.uniform(0, self.listener_time)
+            self.buttons.press(self.button, self.clock.now + int(delay * CNS_PER_SECOND))
+
+#==============================================================
+
+class SimulatedBoard(object):
+    """ A simulated PiFace board with the given output port. """
+
+    def __init__(self, port):
+        self.output_port = port
+
+#=================================================================
+
+#.................... Function: simulated_calibrator ................
+# This function sets up a LatencyCalibrator on simulated boards whose writes
+# and loopback input take the injected delays.
+# It is passed
+#   - clock : the VirtualClock the boards and buttons use
+#   - buttons : the SimulatedButtons the loopback input presses
+#   - seed : the seed for the random part of the input delay
+#   - the delays (seconds) injected into the board writes and the input
+#
+def simulated_calibrator(clock, buttons, seed = None, write_time = CSIMWRITETIME,
+                         read_time = CSIMREADTIME, listener_time = CSIMLISTENERTIME):
+    rng = random.Random(seed)
+    ports = [DelayPort(clock, write_time) for board in range(0, CNUMBOARDS)]
+    ports[CLOOPBACKBOARD] = LoopbackPort(clock, buttons, CLOOPBACKINPUT, CLOOPBACKMASK, rng,
+                                         write_time, read_time, listener_time)
+    leds = LEDBoards(CNUMBOARDS, [SimulatedBoard(port) for port in ports], clock.read)
+    wait = lambda seconds: clock.advance_to(clock.now + int(seconds * CNS_PER_SECOND))
+    return LatencyCalibrator(leds, buttons, clock = clock.read, wait = wait)
+
+# ..................... end of function : simulated_calibrator .........
+
+#=================================================================
+# main
+#=================================================================
+
+if __name__ == "__main__":
+    samples = CDEFAULTSAMPLES
+    if len(sys.argv) > 2:
+        samples = int(sys.argv[2])
+    if len(sys.argv) > 1 and sys.argv[1] == "loopback":
+        from ledinputv1p0p0 import ButtonInput
+        # the boards the game is played on, so the game finds the correction
+        geometry = load_geometry()
+        init_boards(geometry.numboards)
+        leds = LEDBoards(geometry.numboards)
+        buttons = ButtonInput(CLOOPBACKBOARD, (CLOOPBACKINPUT,))
+        calibration = LatencyCalibrator(leds, buttons).calibrate(samples)
+        buttons.close()
+        key = calibration_key("piface", 0, geometry.numboards)
+    elif len(sys.argv) > 1 and sys.argv[1] == "simulate":
+        from ledsimulatorv1p0p0 import VirtualClock, SimulatedButtons
+        clock = VirtualClock()
+        calibration = simulated_calibrator(clock, SimulatedButtons(clock)).calibrate(samples)
+        key = calibration_key("simulated")
+    else:
+        print("Usage: python3 ledcalibratev1p0p0.py loopback | simulate [samples]")
+        sys.exit(1)
+    print(key)
+    print(calibration.report())
+    if calibration.samples:
+        save_calibration(key, calibration)
+        print("Correction saved in " + CCALIBRATIONFILE)
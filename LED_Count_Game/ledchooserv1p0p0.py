@@ -22,6 +22,9 @@
 #               This program requires Python3 otherwise the'tkinter' calls will cause
 #               the code to fail.
 #
+#               The LEDs chosen are held as one 32 bit integer, a byte for each
+#               board, and each board is written with one byte.
+#
 # History:      Original release.
 #
 # Copyright:    2013 (c) Premier Farnell Limited
@@ -33,6 +36,7 @@
 from tkinter import *
 from time import sleep
 import pifacedigitalio as pfio
+from ledboardsv1p0p0 import LEDBoards, CNUMBOARDS, CLEDSPERBOARD
 
 #==============================================================
 # Declaration of Constants
@@ -54,6 +58,8 @@ CLED6 = 5;              # LED 5
 CLED7 = 6;              # LED 6
 CLED8 = 7;              # LED 7
 
+CALLLEDSBITS = (1 << (CNUMBOARDS * CLEDSPERBOARD)) - 1;    # every LED on every board ON
+
 #==============================================================
 
 class Application(Frame):
@@ -64,7 +70,13 @@ class Application(Frame):
         self.grid()
         self.master.title("LED Chooser V1.0")
         self.create_widgets()
+        # the LED checkbuttons in the order of the bits of the LEDs: LEDs 1
+        # to 8 of board 1, then those of board 2 and so on
+        self.led_vars = [getattr(self, "led" + str(led) + "board" + str(board))
+                         for board in range (1,CNUMBOARDS+1) for led in range (1,CLEDSPERBOARD+1)]
         pfio.init(True,0,0)
+        # the boards are written a whole byte at a time
+        self.leds = LEDBoards(CNUMBOARDS)
         
     #.................Method: create widgets..........................
     # This creates checkbuttons
@@ -414,21 +426,35 @@ class Application(Frame):
         self.results_txt = Text(self, width = 72, height = 8, wrap = WORD)
         self.results_txt.grid(row = 11, column = 1, columnspan = 4)
 
-    #.................... Method: turnall_on ................
-    # This method turns all the LEDs on all four boards ON
-    # and updates the status display to show all ON
+    #.................... Method: show_leds ................
+    # This method sets all the LEDs from one integer (a bit for each LED,
+    # board 1 in the lowest byte, as the game holds its patterns), writing a
+    # byte to each board, and updates the status display to show them.
     #
-    def turnall_on(self):
+    def show_leds(self, bits):
+        ledOFF=".................."
         ledspacing = "....."
+        self.leds.write_bits(bits)
         status = ""
-        for led in range (0,8,1):
-            for board in range (0,4,1):
-                pfio.digital_write(led,CLEDON,board)
-                status = status + ledspacing + "LED " +str(led+1) + " ON" + ledspacing
+        for led in range (0,CLEDSPERBOARD,1):
+            for board in range (0,CNUMBOARDS,1):
+                if (bits >> (board * CLEDSPERBOARD + led)) & 1:
+                    status = status + ledspacing + "LED " +str(led+1) + " ON" + ledspacing
+                else:
+                    status = status + ledOFF
             status = status + "\n"
         self.results_txt.delete(0.0, END)
         self.results_txt.insert(0.0, status)
 
+    # ................. end of method: show_leds .................
+
+    #.................... Method: turnall_on ................
+    # This method turns all the LEDs on all four boards ON
+    # and updates the status display to show all ON
+    #
+    def turnall_on(self):
+        self.show_leds(CALLLEDSBITS)
+
     # ................. end of method: turnall_on .................
     
     #.................... Method: turnall_off ................
@@ -436,276 +462,22 @@ class Application(Frame):
     # and updates the status display to show all OFF
     #
     def turnall_off(self):
-        ledOFF=".................."
-        status = ""
-        for led in range (0,8,1):
-            for board in range (0,4,1):
-                pfio.digital_write(led,CLEDOFF,board)
-                status = status + ledOFF
-            status = status + "\n"
-        self.results_txt.delete(0.0, END)
-        self.results_txt.insert(0.0, status)
+        self.show_leds(0)
         
     # ................. end of method: turnall_off .................
         
     #.................... Method: update_text ................
     # This method tests each of the LED checkbuttons to see
-    # if the LED should be ON or OFF, setting the LED to the desired state
+    # if the LED should be ON or OFF, setting the LEDs to the desired state
     # and updating the status display.
     #
     def update_text(self):
         """ Update text widget and display LED states. """
-        status = ""
-        status_allLED1=""
-        status_allLED2=""
-        status_allLED3=""
-        status_allLED4=""
-        status_allLED5=""
-        status_allLED6=""
-        status_allLED7=""
-        status_allLED8=""
-        ledOFF=".................."
-        ledspacing = "....."
-
-        # check and update for all 8 board 1 LEDs
-        if self.led1board1.get():
-            pfio.digital_write(CLED1,CLEDON,CBOARD1)   #turn LED on
-            status_allLED1 += ledspacing + "LED 1 ON" + ledspacing
-        else :
-            pfio.digital_write(CLED1,CLEDOFF,CBOARD1)   #turn LED off
-            status_allLED1 += ledOFF
-            
-        if self.led2board1.get():
-            pfio.digital_write(CLED2,CLEDON,CBOARD1)   #turn LED on
-            status_allLED2 += ledspacing + "LED 2 ON" + ledspacing
-        else :
-            pfio.digital_write(CLED2,CLEDOFF,CBOARD1)   #turn LED off
-            status_allLED2 += ledOFF
-            
-        if self.led3board1.get():
-            pfio.digital_write(CLED3,CLEDON,CBOARD1)   #turn LED on
-            status_allLED3 += ledspacing + "LED 3 ON" + ledspacing
-        else :
-            pfio.digital_write(CLED3,CLEDOFF,CBOARD1)   #turn LED off
-            status_allLED3 += ledOFF
-            
-        if self.led4board1.get():
-            pfio.digital_write(CLED4,CLEDON,CBOARD1)   #turn LED on
-            status_allLED4 += ledspacing + "LED 4 ON" + ledspacing
-        else :
-            pfio.digital_write(CLED4,CLEDOFF,CBOARD1)   #turn LED off
-            status_allLED4 += ledOFF       
-
-        if self.led5board1.get():
-            pfio.digital_write(CLED5,CLEDON,CBOARD1)   #turn LED on
-            status_allLED5 += ledspacing + "LED 5 ON" + ledspacing
-        else :
-            pfio.digital_write(CLED5,CLEDOFF,CBOARD1)   #turn LED off
-            status_allLED5 += ledOFF
-
-        if self.led6board1.get():
-            pfio.digital_write(CLED6,CLEDON,CBOARD1)   #turn LED on
-            status_allLED6 += ledspacing + "LED 6 ON" + ledspacing
-        else :
-            pfio.digital_write(CLED6,CLEDOFF,CBOARD1)   #turn LED off
-            status_allLED6 += ledOFF
-        
-        if self.led7board1.get():
-            pfio.digital_write(CLED7,CLEDON,CBOARD1)   #turn LED on
-            status_allLED7 += ledspacing + "LED 7 ON" + ledspacing
-        else :
-            pfio.digital_write(CLED7,CLEDOFF,CBOARD1)   #turn LED off
-            status_allLED7 += ledOFF
-
-        if self.led8board1.get():
-            pfio.digital_write(CLED8,CLEDON,CBOARD1)   #turn LED on
-            status_allLED8 += ledspacing + "LED 8 ON" + ledspacing
-        else :
-            pfio.digital_write(CLED8,CLEDOFF,CBOARD1)   #turn LED off
-            status_allLED8 += ledOFF
-            
-        #  check and update for all 8 board 1 LEDs
-        
-        if self.led1board2.get():
-            pfio.digital_write(CLED1,CLEDON,CBOARD2)   #turn LED on
-            status_allLED1 += ledspacing + "LED 1 ON" + ledspacing
-        else :
-            pfio.digital_write(CLED1,CLEDOFF,CBOARD2)   #turn LED off
-            status_allLED1 += ledOFF
-
-        if self.led2board2.get():
-            pfio.digital_write(CLED2,CLEDON,CBOARD2)   #turn LED on
-            status_allLED2 += ledspacing + "LED 2 ON" + ledspacing
-        else :
-            pfio.digital_write(CLED2,CLEDOFF,CBOARD2)   #turn LED off
-            status_allLED2 += ledOFF
-
-        if self.led3board2.get():
-            pfio.digital_write(CLED3,CLEDON,CBOARD2)   #turn LED on
-            status_allLED3 += ledspacing + "LED 3 ON" + ledspacing
-        else :
-            pfio.digital_write(CLED3,CLEDOFF,CBOARD2)   #turn LED off
-            status_allLED3 += ledOFF
-
-        if self.led4board2.get():
-            pfio.digital_write(CLED4,CLEDON,CBOARD2)   #turn LED on
-            status_allLED4 += ledspacing + "LED 4 ON" + ledspacing
-        else :
-            pfio.digital_write(CLED4,CLEDOFF,CBOARD2)   #turn LED off
-            status_allLED4 += ledOFF
-
-        if self.led5board2.get():
-            pfio.digital_write(CLED5,CLEDON,CBOARD2)   #turn LED on
-            status_allLED5 += ledspacing + "LED 5 ON" + ledspacing
-        else :
-            pfio.digital_write(CLED5,CLEDOFF,CBOARD2)   #turn LED off
-            status_allLED5 += ledOFF
-
-        if self.led6board2.get():
-            pfio.digital_write(CLED6,CLEDON,CBOARD2)   #turn LED on
-            status_allLED6 += ledspacing + "LED 6 ON" + ledspacing
-        else :
-            pfio.digital_write(CLED6,CLEDOFF,CBOARD2)   #turn LED off
-            status_allLED6 += ledOFF
-       
-        if self.led7board2.get():
-            pfio.digital_write(CLED7,CLEDON,CBOARD2)   #turn LED on
-            status_allLED7 += ledspacing + "LED 7 ON" + ledspacing
-        else :
-            pfio.digital_write(CLED7,CLEDOFF,CBOARD2)   #turn LED off
-            status_allLED7 += ledOFF
-
-        if self.led8board2.get():
-            pfio.digital_write(CLED8,CLEDON,CBOARD2)   #turn LED on
-            status_allLED8 += ledspacing + "LED 8 ON" + ledspacing
-        else :
-            pfio.digital_write(CLED8,CLEDOFF,CBOARD2)   #turn LED off
-            status_allLED8 += ledOFF
-        
-
-        #  check and update for all 8 board 3 LEDs
-        
-        if self.led1board3.get():
-            pfio.digital_write(CLED1,CLEDON,CBOARD3)   #turn LED on
-            status_allLED1 += ledspacing + "LED 1 ON" + ledspacing
-        else :
-            pfio.digital_write(CLED1,CLEDOFF,CBOARD3)   #turn LED off
-            status_allLED1 += ledOFF
-
-        if self.led2board3.get():
-            pfio.digital_write(CLED2,CLEDON,CBOARD3)   #turn LED on
-            status_allLED2 += ledspacing + "LED 2 ON" + ledspacing
-        else :
-            pfio.digital_write(CLED2,CLEDOFF,CBOARD3)   #turn LED off
-            status_allLED2 += ledOFF
-
-        if self.led3board3.get():
-            pfio.digital_write(CLED3,CLEDON,CBOARD3)   #turn LED on
-            status_allLED3 += ledspacing + "LED 3 ON" + ledspacing
-        else :
-            pfio.digital_write(CLED3,CLEDOFF,CBOARD3)   #turn LED off
-            status_allLED3 += ledOFF
-
-        if self.led4board3.get():
-            pfio.digital_write(CLED4,CLEDON,CBOARD3)   #turn LED on
-            status_allLED4 += ledspacing + "LED 4 ON" + ledspacing
-        else :
-            pfio.digital_write(CLED4,CLEDOFF,CBOARD3)   #turn LED off
-            status_allLED4 += ledOFF
-
-        if self.led5board3.get():
-            pfio.digital_write(CLED5,CLEDON,CBOARD3)   #turn LED on
-            status_allLED5 += ledspacing + "LED 5 ON" + ledspacing
-        else :
-            pfio.digital_write(CLED5,CLEDOFF,CBOARD3)   #turn LED off
-            status_allLED5 += ledOFF
-
-        if self.led6board3.get():
-            pfio.digital_write(CLED6,CLEDON,CBOARD3)   #turn LED on
-            status_allLED6 += ledspacing + "LED 6 ON" + ledspacing
-        else :
-            pfio.digital_write(CLED6,CLEDOFF,CBOARD3)   #turn LED off
-            status_allLED6 += ledOFF
-       
-        if self.led7board3.get():
-            pfio.digital_write(CLED7,CLEDON,CBOARD3)   #turn LED on
-            status_allLED7 += ledspacing + "LED 7 ON" + ledspacing
-        else :
-            pfio.digital_write(CLED7,CLEDOFF,CBOARD3)   #turn LED off
-            status_allLED7 += ledOFF
-
-        if self.led8board3.get():
-            pfio.digital_write(CLED8,CLEDON,CBOARD3)   #turn LED on
-            status_allLED8 += ledspacing + "LED 8 ON" + ledspacing
-        else :
-            pfio.digital_write(CLED8,CLEDOFF,CBOARD3)   #turn LED off
-            status_allLED8 += ledOFF
-
-        #  check and update for all 8 board 4 LEDs
-        
-        if self.led1board4.get():
-            pfio.digital_write(CLED1,CLEDON,CBOARD4)   #turn LED on
-            status_allLED1 += ledspacing + "LED 1 ON" + ledspacing
-        else :
-            pfio.digital_write(CLED1,CLEDOFF,CBOARD4)   #turn LED off
-            status_allLED1 += ledOFF
-
-        if self.led2board4.get():
-            pfio.digital_write(CLED2,CLEDON,CBOARD4)   #turn LED on
-            status_allLED2 += ledspacing + "LED 2 ON" + ledspacing
-        else :
-            pfio.digital_write(CLED2,CLEDOFF,CBOARD4)   #turn LED off
-            status_allLED2 += ledOFF
-
-        if self.led3board4.get():
-            pfio.digital_write(CLED3,CLEDON,CBOARD4)   #turn LED on
-            status_allLED3 += ledspacing + "LED 3 ON" + ledspacing
-        else :
-            pfio.digital_write(CLED3,CLEDOFF,CBOARD4)   #turn LED off
-            status_allLED3 += ledOFF
-
-        if self.led4board4.get():
-            pfio.digital_write(CLED4,CLEDON,CBOARD4)   #turn LED on
-            status_allLED4 += ledspacing + "LED 4 ON" + ledspacing
-        else :
-            pfio.digital_write(CLED4,CLEDOFF,CBOARD4)   #turn LED off
-            status_allLED4 += ledOFF
-
-        if self.led5board4.get():
-            pfio.digital_write(CLED5,CLEDON,CBOARD4)   #turn LED on
-            status_allLED5 += ledspacing + "LED 5 ON" + ledspacing
-        else :
-            pfio.digital_write(CLED5,CLEDOFF,CBOARD4)   #turn LED off
-            status_allLED5 += ledOFF
-
-        if self.led6board4.get():
-            pfio.digital_write(CLED6,CLEDON,CBOARD4)   #turn LED on
-            status_allLED6 += ledspacing + "LED 6 ON" + ledspacing
-        else :
-            pfio.digital_write(CLED6,CLEDOFF,CBOARD4)   #turn LED off
-            status_allLED6 += ledOFF
-       
-        if self.led7board4.get():
-            pfio.digital_write(CLED7,CLEDON,CBOARD4)   #turn LED on
-            status_allLED7 += ledspacing + "LED 7 ON" + ledspacing
-        else :
-            pfio.digital_write(CLED7,CLEDOFF,CBOARD4)   #turn LED off
-            status_allLED7 += ledOFF
-
-        if self.led8board4.get():
-            pfio.digital_write(CLED8,CLEDON,CBOARD4)   #turn LED on
-            status_allLED8 += ledspacing + "LED 8 ON" + ledspacing
-        else :
-            pfio.digital_write(CLED8,CLEDOFF,CBOARD4)   #turn LED off
-            status_allLED8 += ledOFF
-
-        # Finally update the status display for all LEDs on all boards
-        status = status + status_allLED1 + "\n" + status_allLED2 + "\n"
-        status = status + status_allLED3 + "\n" + status_allLED4 + "\n"
-        status = status + status_allLED5 + "\n" + status_allLED6 + "\n"
-        status = status + status_allLED7 + "\n" + status_allLED8 + "\n"
-        self.results_txt.delete(0.0, END)
-        self.results_txt.insert(0.0, status)
+        bits = 0
+        for bit, checked in enumerate(self.led_vars):
+            if checked.get():
+                bits = bits | (1 << bit)
+        self.show_leds(bits)
 
         # end of method: update_text..............................
 
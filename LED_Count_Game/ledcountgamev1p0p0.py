@@ -11,6 +11,19 @@
 #               This program requires Python3 otherwise the'tkinter' calls will cause
 #               the code to fail.
 #
+#               Without the PiRack and PiFace boards the LEDs are drawn in the
+#               window and the game is played from the keyboard (s or space for
+#               start, 1 to 4 for the columns, x or Escape for stop).  Commands
+#               can also be sent to UDP port 8014 on this R-Pi (see
+#               ledmultiplexv1p0p0.py).
+#
+#               The number of boards and LEDs in each column are read from
+#               geometry.json if there is one (see ledboardsv1p0p0.py).  The
+#               buttons for columns 5 onwards are inputs 6 and 7 of the button
+#               board and then the inputs of the board after it.  The blank
+#               (and fixation) before each configuration and their jitter are
+#               read from timing.json if there is one (see ledtrialsv1p0p0.py).
+#
 # History:      Original release.
 #
 # Copyright:    2013 (c) Premier Farnell Limited
@@ -20,9 +33,24 @@
 #==============================================================
 
 from tkinter import *
-from time import sleep
-import pifacedigitalio as pfio
-import random
+from time import perf_counter_ns, strftime, localtime
+try:
+    import pifacedigitalio as pfio
+except ImportError:
+    # played on the screen
+    pfio = None
+from ledboardsv1p0p0 import LEDBoards, load_geometry, init_boards, CNS_PER_MS
+from ledmultiplexv1p0p0 import InputMultiplexer, KeyboardInput, SocketInput, add_piface_inputs
+from ledmultiplexv1p0p0 import game_keymap, game_commands
+from ledscreenv1p0p0 import LEDScreen
+from ledgameenginev1p0p0 import GameEngine, CCONFIGS_ROW, CDEFAULTPLAYER
+from ledgameprocessv1p0p0 import GameProcess, build_hardware_game
+from ledhistoryv1p0p0 import GameHistory
+from ledrecordv1p0p0 import GameRecorder
+from ledcalibratev1p0p0 import calibration_key, load_correction
+from ledtrialsv1p0p0 import load_schedule
+from ledspectatorv1p0p0 import SpectatorFeed
+from ledresultstablev1p0p0 import ResultsTable
 
 #==============================================================
 # Declaration of Constants
@@ -44,43 +72,30 @@ CLED6 = 5;              # LED 5
 CLED7 = 6;              # LED 6
 CLED8 = 7;              # LED 7
 
-CMAXCONFIGS = 255;      # The maximum number of configurations
+CENDLESSCONFIGS = 0;    # the number of configurations for a game played until STOP
 CDEFAULTCONFIGS = 10;   # The default number of configurations
+CMAXCONFIGS = 1000000000; # the most configurations a game can be given
 CDEFAULTSPEED = 5000;   # default game speed set to maximum of 5000 = 5 seconds
+CSEEDLIMIT = 1 << 63;   # seeds typed in must be less than this either side of 0 (to be recorded)
 
-CSTARTBUTTON = 0;       # start button is button 0 on board 0
-CLEDCOL1_BUTTON = 1;    # button to choose LED column 1
-CLEDCOL2_BUTTON = 2;    # button to choose LED column 2
-CLEDCOL3_BUTTON = 3;    # button to choose LED column 3
-CLEDCOL4_BUTTON = 4;    # button to choose LED column 4
-CSTOPBUTTON = 5;        # Stop button is button 5 on board 0
 CBOARDwithBUTTONS = 0;  # the piface with the buttons wired is board 0
 CSTR_LEDON = "ON";
 CSTR_LEDOFF = "OFF";
 
-# constants for accessing elements of player results table
-C_correct_column =0;
-C_player_answer =1;
-C_player_correct = 2;
-C_player_time = 3;
-
-#constants for putting text on correct line in choices panel
-CCONFIGS_ROW = 0.0;
-CSPEED_ROW = 2.0;
-CREADYTOSTART_ROW = 4.0;
-CSTARTED_ROW = 6.0;
-CSTOPPED_ROW = 7.0;
-CFINISHED_ROW = 7.0;
+CFRAMETIME = 10;        # most ms between updates of the game whilst it is being played
+CGAMEPROCESS = True;    # on the PiRack, run the game loop in a process of its own
 
 
 
 
 CINSTRUCTIONS = """How to play the LED Counting Game: 
-1. Choose how many configurations you want to play 1 to 255.
+1. Choose how many configurations you want to play - as many as you like, or 0 to keep playing until you press STOP.
 2. Choose how quickly you have to choose the right one - from 200ms up to 5000ms ( 0.2 seconds to 5 seconds).
+   Tick Adaptive for the speed to get faster or slower to suit how well you are playing.
 3. Press start to initialise the game.
 4. The LEDs on the game board will flash in a quadrant pattern until you press the start button on the game board.
 5. You then have to choose which column has the most LEDs lit and press the game button for that column.
+   Without the game board press s to start, 1 to 4 for the columns and x to stop.
 6. When you have finished the results will be displayed on the screen.
 Good Luck!
 """
@@ -90,27 +105,117 @@ Good Luck!
 class Application(Frame):
     """ GUI Application for LED Counting Game. """
 
+    # the results are shown in the results table as each is given to
+    # show_result(), so the game does not need to build their text
+    results_text = False
+
     def __init__(self, master):
         super(Application, self).__init__(master)  
         self.grid()
         self.master.title("LED Counting Game V1.0")
+        # the game setup until SETUP GAME is pressed - the defaults used for
+        # empty entries, so START works before the game is setup
+        self.configs = CDEFAULTCONFIGS
+        self.speed = CDEFAULTSPEED
+        self.seed = None
         # initialise the GUI window ready for user interaction
         self.create_widgets()
+        # the number of boards and the LEDs in each column
+        self.geometry = load_geometry()
+        columns = self.geometry.columns
         # initialise the PiFace digital i/o package
         # so we can control the boards and hence the LEDs
-        pfio.init(True,0,0)
+        self.hardware = False
+        if pfio is not None:
+            try:
+                init_boards(self.geometry.numboards)
+                self.hardware = True
+            except Exception:
+                # no PiRack attached (or SPI is not enabled)
+                pass
+        # the history of all the games played
+        self.history = GameHistory()
+        self.process = None
+        if self.hardware and CGAMEPROCESS:
+            # the game is played in a process of its own, with the boards, the
+            # game board buttons and the input socket, so that nothing done
+            # in this window can hold it up (see ledgameprocessv1p0p0.py).
+            # It displays everything through this window and the keys are
+            # sent to it
+            self.process = GameProcess(self, build_hardware_game,
+                                       (self.geometry.numboards, self.geometry.ledspercolumn))
+            self.game = self.process
+            self.buttons = KeyboardInput(self.master, game_keymap(columns))
+            self.buttons.attach(self.process)
+        else:
+            self.create_game()
+        # spectators can follow the game in a browser on the local network
+        # (the game is played without the feed if it cannot be started)
+        self.feed = SpectatorFeed()
+        try:
+            self.feed.start()
+            self.game.feed = self.feed
+        except OSError:
+            self.feed = None
+        # the analysis of the history (made when it is first asked for)
+        self.analytics = None
+        self.update_id = None
+
+    #.................... Method: create_game ................
+    # This method creates the game played in this window's own thread, on
+    # the boards or else on the LEDs drawn in the window
+    #
+    def create_game(self):
+        columns = self.geometry.columns
+        # the output layer that writes the LEDs a whole board at a time, to
+        # the boards or else to the LEDs drawn in this window
+        if self.hardware:
+            self.leds = LEDBoards(self.geometry.numboards)
+        else:
+            self.screen = LEDScreen(self, self.geometry)
+            self.screen.grid(row = 18, column = 0)
+            self.leds = LEDBoards(boards = self.screen.boards)
+        # the presses from the buttons on the game board, the keyboard and
+        # commands sent to the input socket, all in the one queue
+        self.buttons = InputMultiplexer()
+        if self.hardware:
+            add_piface_inputs(self.buttons, columns, CBOARDwithBUTTONS)
+        self.buttons.add("keyboard", KeyboardInput(self.master, game_keymap(columns)))
+        try:
+            self.buttons.add("socket", SocketInput(commands = game_commands(columns)))
+        except OSError:
+            # the port is in use - the game is played without it
+            pass
+        # the game itself, which displays everything through this window
+        self.game = GameEngine(self.leds, self.buttons, self, self.history, self.geometry,
+                               load_schedule())
+        # every game is recorded so that it can be replayed
+        self.game.recorder = GameRecorder()
+        # the reaction times are corrected by the latency found by
+        # calibrating the boards (python3 ledcalibratev1p0p0.py loopback)
+        if self.hardware:
+            self.game.latency_correction = load_correction(calibration_key("piface", 0, len(self.leds.boards)))
+        # the game is updated as soon as a game board button is pressed
+        self.bind("<<GameButton>>", self.button_event)
+        self.buttons.on_press = self.button_pressed
+
+    # ................. end of method: create_game .................
         
     #.................Method: create widgets..........................
     # This creates the GUI by setting up ....
     #   - the instructions
+    #   - the text and entry for the player to enter their name
     #   - the text and entry for the player to enter game speed
     #   - the text and entry for the player to enter number of configurations
+    #   - the text and entry for the player to enter the game seed
     #   - SETUP checkbutton
     #   - START checkbutton
+    #   - STOP checkbutton
+    #   - LEADERBOARD, PERSONAL BEST and ANALYTICS buttons
     #   - the text area for game choices
-    #   - the text area for results
+    #   - the table of results, and the text area for the leaderboards and
+    #     analytics shown in its place
     #   - the text area for statistics
-    #   - the data table to store the player results
     #
     def create_widgets(self):
         """ Create widgets for LED choices. """    
@@ -118,203 +223,158 @@ class Application(Frame):
         # setup the instruction label
         Label(self, text = CINSTRUCTIONS).grid(row = 0, column = 0, rowspan = 1, columnspan = 3)
         
+        # setup the widgets to get the player's name
+        Label(self, text = "Enter Player Name:").grid(row = 2, column = 0)
+        self.player_ent = Entry(self)
+        self.player_ent.grid(row = 3, column = 0)
+
         # setup the widgets to get the number of configurations
-        Label(self, text = "Enter Number of Configurations 1 to 255:").grid(row = 2,
+        Label(self, text = "Enter Number of Configurations (0 = until STOP):").grid(row = 4,
                                                                     column = 0)
         self.configs_ent = Entry(self)
-        self.configs_ent.grid(row = 3, column = 0)
+        self.configs_ent.grid(row = 5, column = 0)
 
 
         # setup the widgets to get the time interval
-        Label(self, text = "Enter speed 200 to 5000 ms : ").grid(row = 4,
+        Label(self, text = "Enter speed 200 to 5000 ms : ").grid(row = 6,
                                                         column = 0)
         self.speed_ent = Entry(self)
-        self.speed_ent.grid(row = 5, column = 0) 
+        self.speed_ent.grid(row = 7, column = 0) 
+        # tick for the speed to adapt to the player, starting at the speed given
+        self.adaptive_var = IntVar()
+        Checkbutton(self, text = "Adaptive", variable = self.adaptive_var).grid(row = 7,
+                                                        column = 0, sticky = E)
+
+        # setup the widgets to get the seed for the random patterns
+        # (leave blank for a new random game)
+        Label(self, text = "Enter game seed to replay a game (optional) : ").grid(row = 8,
+                                                        column = 0)
+        self.seed_ent = Entry(self)
+        self.seed_ent.grid(row = 9, column = 0)
 
         # create 'SETUP GAME' button
         Button( self,
                 text = "SETUP GAME",
                 command = self.choose_game_setup,
                     bg='yellow'
-                ).grid(row=6, column = 0, sticky = W+E+N+S)      
+                ).grid(row=10, column = 0, sticky = W+E+N+S)      
        
         # create 'START GAME' button
         Button( self,
                 text = "START GAME",
                 command = self.start_game,
                     bg='green'
-                ).grid(row=7, column = 0, sticky = W+E+N+S)
+                ).grid(row=11, column = 0, sticky = W+E+N+S)
+
+        # create 'STOP GAME' button
+        Button( self,
+                text = "STOP GAME",
+                command = self.stop_game,
+                    bg='red'
+                ).grid(row=12, column = 0, sticky = W+E+N+S)
+
+        # create 'LEADERBOARD' button
+        Button( self,
+                text = "LEADERBOARD",
+                command = self.show_leaderboard,
+                    bg='orange'
+                ).grid(row=13, column = 0, sticky = W+E+N+S)
+
+        # create 'PERSONAL BEST' button
+        Button( self,
+                text = "PERSONAL BEST",
+                command = self.show_personal_best,
+                    bg='orange'
+                ).grid(row=14, column = 0, sticky = W+E+N+S)
+
+        # create 'ANALYTICS' button
+        Button( self,
+                text = "ANALYTICS",
+                command = self.show_analytics,
+                    bg='orange'
+                ).grid(row=15, column = 0, sticky = W+E+N+S)
         
       # create text field to display the choices
         self.choices_txt = Text(self, width = 45, height = 7, wrap = WORD)
-        self.choices_txt.grid(row = 9, column = 0, columnspan = 1)
+        self.choices_txt.grid(row = 16, column = 0, columnspan = 1)
         # create text field to display the statistics
-        self.stats_txt = Text(self, width = 45, height = 8, wrap = WORD)
-        self.stats_txt.grid(row = 10, column = 0, columnspan = 1)
-        # create text field to display the results
+        self.stats_txt = Text(self, width = 45, height = 10, wrap = WORD)
+        self.stats_txt.grid(row = 17, column = 0, columnspan = 1)
+        # create the table of results, and the text field to display the
+        # leaderboards and analytics in the same place
+        self.results_table = ResultsTable(self)
+        self.results_table.grid(row = 1, column = 1, columnspan = 1, rowspan = 17)
         self.results_txt = Text(self, width = 55, height = 25, wrap = WORD)
-        self.results_txt.grid(row = 1, column = 1, columnspan = 1, rowspan = 10)
-
-        # create list of player results
-        # each row represents the results of a presented configuration
-        # each row contain:
-        # column 0 correct_column   values 1,2 3,4 or 0 if game not yet run
-        # column 1 player_answer    values 1,2,3,4 or 0(if no answer given)
-        # column 2 player_correct   value       True if player_answer = correct_column
-        #                           otherwise   False
-        # column 3 player_time      time the player took to press button or
-        #                           the maximum time(i.e.speed chosen) + 1 if timed out
-        
-        self.player_results= [[0,0,0,-1],# element 0 not used
-                              [0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],
-                              [0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],
-                              [0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],
-                              [0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],
-                              [0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],
-                              [0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],
-                              [0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],
-                              [0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],
-                              [0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],
-                              [0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],#60
-                              [0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],
-                              [0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],
-                              [0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],
-                              [0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],
-                              [0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],
-                              [0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],
-                              [0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],
-                              [0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],
-                              [0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],
-                              [0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],#120
-                              [0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],
-                              [0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],
-                              [0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],
-                              [0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],
-                              [0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],
-                              [0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],
-                              [0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],
-                              [0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],
-                              [0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],
-                              [0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],#180
-                              [0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],
-                              [0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],
-                              [0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],
-                              [0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],
-                              [0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],
-                              [0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],
-                              [0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],
-                              [0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],
-                              [0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],
-                              [0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],#240
-                              [0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],
-                              [0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],[0,0,0,-1],#252
-                              [0,0,0,-1],[0,0,0,-1],[0,0,0,-1]]
-
-        # create list of leds to be lit for a configuration 
-        #
-        #the number of LEDs to be lit in each column
-        self.LEDs_in_column = [0,0,0,0]
-
-        # rows 1-8 :a list of up to 8 LEDs for each column which need to be lit
-        self.random_LEDs =[[0,0,0,0],[0,0,0,0],[0,0,0,0],[0,0,0,0],
-                          [0,0,0,0],[0,0,0,0],[0,0,0,0],[0,0,0,0]]
+        self.results_txt.grid(row = 1, column = 1, columnspan = 1, rowspan = 17)
+        self.results_txt.grid_remove()
 
+    
     # ................. end of method: create widgets .................
  
     #.................... Method: start_game ................
-    # This method sets the time interval and number of configurations
-    # chosen by the player. then lights turns on and off each quadrant
-    # of the LEDs until the player presses the gameboard start button.
-    # then runs the game.
+    # This method starts the game with the number of configurations and
+    # speed chosen by the player.  The game itself runs as a state machine
+    # (see ledgameenginev1p0p0.py) which is advanced from a Tk timer every
+    # frame so that the window stays responsive whilst the game is played.
+    # A game in its own process advances itself, and the timer shows what
+    # it has displayed.
     #
     def start_game(self):
-        status= ""
-        self.choices_txt.delete(CSTARTED_ROW, END)
-        self.choices_txt.insert(CSTARTED_ROW, status)
-        self.timeout = 0
-        self.quadrant_circuit =0
-        self.quadrant_timer = 0
-        self.StartButton_pressed = False  # True if START button on screen is pressed
-        self.StopSwitch  = False          # True if STOP switch on game is pressed
-        self.Switch_pressed = False       # True if STOP button or Stop Switch or any column button is pressed
-        count = 1
-        #first empty the results table ready for new results
-        for config in range (1,255):
-            self.player_results[config][C_correct_column] = 0
-            self.player_results[config][C_player_answer] = 0
-            self.player_results[config][C_player_correct] = 0
-            self.player_results[config][C_player_time] = -1
-
-        # next make sure all LEDs are off
-        self.turnall_off()
-        # clear the statistics and results tables ready for new stats and results
-        self.stats_txt.delete(0.0, END)
-        self.results_txt.delete(0.0, END)
+        self.game.start_game(self.configs, self.speed, perf_counter_ns(), self.seed, self.player_name(),
+                             self.adaptive_var.get() == 1)
+        self.schedule_update()
 
-        #then start the quadrant pattern
-        # whilst not timed out and start switch not pressed
-        while (self.timeout < 1050                      # Player hasn't timedout
-               and self.StartButton_pressed== False     # player hasn't pressed Start Switch
-               and self.StopSwitch == False):           # player hasn't pressed Stop Switch
-            # get current state of switches
-            self.StartButton_pressed = pfio.digital_read (CSTARTBUTTON, CBOARDwithBUTTONS);
-            self.StopSwitch  = pfio.digital_read (CSTOPBUTTON , CBOARDwithBUTTONS);
-            if self.StartButton_pressed == False and self.StopSwitch ==False :
-                if self.quadrant_timer == 0:
-                   self.quadrant_on_off ( 4 , CLEDOFF )
-                   self.quadrant_on_off ( 1 , CLEDON )
-                   self.quadrant_circuit = 2
-                elif self.quadrant_timer == 50:
-                    self.quadrant_on_off ( 1 , CLEDOFF )
-                    self.quadrant_on_off ( 2 , CLEDON )
-                    self.quadrant_circuit = 3
-
-                elif self.quadrant_timer == 100:
-                    self.quadrant_on_off ( 2 , CLEDOFF )
-                    self.quadrant_on_off ( 3 , CLEDON )
-                    self.quadrant_circuit = 4
-
-                elif self.quadrant_timer == 150:
-                    self.quadrant_on_off ( 3 , CLEDOFF )
-                    self.quadrant_on_off ( 4 , CLEDON )
-                    self.quadrant_circuit = 1
-                    
-                elif self.quadrant_timer == 199 :
-                    self.quadrant_timer = -1
-                
-            self.timeout = self.timeout +1
-            self.quadrant_timer = self.quadrant_timer +1
-            sleep(0.01)
-
-        if self.timeout == 1050: # player hasn't pressed start quick enough
-            status = status + "\nGame Start Timeout"
-            status = status + " - press the Game board start button quicker!"
-            self.choices_txt.delete(CSTARTED_ROW, END)
-            self.choices_txt.insert(CSTARTED_ROW, status)
-            self.turnall_off()
-        elif self.StopSwitch == True : # player has pressed Stop Switch
-            self.stop_game()
-            status = "\nGame stopped"
-            self.choices_txt.delete(CSTOPPED_ROW, END)
-            self.choices_txt.insert(CSTOPPED_ROW, status)
-            self.stats_txt.delete(0.0, END)
-            self.results_txt.delete(0.0, END)
-        else: # player has pressed start switch
-            status = "\nGame started"
-            self.choices_txt.delete(CSTARTED_ROW, END)
-            self.choices_txt.insert(CSTARTED_ROW, status)
-            self.stats_txt.delete(0.0, END)
-            self.results_txt.delete(0.0, END)
-            while self.StopSwitch == False and count <self.configs+1:
-                self.generate_random_LEDs(count)
-                self.process_config(count, self.speed)
-                count = count +1
-            self.calculate_results(count-1, self.speed)
-            self.calculate_statistics(count-1, self.speed)
-            
     # ................. end of method: start_game .................
 
-     
+    #.................... Method: schedule_update ................
+    # This method arranges for the game to be updated when it next needs to
+    # be (e.g. the next animation frame or timeout) or within CFRAMETIME ms
+    # if that is sooner (unless an update is already waiting)
+    #
+    def schedule_update(self):
+        if self.update_id is None:
+            delay = CFRAMETIME
+            now = perf_counter_ns()
+            deadline = self.game.next_update(now)
+            if deadline is not None:
+                # the whole ms up to the deadline, rounded up
+                delay = max(0, min(delay, -((now - deadline) // CNS_PER_MS)))
+            self.update_id = self.after(delay, self.update_game)
+
+    # ................. end of method: schedule_update .................
+
+    #.................... Method: update_game ................
+    # This method is called by the Tk timer every frame whilst a game is in
+    # progress.  It advances the game and then waits for the next frame.
+    #
+    def update_game(self):
+        self.update_id = None
+        self.game.update(perf_counter_ns())
+        if self.game.running():
+            self.schedule_update()
+
+    # ................. end of method: update_game .................
+
+    #.................... Method: button_pressed ................
+    # This method is called by the input (maybe in its own thread) when a
+    # game button is pressed.  It tells the GUI thread about the press.
+    #
+    def button_pressed(self, event):
+        self.event_generate("<<GameButton>>", when = "tail")
+
+    # ................. end of method: button_pressed .................
+
+    #.................... Method: button_event ................
+    # This method updates the game straight away when a game board button is
+    # pressed rather than waiting for the next scheduled update
+    #
+    def button_event(self, event):
+        if self.update_id is not None:
+            self.after_cancel(self.update_id)
+            self.update_game()
+
+    # ................. end of method: button_event .................
+
     #.................... Method: choose_game_setup ................
     # This method validates and sets the speed and number of
     # configurations chosen by the player.
@@ -330,13 +390,15 @@ class Application(Frame):
         try:
             self.configs = int(contents)
         except:
-            self.configs = CMAXCONFIGS + 1
+            self.configs = CENDLESSCONFIGS - 1
 
-        if self.configs<1 or self.configs>CMAXCONFIGS:
+        if self.configs<CENDLESSCONFIGS or self.configs>CMAXCONFIGS:
             # number given out of bounds so set to default 10
             self.configs = CDEFAULTCONFIGS
             status = status + "Invalid Number of Game configurations chosen.\n   Default used - set at "
             status = status + str(self.configs)
+        elif self.configs == CENDLESSCONFIGS:
+            status = status + "Number of Game configurations chosen : until STOP is pressed"
         else:
             status = status + "Number of Game configurations chosen :" + str(self.configs)
 
@@ -353,7 +415,24 @@ class Application(Frame):
             status = status + "\nInvalid game speed chosen. \n   Default used - set at " + str(self.speed)
         else:
             status =status = status + "\nGame speed chosen : " + str(self.speed)
-        status = status +"\nReady to start"
+        if self.adaptive_var.get() == 1:
+            status = status + " (adaptive)"
+
+        #now get the seed, if there is one
+        contents = self.seed_ent.get().strip()
+        try:
+            self.seed = int(contents)
+        except:
+            # no seed (or an invalid one) so a new one is chosen for each game
+            self.seed = None
+        if self.seed is not None and not -CSEEDLIMIT <= self.seed < CSEEDLIMIT:
+            # too big to be recorded so a new one is chosen for each game
+            self.seed = None
+            status = status + "\nInvalid seed chosen. \n   A new seed is used for each game"
+        if self.seed is None:
+            status = status +"\nReady to start"
+        else:
+            status = status +"\nReady to start - seed " + str(self.seed)
 
         self.choices_txt.delete(CCONFIGS_ROW, END)
         self.choices_txt.insert(CCONFIGS_ROW, status)
@@ -365,380 +444,174 @@ class Application(Frame):
 
     #.................... Method: stop_game ................
     # This method stops the current game in play.
+    # It is called when the on-screen STOP GAME button is pressed.
     #
     def stop_game(self):
-        status = ""
-        self.Stopswitch = True
-        self.Switch_pressed = False
-        self.turnall_off()
-        status = "\nGame stopped"
-        
-        self.choices_txt.delete(CSTOPPED_ROW, END)
-        self.choices_txt.insert(CSTOPPED_ROW, status)
+        self.game.stop_pressed()
 
     # ................. end of method: stop_game .................
-    
-    #.................... Method: turnall_off ................
-    # This method turns all the LEDs on all four boards OFF
+
+    #.................... Method: player_name ................
+    # This method returns the name the player typed on the screen
+    # (or the default name if none was typed)
     #
-    def turnall_off(self):
-        # for each LED on each BOARD turn the led off
-        for led in range (0,8,1):
-            for board in range (0,4,1):
-                pfio.digital_write(led,CLEDOFF,board)      
-    # ................. end of method: turnall_off .................
-
-    #.................... Method: quadrant_on_off ................
-    # This method turns on or off all the LEDs in a quadrant of the board.
-    # 1 = Top Left Quadrant     = LEDs 4 to 7 on boards 0 and 1
-    # 2 = top right quadrant    = LEDs 4 to 7 on boards 2 and 3
-    # 3 = bottom right quadrant = LEDs 0 to 3 on boards 2 and 3
-    # 4 = bottom left quadrant  = LEDs 0 to 3 on boards 0 and 1
-    # It is passed the following parameters:
-    #   - quadrant = the quadrant number
-    #   - on_off   = whether the quadrant should be turned ON = 1 or OFF = 0
+    def player_name(self):
+        player = self.player_ent.get().strip()
+        if player == "":
+            player = CDEFAULTPLAYER
+        return player
+
+    # ................. end of method: player_name .................
+
+    #.................... Method: leaderboard_speed ................
+    # This method returns the speed used to choose the games shown in the
+    # leaderboards - the speed chosen at setup, or the slowest speed if the
+    # game has not been setup yet.
     #
-    def quadrant_on_off(self, quadrant, on_off):
-        status = ""
-        if quadrant == 1:
-            startled = 4
-            startboard = 0
-        elif quadrant == 2 :
-            startled = 4
-            startboard = 2
-        elif quadrant == 3 :
-            startled = 0
-            startboard = 2
-        elif quadrant == 4 :
-            startled = 0
-            startboard = 0
-        else :
-            startled = 4
-            startboard = 0
-        for led in range (startled,startled+4,1):
-            for board in range ( startboard, startboard+2, 1):
-                pfio.digital_write ( led, on_off, board )
-      
-    # ................. end of method: quadrant_on_off.................
+    def leaderboard_speed(self):
+        return self.speed
 
-       
-    """.................... Method: process_config ................
-    # This method sets the LEDs for this configuration and then waits for a switch
-    # to be pressed or a timeout to occur, then updates the player results table
+    # ................. end of method: leaderboard_speed .................
+
+    #.................... Method: format_sessions ................
+    # This method returns the text for a list of games from the history.
     # It is passed
-    #   - configno : the number of the configuration currently being played
-    #   - speed : the speed the player chose , and hence the timeout too
+    #   - title : the heading for the list
+    #   - sessions : the games (player, started, speed, configs,
+    #                correct_count, correct_time), ranked on the average
+    #                time of the correct answers
+    #
+    def format_sessions(self, title, sessions):
+        lines = [title, "", "Place\tPlayer\t\tAverage\tCorrect\tDate"]
+        place = 1
+        for player, started, speed, configs, correct_count, correct_time in sessions:
+            lines.append(str(place) + "\t" + player[:14] + "\t\t" +
+                         str(round(0.001*correct_time, 3)) + "\t" +
+                         str(correct_count) + "/" + str(configs) + "\t" +
+                         strftime("%d/%m/%Y", localtime(started)))
+            place = place + 1
+        if place == 1:
+            lines.append("\nNo games played yet")
+        return "\n".join(lines)
+
+    # ................. end of method: format_sessions .................
+
+    #.................... Method: show_leaderboard ................
+    # This method shows the games with the best average times of correct
+    # answers, for games played at the chosen speed or faster, in the
+    # results panel
+    #
+    def show_leaderboard(self):
+        speed = self.leaderboard_speed()
+        sessions = self.history.leaderboard(speed)
+        title = "Leaderboard : speed " + str(speed) + " ms or faster"
+        self.show_report(self.format_sessions(title, sessions))
+
+    # ................. end of method: show_leaderboard .................
+
+    #.................... Method: show_personal_best ................
+    # This method shows the player's games with the best average times of
+    # correct answers, for games played at the chosen speed or faster, in the
+    # results panel
+    #
+    def show_personal_best(self):
+        speed = self.leaderboard_speed()
+        player = self.player_name()
+        sessions = self.history.personal_best(player, speed)
+        title = "Personal Best for " + player + " : speed " + str(speed) + " ms or faster"
+        self.show_report(self.format_sessions(title, sessions))
+
+    # ................. end of method: show_personal_best .................
+
+    #.................... Method: show_analytics ................
+    # This method shows the analysis of every game in the history (or of the
+    # player's games if a player name has been entered) in the results panel.
+    # The analysis needs NumPy, which is only imported when it is asked for
+    #
+    def show_analytics(self):
+        if self.analytics is None:
+            try:
+                from ledanalyticsv1p0p0 import SessionAnalytics
+            except ImportError:
+                self.show_report("Analytics needs NumPy\n\nsudo apt-get install python3-numpy")
+                return
+            self.analytics = SessionAnalytics(self.history)
+        player = self.player_ent.get().strip()
+        if player == "":
+            player = None
+        self.show_report(self.analytics.report(player))
+
+    # ................. end of method: show_analytics .................
+
+    #.................... Method: show_status ................
+    # This method puts text on the given row of the choices panel
+    # (all of the text after that row is replaced).
+    #
+    def show_status(self, row, status):
+        self.choices_txt.delete(row, END)
+        self.choices_txt.insert(row, status)
 
-    """
-    def process_config(self,configno,speed):
-        """ Process the next configuration. """
+    # ................. end of method: show_status .................
 
-        self.timeout = 0
-        self.Switch_pressed = False
-        
-        # whilst not timed out and no column switch has been pressed
-        while self.timeout < speed and self.Switch_pressed== False :
-            # update the timeout counter 
-            self.timeout = self.timeout +10
-            # get current state of the 4 column choice switches
-            self.ColumnSwitch1 = pfio.digital_read (CLEDCOL1_BUTTON, CBOARDwithBUTTONS);
-            self.ColumnSwitch2 = pfio.digital_read (CLEDCOL2_BUTTON, CBOARDwithBUTTONS);
-            self.ColumnSwitch3 = pfio.digital_read (CLEDCOL3_BUTTON, CBOARDwithBUTTONS);
-            self.ColumnSwitch4 = pfio.digital_read (CLEDCOL4_BUTTON, CBOARDwithBUTTONS);
-            # and get current state of the STOP switche
-            self.StopSwitch = pfio.digital_read (CSTOPBUTTON, CBOARDwithBUTTONS);
-
-            # check which column was chosen
-            if self.StopSwitch == True :
-                self.Switch_pressed = True               
-            else:
-                if (self.ColumnSwitch1 ==True or self.ColumnSwitch2 ==True or
-                    self.ColumnSwitch3 ==True or self.ColumnSwitch4 == True ):
-                    # check which button and hence which column chosen
-                    if self.ColumnSwitch1:
-                        # put the chosen column no in the players stats table
-                        self.player_results[configno][C_player_answer] = 1
-                    elif self.ColumnSwitch2:          
-                       # put the chosen column no in the players stats table
-                        self.player_results[configno][C_player_answer] = 2
-                    elif self.ColumnSwitch3 :          
-                      # put the chosen column no in the players stats table
-                        self.player_results[configno][C_player_answer] = 3
-                    elif self.ColumnSwitch4:          
-                       # put the chosen column no in the players stats table
-                        self.player_results[configno][C_player_answer] = 4
-
-                    # set button pressed to show that a column has been chosen
-                    self.Switch_pressed = True
-                    # put the time taken in the players stats table
-                    self.player_results[configno][C_player_time] = self.timeout
-                    # check if the chosen column is correct and update the players stats table
-                    if self.player_results[configno][C_player_answer] == self.player_results[configno][C_correct_column]:
-                        self.player_results[configno][C_player_correct] = True
-                    else:
-                        self.player_results[configno][C_player_correct] = False
-                # update the timeout counter 
-                self.timeout = self.timeout +10
-                # sleep for 0.01s before testing again
-                sleep(0.01)
-                
-        # if the player has not pressed a button before the timeout then
-        # the player stats need to be updated to show Timeout.
-        if self.StopSwitch == True or self.Switch_pressed == False :
-            # put the column no  0 in the players stats table to indicate Timeout
-            self.player_results[configno][C_player_answer] = 0
-            # set the player correct indicator to False
-            self.player_results[configno][C_player_correct] = False
-            # set the players time to speed to indicate timeout
-            self.player_results[configno][C_player_time] = speed + 1
-        
-        if self.StopSwitch == True:
-            self.stop_game()
-            
-        self.turnall_off()        
-
-    # end of method: process_config..............................
-
-    """.................... Method: generate_random_LEDs ................
-    # This method generates a random selection of LEDs in each of the four columns.
-    # It generates 4 unique random numbers to represent the number
-    # of LEDs in each of the 4 Columns
-    # For each of those random numbers it generates that many random LED choices for that column.
-    # It ensure all LEDs are off, then turns on the selected LEDs in each column.
-    It is passed configno = the number of the current configuration being worked on
-    """
-    def generate_random_LEDs(self,configno):
-        """ Generate  random numbers """
-        
-        # First decide how may LEDs in which Columns to turn ON
-        # generate random numbers for each column
-        self.LEDs_in_column[0] = random.randint(1,8)
-        self.LEDs_in_column[1] = random.randint(1,8)
-        self.LEDs_in_column[2] = random.randint(1,8)
-        self.LEDs_in_column[3] = random.randint(1,8)
-        #now check they are all different
-        while self.LEDs_in_column[1] == self.LEDs_in_column[0]:
-            self.LEDs_in_column[1] = random.randint (1,8)
-        while (self.LEDs_in_column[2] == self.LEDs_in_column[0] or
-            self.LEDs_in_column[2] == self.LEDs_in_column[1]):
-            self.LEDs_in_column[2] = random.randint(1,8)
-        while (self.LEDs_in_column[3] == self.LEDs_in_column[0] or
-        self.LEDs_in_column[3] == self.LEDs_in_column[1] or
-        self.LEDs_in_column[3] == self.LEDs_in_column[2]):
-            self.LEDs_in_column[3] = random.randint(1,8)
-
-        # update the payer results table to show which column is the correct answer
-        if (self.LEDs_in_column[0] > self.LEDs_in_column[1] and
-            self.LEDs_in_column[0] > self.LEDs_in_column[2] and
-            self.LEDs_in_column[0] > self.LEDs_in_column[3]):
-            # then 1st column has most LEDs
-            self.player_results[configno][C_correct_column] = 1
-        elif (self.LEDs_in_column[1] > self.LEDs_in_column[0] and
-            self.LEDs_in_column[1] > self.LEDs_in_column[2] and
-            self.LEDs_in_column[1] > self.LEDs_in_column[3]):
-            # then 2nd column has most LEDs
-            self.player_results[configno][C_correct_column] = 2
-        elif (self.LEDs_in_column[2] > self.LEDs_in_column[0] and
-            self.LEDs_in_column[2] > self.LEDs_in_column[1] and
-            self.LEDs_in_column[2] > self.LEDs_in_column[3]):
-            # then 3rd column has most LEDs
-            self.player_results[configno][C_correct_column] = 3    
-        elif (self.LEDs_in_column[3] > self.LEDs_in_column[0] and
-            self.LEDs_in_column[3] > self.LEDs_in_column[1] and
-            self.LEDs_in_column[3] > self.LEDs_in_column[2]):
-            # then 4th column has most LEDs
-            self.player_results[configno][C_correct_column] = 4
-
-        # now generate which LED numbers for each column
-        # first set all LED numbers to unique negative numbers
-        # so all off and all different
-        for row in range (0,8):
-            for column in range (0,4):
-                self.random_LEDs [row][column] =-1 * row
-
-        # now generate all the random LED nos
-        for column in range (0,4) :
-            # for each column generate  random LED numbers
-            for row in range (0,self.LEDs_in_column[column]):
-                self.random_LEDs[row][column]= random.randint(1,8)
-                
-            #now check the LED numbers in this column are all different
-            if self.LEDs_in_column[column] >1:
-                #While 2nd choice is same as first
-                while self.random_LEDs [1][column] == self.random_LEDs [0][column]:
-                    # change 2nd choice
-                    self.random_LEDs [1][column] = random.randint (1,8)
- 
-            if self.LEDs_in_column[column] >2:
-                #whilst 3rd choice is same as 1st or 2nd
-                while (self.random_LEDs [2][column] == self.random_LEDs [0][column] or
-                    self.random_LEDs [2][column] == self.random_LEDs [1][column]):
-                    # change 3rd choice
-                    self.random_LEDs [2][column] = random.randint(1,8)
-
-            if self.LEDs_in_column[column] >3:
-                #whilst 4th choice is same as 1st or 2nd or 3rd
-                while (self.random_LEDs [3][column] == self.random_LEDs [0][column] or
-                self.random_LEDs [3][column] == self.random_LEDs [1][column] or
-                self.random_LEDs [3][column] == self.random_LEDs [2][column]):
-                    # change 4th choice
-                    self.random_LEDs [3][column] = random.randint(1,8)
-    
-            if self.LEDs_in_column[column] >4:
-                #whilst 5th choice is same as 1st 2nd 3rd or 4th
-                while (self.random_LEDs [4][column] == self.random_LEDs [0][column] or
-                self.random_LEDs [4][column] == self.random_LEDs [1][column] or
-                self.random_LEDs [4][column] == self.random_LEDs [2][column] or
-                self.random_LEDs [4][column] == self.random_LEDs [3][column]):
-                    #change 5th choice
-                    self.random_LEDs [4][column] = random.randint(1,8)
-
-            if self.LEDs_in_column[column] >5:
-                # whilst 6th choice is same as 1st 2nd 3rd 4th or 6th
-                while (self.random_LEDs [5][column] == self.random_LEDs [0][column] or
-                self.random_LEDs [5][column] == self.random_LEDs [1][column] or
-                self.random_LEDs [5][column] == self.random_LEDs [2][column] or
-                self.random_LEDs [5][column] == self.random_LEDs [3][column] or
-                self.random_LEDs [5][column] == self.random_LEDs [4][column]):
-                    # change 6th choice
-                    self.random_LEDs [5][column] = random.randint(1,8)
-
-            if self.LEDs_in_column[column] >6:
-                # whilst 7th choice is same as 1st 2nd 3rd 4th 5th or 6th
-                while (self.random_LEDs [6][column] == self.random_LEDs [0][column] or
-                self.random_LEDs [6][column] == self.random_LEDs [1][column] or
-                self.random_LEDs [6][column] == self.random_LEDs [2][column] or
-                self.random_LEDs [6][column] == self.random_LEDs [3][column] or
-                self.random_LEDs [6][column] == self.random_LEDs [4][column] or
-                self.random_LEDs [6][column] == self.random_LEDs [5][column]):
-                    # change 7th choice
-                    self.random_LEDs [6][column] = random.randint(1,8)
- 
-            if self.LEDs_in_column[column] ==8:
-                # whilst 8th choice is same as 1st 2nd 3rd 4th 5th 6th or 7th
-                while (self.random_LEDs [7][column] == self.random_LEDs [0][column] or
-                self.random_LEDs [7][column] == self.random_LEDs [1][column] or
-                self.random_LEDs [7][column] == self.random_LEDs [2][column] or
-                self.random_LEDs [7][column] == self.random_LEDs [3][column] or
-                self.random_LEDs [7][column] == self.random_LEDs [4][column] or
-                self.random_LEDs [7][column] == self.random_LEDs [5][column] or
-                self.random_LEDs [7][column] == self.random_LEDs [6][column]):
-                    # change 8th choice
-                    self.random_LEDs [7][column] = random.randint(1,8)
-        
-        # First make sure all LEDS are OFF 
-        self.turnall_off()
-        # wait one second
-        sleep(1)
-        # then turn on the chosen LEDs
-        for board in range (0,4):
-            for choice in range ( 0, self.LEDs_in_column[board]):
-                pfio.digital_write ( self.random_LEDs[choice][board]-1, CLEDON, board )
-                   
-    # ..................... end of method : generate_random_LEDs .........
-
-
-
-
-    #.................... Method: calculate_statistics ................
-    # This method works out the player statistics at the end of a game
-    # and puts the statistics in the stats panel.
-    # It displays for each configuration played:
-    #   - the number and percentage of configurations the player got right
-    #   - the number and percentage of configurations the player got wrong
-    #   - the number and percentage of configurations the player timed out
-    #   - the number and percentage of configurations in total
-    #   - the average time the player took to choose a column or Timeout
-    # It is passed
-    #   - configs : the number of configurations that were played
-    #   - speed : the speed the player chose , and hence the timeout too
+    #.................... Method: show_statistics ................
+    # This method puts the statistics in the stats panel
     #
-    def calculate_statistics(self, configs, speed):
-        """ Update text widget and display LED states. """
-        averagetime = 0.0
-        totaltime = 0
-        timeout_count = 0
-        correct_count = 0
-        wrong_count = 0
-        timeout_stat = 0.0
-        correct_stat = 0.0
-        wrong_stat = 0.0
-        stats=""
-        stats = "Statistics : \n"
-        if self.StopSwitch == False:
-            choices = "\nGame finished"
-            self.choices_txt.delete(CSTOPPED_ROW, END)
-            self.choices_txt.insert(CSTOPPED_ROW, choices)
-        
-        # work out number of Timeouts and average time
-        for config in range (1,configs+1):
-            # work out number of timeouts
-            if self.player_results[config][C_player_time]>speed:
-                timeout_count= timeout_count + 1
-            # add up all the time scores
-            totaltime = totaltime + self.player_results[config][C_player_time]
-            # add up how many correct
-            if self.player_results[config][C_player_correct]==True:
-                correct_count= correct_count + 1
-                     
-        averagetime = 0.001*totaltime/configs;
-        wrong_count = configs - correct_count - timeout_count
-        wrong_stat   = wrong_count   * 100 / configs
-        correct_stat = correct_count * 100 / configs
-        timeout_stat = timeout_count * 100 / configs
-        
-        stats = stats + "\nCorrect\t\t"+ str(correct_count)+"\t\t" + str(int(correct_stat)) + "%"
-        stats = stats + "\nWrong\t\t" + str(wrong_count)+"\t\t" + str(int(wrong_stat)) + "%"
-        stats = stats + "\nTimeout\t\t" + str(timeout_count)+"\t\t" + str(int(timeout_stat)) + "%"
-        stats = stats + "\nTotal\t\t" + str(configs)+"\t\t" + "100%"
-        stats = stats + "\n\nAverage time\t\t" + str(averagetime) +" seconds\n"
-         
+    def show_statistics(self, stats):
         self.stats_txt.delete(0.0, END)
         self.stats_txt.insert(0.0, stats)
 
-    # end of method: update_stats..............................
-    
-    #.................... Method: calculate_results ................
-    # This method puts the players results i the results panel.
-    # It displays for each configuration played:
-    #   - the number of the configuration
-    #   - the column the player should have chosen
-    #   - the column the player did chose
-    #   - whether the player was correct
-    #   - the time the player took to choose a column or Timeout
+    # ................. end of method: show_statistics .................
+
+    #.................... Method: show_results ................
+    # This method shows the results table in the results panel.  The table
+    # is filled in by show_result() as each configuration is answered so the
+    # results only hold the summary of the chunks of a long game, shown under
+    # the table; empty results start a new table.
+    #
+    def show_results(self, results):
+        if results == "":
+            self.results_table.clear()
+        else:
+            self.results_table.show_summary(results.partition("\n")[2])
+        self.results_txt.grid_remove()
+        self.results_table.grid()
+
+    # ................. end of method: show_results .................
+
+    #.................... Method: show_result ................
+    # This method adds the result of a configuration to the results table
+    #
+    def show_result(self, configno, correct_column, player_answer, player_time, speed):
+        self.results_table.add(configno, correct_column, player_answer, player_time, speed)
+
+    # ................. end of method: show_result .................
+
+    #.................... Method: show_report ................
+    # This method puts a report (a leaderboard or analytics) in the results
+    # panel in place of the results table
     #
-    def calculate_results(self, configs, speed):
-        """ Display the results. """
-        ptime = 0.0
-        status=""
-        status = "Results : \n"
-
-        status = status + "Config\tCorrect\tPlayer\tCorrect\tPlayer\n"
-        status = status + "Number\tColumn\tChoice\tY/N\tTime\n"
-        for config in range (1,configs+1):
-            status = status + "\n" + str(config) + "\t"
-            status = status + str(self.player_results[config][C_correct_column])+ "\t"
-            status = status + str(self.player_results[config][C_player_answer] )+ "\t"
-            if self.player_results[config][C_player_correct]==True:
-                status = status +  "Y\t"
-            else:
-                status = status +  "N\t"
-            if self.player_results[config][C_player_time]> speed:
-                status = status +"Timeout"
-            else:
-                ptime = self.player_results[config][C_player_time]*0.001
-                status = status + str(ptime)           
-            
+    def show_report(self, report):
         self.results_txt.delete(0.0, END)
-        self.results_txt.insert(0.0, status)
+        self.results_txt.insert(0.0, report)
+        self.results_table.grid_remove()
+        self.results_txt.grid()
 
-        # end of method: calculate_results..............................
+    # ................. end of method: show_report .................
 
 #=================================================================
 # main
 #=================================================================
 
-root = Tk()                             # Create the GUI root object
-root.title("LED Counting Game")
-app = Application(root)                 # Create the root application window
-root.mainloop()
+# the game process imports this program afresh, so the game is only
+# started when it is run
+if __name__ == "__main__":
+    root = Tk()                             # Create the GUI root object
+    root.title("LED Counting Game")
+    app = Application(root)                 # Create the root application window
+    root.mainloop()
+    app.buttons.close()                     # Stop listening for button presses and keys
+    if app.process is not None:
+        app.process.close()                 # Stop the game process, turning off the LEDs
+    app.history.close()                     # Close the game history
+    if app.feed is not None:
+        app.feed.stop()                     # Stop the spectator feed
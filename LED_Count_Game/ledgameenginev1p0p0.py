@@ -0,0 +1,688 @@
+#!/usr/bin/env python
+
+#==============================================================
+#
+# Authors:      Christine Smythe and Colin Smythe (Dunelm Services Limited)
+# Version:      1.0
+# Release Date: 1st November, 2013
+#
+# Description:  This Python3 module runs the LED Counting Game itself as a
+#               state machine so that it never blocks the GUI:
+#
+#               ATTRACT  - the attract animation (the quadrant chase) is shown
+#                          until the game board start button is pressed (or a
+#                          timeout occurs);
+#               ARMED    - the LEDs are blank (then show the fixation frame,
+#                          if there is one) and the next configuration is
+#                          composed ready to be shown;
+#               SHOWING  - the configuration is being flipped onto the LEDs;
+#               AWAITING - waiting for the player to choose a column;
+#               FINISHED - the results and statistics have been displayed.
+#
+#               The game is advanced by calling update() regularly, e.g. from a
+#               Tk after() timer.  update() never waits.  All times are in
+#               nanoseconds from a monotonic clock (time.perf_counter_ns()) and
+#               reaction times are measured from the moment the LED output
+#               layer reports that the configuration became visible to the
+#               timestamp of the button press, less the latency of the system
+#               itself found by calibration (see ledcalibratev1p0p0.py).
+#               Everything displayed is passed
+#               to a 'view' object which must provide the methods
+#               show_status(row, text), show_statistics(text),
+#               show_results(text) and show_result(configno, correct_column,
+#               player_answer, player_time, speed), which is given the result
+#               of each configuration as soon as it is answered.  A view which
+#               shows the results from show_result() (e.g. the GUI's results
+#               table) sets 'results_text' to False and is then only given the
+#               summary of each chunk of results when the game ends, not the
+#               text of every result.
+#
+#               In an adaptive game the speed of each configuration is set
+#               from the player's latest results (see ledadaptivev1p0p0.py) and
+#               the speed used is kept with each result.
+#
+#               A game may have any number of configurations (0 plays until
+#               the player presses STOP).  The patterns are generated a batch
+#               at a time and the results are written to disk in chunks (see
+#               ledresultsv1p0p0.py), so a long game uses no more memory than a
+#               short one.  The results panel shows the latest CRESULTSWINDOW
+#               configurations in full and a summary of each chunk before them.
+#
+#               The gap between configurations is set by the 'schedule' (a
+#               TrialScheduler, see ledtrialsv1p0p0.py, which may be given to
+#               the engine, e.g. as read by load_schedule()) and the number of
+#               configurations shown per minute is shown with the statistics.
+#
+#               If a SpectatorFeed is set as the 'feed' each game starting, each
+#               configuration shown, each answer, the statistics and the game
+#               ending are published to it (see ledspectatorv1p0p0.py).
+#
+#               The game is played on the boards of a BoardGeometry (see
+#               ledboardsv1p0p0.py), one PiRack of 4 columns of 8 LEDs by
+#               default.  Columns after the 4th are chosen with the spare
+#               inputs of the button board and then the inputs of the next
+#               board (see column_buttons()).
+#
+#               If a GameHistory is given every game played is saved in it
+#               when the game ends.  If a GameRecorder is set as the 'recorder'
+#               the patterns, frame flips and button presses of every game
+#               are recorded so that the game can be replayed.
+#
+# History:      Original release.
+#
+# Copyright:    2013 (c) Premier Farnell Limited
+#
+# License:      GPLv3+
+#
+#==============================================================
+
+from time import time
+from ledboardsv1p0p0 import CGEOMETRY, CLEDSPERBOARD, CNS_PER_SECOND, CNS_PER_MS
+from ledanimationv1p0p0 import AnimationPlayer, compile_animations, CATTRACT_ANIMATION
+from ledpatternsv1p0p0 import PatternGenerator
+from ledresultsv1p0p0 import PlayerResults
+from ledadaptivev1p0p0 import AdaptiveSpeed
+from ledtrialsv1p0p0 import TrialScheduler
+
+#==============================================================
+# Declaration of Constants
+
+CSTARTBUTTON = 0;       # start button is button 0 on board 0
+CLEDCOL1_BUTTON = 1;    # button to choose LED column 1
+CLEDCOL2_BUTTON = 2;    # button to choose LED column 2
+CLEDCOL3_BUTTON = 3;    # button to choose LED column 3
+CLEDCOL4_BUTTON = 4;    # button to choose LED column 4
+CSTOPBUTTON = 5;        # Stop button is button 5 on board 0
+# the column buttons in column order, and all the buttons used in the game
+CLEDCOL_BUTTONS = (CLEDCOL1_BUTTON, CLEDCOL2_BUTTON, CLEDCOL3_BUTTON, CLEDCOL4_BUTTON);
+CGAME_BUTTONS = (CSTARTBUTTON,) + CLEDCOL_BUTTONS + (CSTOPBUTTON,);
+# the buttons for columns 5 onwards: inputs 6 and 7 of the button board and
+# then the inputs of the next board, numbered 8 upwards
+CEXTRACOL_BUTTONS = (6, 7) + tuple(range(CLEDSPERBOARD, 2 * CLEDSPERBOARD));
+
+CSTARTTIMEOUT = 10.5;   # seconds the player has to press the game board start button
+CPATTERNBATCH = 256;    # most patterns generated at a time
+CRESULTSWINDOW = 100;   # configurations shown in full in the results panel
+
+# all game times are in nanoseconds (CNS_PER_SECOND) as given by the clock of
+# the LED output layer
+CDEFAULTPLAYER = "Player";  # name used in the history if the player gives none
+
+#constants for putting text on correct line in choices panel
+CCONFIGS_ROW = 0.0;
+CSPEED_ROW = 2.0;
+CREADYTOSTART_ROW = 4.0;
+CSTARTED_ROW = 6.0;
+CSTOPPED_ROW = 7.0;
+CFINISHED_ROW = 7.0;
+
+# the states of the game
+CSTATE_IDLE = 0;        # no game in progress
+CSTATE_ATTRACT = 1;     # attract animation, waiting for the start button
+CSTATE_ARMED = 2;       # LEDs blank, waiting to show the next configuration
+CSTATE_SHOWING = 3;     # showing the next configuration on the LEDs
+CSTATE_AWAITING = 4;    # waiting for the player to choose a column
+CSTATE_FINISHED = 5;    # game over, results displayed
+
+#==============================================================
+
+#.................... Function: column_buttons ................
+# This function returns the buttons which choose each column, in column
+# order, for a game of 'columns' columns
+#
+def column_buttons(columns):
+    buttons = (CLEDCOL_BUTTONS + CEXTRACOL_BUTTONS)[0:columns]
+    if len(buttons) < columns:
+        raise ValueError("there are not enough buttons for " + str(columns) + " columns")
+    return buttons
+
+# ..................... end of function : column_buttons .........
+
+#.................... Function: game_buttons ................
+# This function returns all of the buttons used in a game of 'columns' columns
+#
+def game_buttons(columns):
+    return (CSTARTBUTTON,) + column_buttons(columns) + (CSTOPBUTTON,)
+
+# ..................... end of function : game_buttons .........
+
+#==============================================================
+
+class GameEngine(object):
+    """ The LED Counting Game state machine. """
+
+    def __init__(self, leds, buttons, view, history = None, geometry = CGEOMETRY, schedule = None):
+        # the LED output layer, the button input and where to display things.
+        # The button presses must be timestamped with the same clock as the
+        # LED output layer uses to timestamp its frames
+        self.leds = leds
+        # the boards and columns the game is played on, and the button for
+        # each column
+        self.geometry = geometry
+        self.column_buttons = column_buttons(geometry.columns)
+        self.buttons = buttons
+        self.view = view
+        # where the games played are saved (if anywhere)
+        self.history = history
+        # where the events of the games played are recorded (if anywhere)
+        self.recorder = None
+        # where the games are published for spectators (if anywhere)
+        self.feed = None
+        self.player = CDEFAULTPLAYER
+        self.started = 0
+        self.state = CSTATE_IDLE
+        self.configs = 0
+        self.speed = 0
+        # the speed of the configuration being played, and what sets it in
+        # an adaptive game (None if the speed is fixed)
+        self.trial_speed = 0
+        self.adaptive = None
+        # the latency (ms) of the boards and buttons, taken off every
+        # reaction time so results are the same on any R-Pi
+        self.latency_correction = 0.0
+        self.count = 0
+        self.StopSwitch = False
+
+        # the player results table and its running statistics
+        self.results = PlayerResults()
+
+        # the batch of patterns of LEDs to be lit for the configurations from
+        # first_pattern on, and the generator of the next batch
+        self.patterns = []
+        self.first_pattern = 1
+        self.generator = None
+        self.seed = None
+
+        # the LEDs lit for the current configuration, one byte for each board
+        # (see Pattern in ledpatternsv1p0p0.py)
+        self.bits = 0
+
+        # the animation shown whilst waiting for the start button
+        self.attract = AnimationPlayer(compile_animations(geometry)[CATTRACT_ANIMATION])
+
+        # the timing of the gap before each configuration, when the fixation
+        # frame is due (None if it is not to be shown) and when the first
+        # configuration of the game was shown
+        if schedule is None:
+            schedule = TrialScheduler()
+        self.schedule = schedule
+        self.fixation_frame = geometry.fixation_frame()
+        self.fixation_at = None
+        self.first_shown = None
+
+    #.................... Method: running ................
+    # This method returns True whilst a game is in progress
+    # (i.e. update() needs to be called)
+    #
+    def running(self):
+        return self.state not in (CSTATE_IDLE, CSTATE_FINISHED)
+
+    # ................. end of method: running .................
+
+    #.................... Method: start_game ................
+    # This method sets the number of configurations and speed chosen by the
+    # player, generates the first batch of patterns and starts the
+    # attract animation which is shown until the player presses the gameboard
+    # start button.
+    # It is passed
+    #   - configs : the number of configurations to be played, or 0 to play
+    #               until the player presses STOP
+    #   - speed : the speed the player chose , and hence the timeout too
+    #   - now : the current time (ns)
+    #   - seed : the seed for the random patterns, or None to choose one
+    #   - player : the name of the player (for the game history)
+    #   - adaptive : True for the speed to adapt to the player, starting at
+    #                the speed given
+    #
+    def start_game(self, configs, speed, now, seed = None, player = CDEFAULTPLAYER,
+                   adaptive = False):
+        self.configs = configs
+        self.speed = speed
+        self.trial_speed = speed
+        self.adaptive = None
+        if adaptive:
+            self.adaptive = AdaptiveSpeed(speed)
+        self.player = player
+        # the date and time the game was played
+        self.started = time()
+        self.count = 1
+        self.StopSwitch = False          # True if STOP switch on game is pressed
+        #first empty the results table ready for new results
+        self.results.reset()
+
+        # generate the first batch of patterns now so that no time is spent
+        # working them out between configurations
+        self.generator = PatternGenerator(seed, self.geometry)
+        self.seed = self.generator.seed
+        self.schedule.start(self.seed)
+        self.first_shown = None
+        self.first_pattern = 1
+        batch = CPATTERNBATCH
+        if 0 < configs < batch:
+            batch = configs
+        self.patterns = self.generator.generate_batch(batch)
+        if self.recorder is not None:
+            self.recorder.start(self)
+        if self.feed is not None:
+            # the geometry is sent so the frames (a byte for each board) can
+            # be drawn as the columns they make up
+            self.feed.publish("start", {"player" : player, "configs" : configs, "speed" : speed,
+                                        "seed" : self.seed, "adaptive" : adaptive,
+                                        "columns" : self.geometry.columns,
+                                        "segments" : list(self.geometry.segments)})
+
+        # next make sure all LEDs are off
+        self.turnall_off()
+        # clear the statistics and results tables ready for new stats and results
+        self.view.show_status(CSTARTED_ROW, "")
+        self.view.show_statistics("")
+        self.view.show_results("")
+
+        #then start the attract animation
+        # throwing away any button presses made before the game was started
+        self.buttons.clear()
+        self.timeout = now + int(CSTARTTIMEOUT * CNS_PER_SECOND)
+        self.attract.start(now)
+        self.state = CSTATE_ATTRACT
+
+    # ................. end of method: start_game .................
+
+    #.................... Method: update ................
+    # This method advances the game.  It checks for button presses and timers
+    # and moves the game on to its next state when required.  It never waits.
+    # It is passed
+    #   - now : the current time (ns)
+    #
+    def update(self, now):
+        if self.state == CSTATE_ATTRACT:
+            event = self.poll_buttons((CSTARTBUTTON, CSTOPBUTTON))
+            if event is not None and event.button == CSTOPBUTTON:
+                # player has pressed Stop Switch
+                self.stop_pressed()
+            elif event is not None:
+                # player has pressed start switch
+                self.view.show_status(CSTARTED_ROW, "\nGame started - seed " + str(self.seed))
+                self.view.show_statistics("")
+                self.view.show_results("")
+                self.arm(now)
+            elif now >= self.timeout:
+                # player hasn't pressed start quick enough
+                status = "\nGame Start Timeout"
+                status = status + " - press the Game board start button quicker!"
+                self.view.show_status(CSTARTED_ROW, status)
+                self.turnall_off()
+                self.state = CSTATE_IDLE
+            else:
+                # show the next frame of the animation if it is due
+                frame = self.attract.due(now)
+                if frame is not None:
+                    self.leds.write_frame(frame)
+
+        elif self.state == CSTATE_ARMED:
+            if self.poll_buttons((CSTOPBUTTON,)) is not None:
+                self.stop_pressed()
+            elif now >= self.timeout:
+                # the configuration was composed when the blank started
+                self.show_config()
+            elif self.fixation_at is not None and now >= self.fixation_at:
+                self.fixation_at = None
+                self.leds.write_frame(self.fixation_frame)
+                # put the configuration back in the back buffer
+                self.leds.compose_bits(self.bits)
+
+        elif self.state == CSTATE_AWAITING:
+            event = self.poll_buttons(self.column_buttons + (CSTOPBUTTON,), self.starttime)
+            if event is not None and event.button == CSTOPBUTTON:
+                # STOP always takes effect, however late it is seen (the
+                # configuration counts as a timeout)
+                self.stop_pressed()
+            elif event is not None and event.timestamp > self.timeout:
+                # pressed too late - this is a timeout
+                event = None
+            if self.state == CSTATE_AWAITING and (event is not None or now >= self.timeout):
+                self.process_config(self.count, self.trial_speed, event)
+                # the statistics are kept up to date as each result is added
+                # so they can be shown after every configuration
+                self.calculate_statistics(self.count, self.speed)
+                if self.StopSwitch == True or self.count == self.configs:
+                    self.end_game()
+                else:
+                    self.count = self.count + 1
+                    self.arm(now)
+
+    # ................. end of method: update .................
+
+    #.................... Method: poll_buttons ................
+    # This method returns the next press of one of the chosen buttons, as
+    # ButtonInput.poll() does, recording it if the game is being recorded
+    #
+    def poll_buttons(self, buttons, since = 0):
+        event = self.buttons.poll(buttons, since)
+        if event is not None and self.recorder is not None:
+            self.recorder.button(event)
+        return event
+
+    # ................. end of method: poll_buttons .................
+
+    #.................... Method: next_update ................
+    # This method returns the time at which the game next needs to be updated
+    # if no button is pressed before then, or None if no game is in progress.
+    # It is passed
+    #   - now : the current time (ns)
+    #
+    def next_update(self, now):
+        if self.state == CSTATE_ATTRACT:
+            return min(self.timeout, self.attract.deadline)
+        elif self.state == CSTATE_ARMED and self.fixation_at is not None:
+            return self.fixation_at
+        elif self.state in (CSTATE_ARMED, CSTATE_AWAITING):
+            return self.timeout
+        return None
+
+    # ................. end of method: next_update .................
+
+    #.................... Method: arm ................
+    # This method blanks the LEDs and composes the next configuration
+    # ready to be shown when the blank (and fixation) ends
+    #
+    def arm(self, now):
+        self.turnall_off()
+        self.generate_random_LEDs(self.count)
+        self.fixation_at, self.timeout = self.schedule.plan(now)
+        self.state = CSTATE_ARMED
+
+    # ................. end of method: arm .................
+
+    #.................... Method: end_game ................
+    # This method ends the game and displays the results and statistics
+    # for the configurations that were played, then saves them.
+    #
+    def end_game(self):
+        if self.StopSwitch == True:
+            self.stop_game()
+        else:
+            self.view.show_status(CFINISHED_ROW, "\nGame finished")
+        self.turnall_off()
+        self.state = CSTATE_FINISHED
+        self.calculate_results(self.count, self.speed)
+        self.calculate_statistics(self.count, self.speed)
+        # save the game, with all its results, in the history
+        if self.history is not None and self.count > 0:
+            # an adaptive game is saved with the slowest speed it was played at
+            self.history.save_game(self.player, self.started, self.results.speeds.maximum,
+                                   self.seed, self.results)
+        if self.recorder is not None and self.count > 0:
+            self.recorder.end(self)
+        if self.feed is not None:
+            self.feed.publish("end", {"count" : self.count, "stopped" : self.StopSwitch})
+
+    # ................. end of method: end_game .................
+
+    #.................... Method: stop_game ................
+    # This method stops the current game in play.
+    #
+    def stop_game(self):
+        status = ""
+        self.StopSwitch = True
+        self.turnall_off()
+        self.state = CSTATE_IDLE
+        status = "\nGame stopped"
+
+        self.view.show_status(CSTOPPED_ROW, status)
+
+    # ................. end of method: stop_game .................
+
+    #.................... Method: stop_pressed ................
+    # This method is used when the player presses the STOP switch or stops
+    # the game from the screen.  It takes effect immediately.
+    #
+    def stop_pressed(self):
+        self.StopSwitch = True
+        if self.state in (CSTATE_SHOWING, CSTATE_AWAITING):
+            # the configuration being played counts as a timeout
+            self.process_config(self.count, self.trial_speed, None)
+            self.end_game()
+        elif self.state == CSTATE_ARMED:
+            # the next configuration has not been shown so is not counted
+            self.count = self.count - 1
+            self.end_game()
+        elif self.state == CSTATE_ATTRACT:
+            self.stop_game()
+            if self.feed is not None:
+                self.feed.publish("end", {"count" : 0, "stopped" : True})
+            self.view.show_statistics("")
+            self.view.show_results("")
+
+    # ................. end of method: stop_pressed .................
+
+    #.................... Method: turnall_off ................
+    # This method turns all the LEDs on all four boards OFF
+    #
+    def turnall_off(self):
+        # write every board with all of its LEDs off
+        # (boards which are already off are not written again)
+        self.leds.all_off()
+    # ................. end of method: turnall_off .................
+
+    """.................... Method: process_config ................
+    # This method adds the result of this configuration to the player results
+    # table using the switch the player pressed, or a timeout if no switch
+    # was pressed.
+    # It is passed
+    #   - configno : the number of the configuration currently being played
+    #   - speed : the speed of this configuration, and hence the timeout too
+    #   - event : the button press, or None if the player timed out
+
+    """
+    def process_config(self,configno,speed,event):
+        """ Process the next configuration. """
+
+        self.Switch_pressed = False
+        # if the player does not press a column button before the timeout then
+        # the column no 0 and the time speed + 1 indicate Timeout
+        player_answer = 0
+        player_time = speed + 1
+        if event is not None:
+            # set button pressed to show that a switch has been pressed
+            self.Switch_pressed = True
+            if event.button == CSTOPBUTTON:
+                self.StopSwitch = True
+            else:
+                # the chosen column no
+                player_answer = self.column_buttons.index(event.button) + 1
+                # the time taken (in ms, to the nearest ns) from the LEDs
+                # being lit to the button interrupt, less the system latency
+                # (but never less than 0 or more than the speed)
+                player_time = (event.timestamp - self.starttime) / CNS_PER_MS
+                player_time = min(max(player_time - self.latency_correction, 0.0), speed)
+
+        # the rate configurations are shown is timed from the first one
+        if configno == 1:
+            self.first_shown = self.starttime
+
+        # put the result in the players stats table
+        # (which also works out if the chosen column is correct)
+        correct_column = self.pattern(configno).correct_column
+        self.results.add(correct_column, player_answer, player_time, speed)
+        self.view.show_result(configno, correct_column, player_answer, player_time, speed)
+        if self.feed is not None:
+            self.feed.publish("answer", {"config" : configno, "correct_column" : correct_column,
+                                         "answer" : player_answer, "time" : player_time,
+                                         "correct" : player_answer == correct_column})
+        # an adaptive game works out the speed of the next configuration now
+        if self.adaptive is not None:
+            if player_answer == 0:
+                self.adaptive.add(0, None)
+            else:
+                self.adaptive.add(int(player_answer == correct_column), player_time)
+
+        self.turnall_off()
+
+    # end of method: process_config..............................
+
+    """.................... Method: generate_random_LEDs ................
+    # This method sets up the random selection of LEDs for the configuration
+    # about to be played.  The patterns are generated a batch at a time so
+    # this only looks up the pattern for this configuration and composes it
+    # in the LED output layer's back buffer, a byte for each board.
+    It is passed configno = the number of the current configuration being worked on
+    """
+    def generate_random_LEDs(self,configno):
+        """ Get the pattern for the next configuration """
+
+        self.bits = self.pattern(configno).bits
+        self.leds.compose_bits(self.bits)
+
+    # ..................... end of method : generate_random_LEDs .........
+
+    #.................... Method: pattern ................
+    # This method returns the pattern for a configuration, generating the
+    # next batch of patterns when the configurations move past this batch.
+    # The configurations are played in order so only the latest batch is kept.
+    # It is passed configno = the number of the configuration
+    #
+    def pattern(self, configno):
+        index = configno - self.first_pattern
+        if index >= len(self.patterns):
+            self.first_pattern = configno
+            self.patterns = self.generator.generate_batch(CPATTERNBATCH)
+            index = 0
+        return self.patterns[index]
+
+    # ................. end of method: pattern .................
+
+    #.................... Method: show_config ................
+    # This method flips the composed configuration onto the LEDs and starts
+    # timing the player from the moment it became visible, with the speed
+    # for this configuration
+    #
+    def show_config(self):
+        self.state = CSTATE_SHOWING
+        if self.adaptive is not None:
+            self.trial_speed = self.adaptive.speed
+        self.starttime = self.leds.flip()
+        if self.recorder is not None:
+            self.recorder.flip(self.count, self.starttime, self.trial_speed, self.pattern(self.count))
+        self.timeout = self.starttime + self.trial_speed * CNS_PER_MS
+        self.state = CSTATE_AWAITING
+        if self.feed is not None:
+            self.feed.publish("trial", {"config" : self.count, "frame" : list(self.leds.back),
+                                        "speed" : self.trial_speed})
+
+    # ................. end of method: show_config .................
+
+
+    #.................... Method: calculate_statistics ................
+    # This method puts the player statistics in the stats panel.  It is called
+    # after every configuration so the panel is kept up to date during the game.
+    # The statistics are kept up to date by the player results table so
+    # this does not need to look through all of the results.
+    # It displays for the configurations played so far:
+    #   - the number and percentage of configurations the player got right
+    #   - the number and percentage of configurations the player got wrong
+    #   - the number and percentage of configurations the player timed out
+    #   - the number and percentage of configurations in total
+    #   - the average time the player took to choose a column or Timeout
+    #   - the fastest and slowest times
+    #   - the number of configurations shown per minute
+    # It is passed
+    #   - configs : the number of configurations that were played
+    #   - speed : the speed the player chose , and hence the timeout too
+    #
+    def calculate_statistics(self, configs, speed):
+        """ Update the statistics panel. """
+        results = self.results
+        stats = "Statistics : \n"
+        if configs == 0:
+            # stopped before any configuration was played
+            self.view.show_statistics(stats)
+            return
+
+        correct_stat = results.correct_count * 100 / configs
+        wrong_stat   = results.wrong_count   * 100 / configs
+        timeout_stat = results.timeout_count * 100 / configs
+
+        stats = stats + "\nCorrect\t\t"+ str(results.correct_count)+"\t\t" + str(int(correct_stat)) + "%"
+        stats = stats + "\nWrong\t\t" + str(results.wrong_count)+"\t\t" + str(int(wrong_stat)) + "%"
+        stats = stats + "\nTimeout\t\t" + str(results.timeout_count)+"\t\t" + str(int(timeout_stat)) + "%"
+        stats = stats + "\nTotal\t\t" + str(configs)+"\t\t" + "100%"
+        stats = stats + "\n\nAverage time\t\t" + str(round(0.001*results.times.mean, 4)) +" seconds"
+        stats = stats + "\nFastest time\t\t" + str(round(0.001*results.times.minimum, 4)) +" seconds"
+        stats = stats + "\nSlowest time\t\t" + str(round(0.001*results.times.maximum, 4)) +" seconds\n"
+        if configs > 1 and self.starttime > self.first_shown:
+            rate = (configs - 1) * 60.0 * CNS_PER_SECOND / (self.starttime - self.first_shown)
+            stats = stats + "\nTrials per minute\t\t" + str(round(rate, 1)) + "\n"
+
+        self.view.show_statistics(stats)
+        if self.feed is not None:
+            self.feed.publish("stats", {"correct" : results.correct_count, "wrong" : results.wrong_count,
+                                        "timeout" : results.timeout_count, "total" : configs,
+                                        "average" : results.times.mean})
+
+    # end of method: calculate_statistics..............................
+
+    #.................... Method: calculate_results ................
+    # This method puts the players results i the results panel.
+    # It displays for each of the latest CRESULTSWINDOW configurations played:
+    #   - the number of the configuration
+    #   - the column the player should have chosen
+    #   - the column the player did chose
+    #   - whether the player was correct
+    #   - the time the player took to choose a column or Timeout
+    #   - the speed of the configuration, if the speed was not the same for all
+    # and, before them, the number correct, wrong and timed out and the
+    # average time for each chunk of configurations written to disk.
+    # A view which has shown each result already (results_text is False)
+    # is only given the summary of the chunks.
+    #
+    def calculate_results(self, configs, speed):
+        """ Display the results. """
+        results = self.results
+        # the text is built from its parts in one go at the end
+        parts = ["Results : \n"]
+
+        first = max(0, configs - CRESULTSWINDOW)
+        if first > 0:
+            parts.append("Config\tCorrect\tWrong\tTimeout\tAverage\n")
+            parts.append("Numbers\t\t\t\tTime\n")
+            for chunk in results.chunks:
+                parts.append("\n" + str(chunk.first) + "-" + str(chunk.first + chunk.count - 1) + "\t" +
+                             str(chunk.correct) + "\t" + str(chunk.wrong) + "\t" +
+                             str(chunk.timeout) + "\t" + str(round(chunk.mean_time*0.001, 4)))
+            if not getattr(self.view, "results_text", True):
+                self.view.show_results("".join(parts))
+                return
+            parts.append("\n\nConfigurations " + str(first+1) + " to " + str(configs) + "\n\n")
+        elif not getattr(self.view, "results_text", True):
+            self.view.show_results("".join(parts))
+            return
+
+        show_speed = results.speeds.count > 0 and \
+                     (results.speeds.minimum != speed or results.speeds.maximum != speed)
+        if show_speed:
+            parts.append("Config\tCorrect\tPlayer\tCorrect\tPlayer\tSpeed\n")
+            parts.append("Number\tColumn\tChoice\tY/N\tTime\tms\n")
+        else:
+            parts.append("Config\tCorrect\tPlayer\tCorrect\tPlayer\n")
+            parts.append("Number\tColumn\tChoice\tY/N\tTime\n")
+        config = first
+        for correct_column, player_answer, player_correct, player_time, trial_speed in results.rows(first):
+            config = config + 1
+            line = "\n" + str(config) + "\t" + str(correct_column) + "\t" + str(player_answer) + "\t"
+            if player_correct:
+                line = line + "Y\t"
+            else:
+                line = line + "N\t"
+            if player_time > trial_speed:
+                line = line + "Timeout"
+            else:
+                line = line + str(round(player_time*0.001, 4))
+            if show_speed:
+                line = line + "\t" + str(trial_speed)
+            parts.append(line)
+
+        self.view.show_results("".join(parts))
+
+        # end of method: calculate_results..............................
+
+#=================================================================
@@ -0,0 +1,357 @@
+#!/usr/bin/env python
+
+#==============================================================
+#
+# Authors:      Christine Smythe and Colin Smythe (Dunelm Services Limited)
+# Version:      1.0
+# Release Date: 1st November, 2013
+#
+# Description:  This Python3 module runs the LED Counting Game loop (drawing
+#               the LEDs, taking the button presses and timing the player) in
+#               a process of its own, away from the Tk GUI, so that redrawing
+#               the window and the GUI's garbage collection can never hold up
+#               showing a configuration or timestamping a press.
+#
+#               The GUI keeps a GameProcess in place of the GameEngine.  The
+#               GameProcess starts the child process, which builds the game
+#               (with its own boards, button inputs, history and recorder)
+#               and runs it in a GameLoop.  The two talk over a
+#               multiprocessing pipe:
+#
+#               GUI to game  - ("start", configs, speed, seed, player, adaptive)
+#                              ("stop",)  ("press", button, timestamp)
+#                              ("fetch", name)  ("quit",)
+#               game to GUI  - ("view", method, args)  ("feed", kind, fields)
+#                              ("running", True/False)  ("value", value)
+#
+#               Everything the game displays is sent to the GUI (PipeView),
+#               as is everything published to the spectator feed (PipeFeed),
+#               and the GUI shows it when it next pumps the pipe.  Keys
+#               pressed in the GUI are sent to the game as presses with the
+#               time of the key event; time.perf_counter_ns() is the same
+#               clock in both processes.
+#
+#               See "python3 ledbenchmarkv1p0p0.py process" for the jitter
+#               of the game run in the GUI thread and in its own process.
+#
+# History:      Original release.
+#
+# Copyright:    2013 (c) Premier Farnell Limited
+#
+# License:      GPLv3+
+#
+#==============================================================
+
+import multiprocessing
+import queue
+import threading
+from time import perf_counter_ns
+from ledboardsv1p0p0 import LEDBoards, BoardGeometry, init_boards, CNS_PER_SECOND, CNS_PER_MS
+from ledinputv1p0p0 import ButtonEvent
+from ledmultiplexv1p0p0 import InputMultiplexer, SocketInput, add_piface_inputs, game_commands
+from ledgameenginev1p0p0 import GameEngine, CDEFAULTPLAYER
+from ledhistoryv1p0p0 import GameHistory
+from ledrecordv1p0p0 import GameRecorder
+from ledcalibratev1p0p0 import calibration_key, load_correction
+from ledtrialsv1p0p0 import load_schedule
+
+#==============================================================
+# Declaration of Constants
+
+CFRAMETIME = 10;        # most ms between updates of the game whilst it is being played
+CQUITTIME = 5;          # seconds the game process is given to quit
+
+# the child process is started afresh rather than forked from the GUI,
+# which has the X server connection open
+CSTARTMETHOD = "spawn";
+
+#==============================================================
+
+class PipeView(object):
+    """ A view which sends everything the game displays to the GUI process. """
+
+    def __init__(self, connection, results_text = True):
+        self.connection = connection
+        # whether the GUI's view needs the text of the results
+        self.results_text = results_text
+
+    def show_status(self, row, status):
+        self.connection.send(("view", "show_status", (row, status)))
+
+    def show_statistics(self, stats):
+        self.connection.send(("view", "show_statistics", (stats,)))
+
+    def show_results(self, results):
+        self.connection.send(("view", "show_results", (results,)))
+
+    def show_result(self, configno, correct_column, player_answer, player_time, speed):
+        self.connection.send(("view", "show_result",
+                              (configno, correct_column, player_answer, player_time, speed)))
+
+#==============================================================
+
+class PipeFeed(object):
+    """ A spectator feed which is published by the GUI process. """
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def publish(self, kind, fields):
+        self.connection.send(("feed", kind, fields))
+
+#==============================================================
+
+class GameLoop(object):
+    """ Runs a game in the child process, as commanded by the GUI process. """
+
+    def __init__(self, game, connection):
+        self.game = game
+        self.connection = connection
+        # the commands from the GUI, read by their own thread, and what wakes
+        # the loop when a command arrives or a button is pressed
+        self.commands = queue.Queue()
+        self.wakeup = threading.Event()
+        self.running = False
+
+    #.................... Method: read_commands ................
+    # This method (in its own thread) reads the commands from the GUI until
+    # it quits or the pipe is closed
+    #
+    def read_commands(self):
+        try:
+            while True:
+                command = self.connection.recv()
+                self.commands.put(command)
+                self.wakeup.set()
+                if command[0] == "quit":
+                    return
+        except (EOFError, OSError):
+            # the GUI has gone
+            self.commands.put(("quit",))
+            self.wakeup.set()
+
+    # ................. end of method: read_commands .................
+
+    #.................... Method: run ................
+    # This method runs the game until the GUI quits.  It sleeps until the
+    # game next needs to be updated (or CFRAMETIME ms, whilst a game is being
+    # played) unless a button is pressed or a command arrives first.
+    #
+    def run(self):
+        game = self.game
+        game.buttons.on_press = lambda event: self.wakeup.set()
+        threading.Thread(target = self.read_commands, name = "game commands", daemon = True).start()
+        while True:
+            timeout = None
+            if game.running():
+                now = perf_counter_ns()
+                wake = now + CFRAMETIME * CNS_PER_MS
+                deadline = game.next_update(now)
+                if deadline is not None:
+                    wake = min(wake, deadline)
+                timeout = max(wake - now, 0) / CNS_PER_SECOND
+            self.wakeup.wait(timeout)
+            self.wakeup.clear()
+            while not self.commands.empty():
+                if not self.obey(self.commands.get()):
+                    return
+            if game.running():
+                game.update(perf_counter_ns())
+            if game.running() != self.running:
+                self.running = game.running()
+                self.connection.send(("running", self.running))
+
+    # ................. end of method: run .................
+
+    #.................... Method: obey ................
+    # This method carries out a command from the GUI.
+    # It returns False if the GUI has quit.
+    #
+    def obey(self, command):
+        game = self.game
+        if command[0] == "start":
+            configs, speed, seed, player, adaptive = command[1:]
+            game.start_game(configs, speed, perf_counter_ns(), seed, player, adaptive)
+        elif command[0] == "stop":
+            game.stop_pressed()
+        elif command[0] == "press":
+            game.buttons.post(ButtonEvent(command[1], command[2]))
+        elif command[0] == "fetch":
+            self.connection.send(("value", getattr(game, command[1])))
+        elif command[0] == "quit":
+            return False
+        return True
+
+    # ................. end of method: obey .................
+
+#=================================================================
+
+#.................... Function: game_process ................
+# This function is run in the child process.  It builds the game, runs it
+# until the GUI quits and then turns off the LEDs and closes the inputs.
+# It is passed
+#   - connection : the child's end of the pipe
+#   - build : a function which is passed the view and 'args' and returns
+#             the GameEngine (it must be importable, e.g. build_hardware_game)
+#   - results_text : whether the GUI's view needs the text of the results
+#
+def game_process(connection, build, args, results_text = True):
+    game = build(PipeView(connection, results_text), *args)
+    game.feed = PipeFeed(connection)
+    try:
+        GameLoop(game, connection).run()
+    finally:
+        game.turnall_off()
+        game.buttons.close()
+        if game.history is not None:
+            game.history.close()
+        connection.close()
+
+# ..................... end of function : game_process .........
+
+#.................... Function: build_hardware_game ................
+# This function builds the game played on the PiRack: the boards of the
+# geometry, the game board buttons and the input socket, with every game
+# saved in the history and recorded.  The reaction times are corrected by
+# the calibrated latency of the boards and the timing between the
+# configurations is read from the timing file.
+#
+def build_hardware_game(view, numboards, ledspercolumn):
+    geometry = BoardGeometry(numboards, ledspercolumn)
+    init_boards(numboards)
+    leds = LEDBoards(numboards)
+    buttons = InputMultiplexer()
+    add_piface_inputs(buttons, geometry.columns)
+    try:
+        buttons.add("socket", SocketInput(commands = game_commands(geometry.columns)))
+    except OSError:
+        # the port is in use - the game is played without it
+        pass
+    game = GameEngine(leds, buttons, view, GameHistory(), geometry, load_schedule())
+    game.recorder = GameRecorder()
+    game.latency_correction = load_correction(calibration_key("piface", 0, numboards))
+    return game
+
+# ..................... end of function : build_hardware_game .........
+
+#==============================================================
+
+class GameProcess(object):
+    """ The game run in a child process, used by the GUI like a GameEngine. """
+
+    def __init__(self, view, build = build_hardware_game, args = ()):
+        self.view = view
+        # where the games are published for spectators (if anywhere)
+        self.feed = None
+        self.playing = False
+        context = multiprocessing.get_context(CSTARTMETHOD)
+        self.connection, child = context.Pipe()
+        results_text = getattr(view, "results_text", True)
+        self.process = context.Process(target = game_process, args = (child, build, args, results_text),
+                                       name = "LED game", daemon = True)
+        self.process.start()
+        child.close()
+
+    #.................... Method: start_game ................
+    # This method starts a game, as GameEngine.start_game() does (the game
+    # process takes the time the game started itself)
+    #
+    def start_game(self, configs, speed, now, seed = None, player = CDEFAULTPLAYER, adaptive = False):
+        # anything the last game sent is shown first
+        self.update(now)
+        self.connection.send(("start", configs, speed, seed, player, adaptive))
+        self.playing = True
+
+    # ................. end of method: start_game .................
+
+    #.................... Method: stop_pressed ................
+    # This method stops the game, as if STOP had been pressed
+    #
+    def stop_pressed(self):
+        self.connection.send(("stop",))
+
+    # ................. end of method: stop_pressed .................
+
+    #.................... Method: post ................
+    # This method sends a button press (e.g. a key) to the game, so that a
+    # KeyboardInput can be attached to the GameProcess
+    #
+    def post(self, event):
+        self.connection.send(("press", event.button, event.timestamp))
+
+    # ................. end of method: post .................
+
+    #.................... Method: update ................
+    # This method shows everything the game has sent since the last update.
+    # It never waits.
+    #
+    def update(self, now):
+        while self.connection.poll():
+            self.received(self.connection.recv())
+
+    # ................. end of method: update .................
+
+    #.................... Method: received ................
+    # This method acts on a message from the game process
+    #
+    def received(self, message):
+        if message[0] == "view":
+            getattr(self.view, message[1])(*message[2])
+        elif message[0] == "feed":
+            if self.feed is not None:
+                self.feed.publish(message[1], message[2])
+        elif message[0] == "running":
+            self.playing = message[1]
+
+    # ................. end of method: received .................
+
+    #.................... Method: running ................
+    # This method returns True whilst a game is in progress (i.e. update()
+    # needs to be called to show what the game sends)
+    #
+    def running(self):
+        return self.playing
+
+    # ................. end of method: running .................
+
+    #.................... Method: next_update ................
+    # This method returns None: the game process keeps its own time and the
+    # GUI only needs to show what it sends every frame
+    #
+    def next_update(self, now):
+        return None
+
+    # ................. end of method: next_update .................
+
+    #.................... Method: fetch ................
+    # This method returns an attribute of the game in the game process (e.g.
+    # measurements made by it), showing anything sent before it
+    #
+    def fetch(self, name):
+        self.connection.send(("fetch", name))
+        while True:
+            message = self.connection.recv()
+            if message[0] == "value":
+                return message[1]
+            self.received(message)
+
+    # ................. end of method: fetch .................
+
+    #.................... Method: close ................
+    # This method tells the game process to quit and waits for it to turn
+    # off the LEDs and close its inputs
+    #
+    def close(self):
+        try:
+            self.connection.send(("quit",))
+        except OSError:
+            # the game process has already gone
+            pass
+        self.process.join(CQUITTIME)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.connection.close()
+
+    # ................. end of method: close .................
+
+#=================================================================
@@ -0,0 +1,472 @@
+#!/usr/bin/env python
+
+#==============================================================
+#
+# Authors:      Christine Smythe and Colin Smythe (Dunelm Services Limited)
+# Version:      1.0
+# Release Date: 1st November, 2013
+#
+# Description:  This Python3 program plays the LED Counting Game head to head:
+#               two players watch the same PiRack, each with their own set of
+#               column buttons, and the first to press the correct column
+#               wins the configuration.
+#
+#               Player 1 uses the game board buttons (and START and STOP) on
+#               the button board, player 2 the inputs of the board after it,
+#               input 0 choosing column 1 (see duel_buttons()).  Each player
+#               has one answer per configuration - a wrong press locks that
+#               player out of it - and the configuration ends when both have
+#               answered, when it times out or CMARGINWINDOW ms after the
+#               first correct press, so the other player's margin can still
+#               be measured.
+#
+#               The presses are read by their interrupts (see ButtonInput in
+#               ledinputv1p0p0.py) so each is timestamped as it happens, to a
+#               fraction of a millisecond, and the presses of the two players
+#               are compared by their timestamps rather than by the order they
+#               are polled in.  Every ButtonEvent carries the uncertainty of its
+#               timestamp: two correct presses closer together than the sum of
+#               their uncertainties cannot be told apart and are a tie.  If the
+#               buttons are polled (--polled, see PolledButtonInput) each press
+#               is only known to within half the polling interval, so more
+#               close presses are ties.  The margin of victory is the time (ms)
+#               between the two correct presses.
+#
+#               Each player's results are kept in their own PlayerResults and
+#               are saved in the history as a game of their own.
+#
+#               Usage:  python3 ledheadtoheadv1p0p0.py [configs] [speed] [player 1] [player 2] [--polled]
+#                       plays one head to head game on the PiRack
+#
+# History:      Original release.
+#
+# Copyright:    2013 (c) Premier Farnell Limited
+#
+# License:      GPLv3+
+#
+#==============================================================
+
+import sys
+import threading
+from collections import deque, namedtuple
+from time import perf_counter_ns
+from ledboardsv1p0p0 import LEDBoards, init_boards, CGEOMETRY, CLEDSPERBOARD
+from ledboardsv1p0p0 import CNS_PER_SECOND, CNS_PER_MS
+from ledinputv1p0p0 import ButtonInput, PolledButtonInput, CBOARDwithBUTTONS
+from ledgameenginev1p0p0 import GameEngine, column_buttons, CSTARTBUTTON, CSTOPBUTTON
+from ledgameenginev1p0p0 import CSTATE_AWAITING, CRESULTSWINDOW
+from ledresultsv1p0p0 import PlayerResults, RunningStats
+
+#==============================================================
+# Declaration of Constants
+
+CDEFAULTCONFIGS = 10;   # number of configurations in a game played from the command line
+CDEFAULTSPEED = 2000;   # speed (ms) of a game played from the command line
+CMARGINWINDOW = 1000;   # ms the other player has to answer after the first correct press
+CMAXDUELCOLUMNS = 6;    # most columns player 1 has buttons for (1 to 4, then inputs 6 and 7)
+CDUEL_ROW = 8.0;        # the status row each configuration's winner is shown on
+CUPDATETIME = 0.01;     # most seconds between updates of a game played from the command line
+
+# player 2's column buttons are the inputs of the board after the button board
+CPLAYER2_FIRSTBUTTON = CLEDSPERBOARD;
+
+CDEFAULTPLAYERS = ("Player 1", "Player 2");
+
+# the outcome of one configuration: the correct column, each player's answer
+# (0 for none) and time (ms, speed + 1 for none), the winning player (1 or 2,
+# 0 if nobody won or it was a tie), whether it was a tie and the margin (ms)
+# between the two correct presses (None unless both players were correct)
+DuelResult = namedtuple("DuelResult", "configno correct_column answers times winner tie margin")
+
+#==============================================================
+
+#.................... Function: duel_buttons ................
+# This function returns the column buttons of each player, in column order,
+# for a head to head game of 'columns' columns
+#
+def duel_buttons(columns):
+    if columns > CMAXDUELCOLUMNS:
+        raise ValueError("there are not enough buttons for two players with " + str(columns) + " columns")
+    return (column_buttons(columns),
+            tuple(range(CPLAYER2_FIRSTBUTTON, CPLAYER2_FIRSTBUTTON + columns)))
+
+# ..................... end of function : duel_buttons .........
+
+#.................... Function: duel_commands ................
+# This function returns the game button for each socket command in a head
+# to head game: "start", "stop", the number of a column for player 1 and
+# "b" and the number of a column for player 2 (e.g. "b3")
+#
+def duel_commands(columns = CGEOMETRY.columns):
+    commands = {"start" : CSTARTBUTTON, "stop" : CSTOPBUTTON}
+    first, second = duel_buttons(columns)
+    for column in range(0, columns):
+        commands[str(column + 1)] = first[column]
+        commands["b" + str(column + 1)] = second[column]
+    return commands
+
+# ..................... end of function : duel_commands .........
+
+#.................... Function: add_duel_inputs ................
+# This function adds the PiFace buttons of both players to a multiplexer:
+# START, STOP and player 1's columns on the button board and player 2's
+# columns on the board after it.  If 'polled' is True the inputs are read
+# by polling rather than by their interrupts.
+#
+def add_duel_inputs(multiplexer, columns = CGEOMETRY.columns, board = CBOARDwithBUTTONS, polled = False):
+    Input = ButtonInput
+    if polled:
+        Input = PolledButtonInput
+    first, second = duel_buttons(columns)
+    multiplexer.add("player 1", Input(board, (CSTARTBUTTON,) + first + (CSTOPBUTTON,)))
+    multiplexer.add("player 2", Input(board + 1,
+        mapping = dict((button, button - CPLAYER2_FIRSTBUTTON) for button in second)))
+
+# ..................... end of function : add_duel_inputs .........
+
+#==============================================================
+
+class HeadToHeadGame(GameEngine):
+    """ The LED Counting Game played by two players at once. """
+
+    def __init__(self, leds, buttons, view, history = None, geometry = CGEOMETRY):
+        # each player's game is saved in the history when the game ends, so
+        # the engine itself saves nothing
+        super(HeadToHeadGame, self).__init__(leds, buttons, view, None, geometry)
+        self.player_history = history
+        # the player (0 or 1) and column (1 upwards) of each column button
+        self.players_buttons = duel_buttons(geometry.columns)
+        self.button_columns = {}
+        for player, buttons in enumerate(self.players_buttons):
+            for column, button in enumerate(buttons):
+                self.button_columns[button] = (player, column + 1)
+        self.awaited_buttons = tuple(self.button_columns) + (CSTOPBUTTON,)
+        self.names = CDEFAULTPLAYERS
+        self.player_results = (PlayerResults(), PlayerResults())
+        # the outcome of the latest CRESULTSWINDOW configurations, the wins
+        # of each player, the ties and the margins of victory (ms)
+        self.duels = deque(maxlen = CRESULTSWINDOW)
+        self.wins = [0, 0]
+        self.ties = 0
+        self.margins = RunningStats()
+        # each player's answer to the configuration showing, as (column,
+        # ButtonEvent), and when it closes after the first correct press
+        self.answers = [None, None]
+        self.closing = None
+
+    #.................... Method: start_game ................
+    # This method starts a head to head game, as GameEngine.start_game()
+    # does, with the names of the two players
+    #
+    def start_game(self, configs, speed, now, seed = None, players = CDEFAULTPLAYERS):
+        self.names = tuple(players)
+        for results in self.player_results:
+            results.reset()
+        self.duels.clear()
+        self.wins = [0, 0]
+        self.ties = 0
+        self.margins.reset()
+        super(HeadToHeadGame, self).start_game(configs, speed, now, seed, " v ".join(self.names))
+
+    # ................. end of method: start_game .................
+
+    #.................... Method: update ................
+    # This method advances the game, as GameEngine.update() does, except that
+    # whilst a configuration is showing every press is taken as it comes and
+    # the configuration ends when it has been decided
+    #
+    def update(self, now):
+        if self.state != CSTATE_AWAITING:
+            super(HeadToHeadGame, self).update(now)
+            return
+        event = self.poll_buttons(self.awaited_buttons, self.starttime)
+        while event is not None:
+            if event.button == CSTOPBUTTON:
+                self.stop_pressed()
+                return
+            # presses after the timeout are too late to count
+            if event.timestamp <= self.timeout:
+                self.answer(event)
+            event = self.poll_buttons(self.awaited_buttons, self.starttime)
+        if None not in self.answers or now >= self.timeout or \
+           (self.closing is not None and now >= self.closing):
+            self.process_config(self.count, self.trial_speed, None)
+            self.calculate_statistics(self.count, self.speed)
+            if self.StopSwitch == True or self.count == self.configs:
+                self.end_game()
+            else:
+                self.count = self.count + 1
+                self.arm(now)
+
+    # ................. end of method: update .................
+
+    #.................... Method: answer ................
+    # This method takes a player's press of a column button.  Only the first
+    # press of each player counts.  The first correct press closes the
+    # configuration CMARGINWINDOW ms later.
+    #
+    def answer(self, event):
+        player, column = self.button_columns[event.button]
+        if self.answers[player] is not None:
+            return
+        self.answers[player] = (column, event)
+        if column == self.pattern(self.count).correct_column and self.closing is None:
+            self.closing = min(event.timestamp + CMARGINWINDOW * CNS_PER_MS, self.timeout)
+
+    # ................. end of method: answer .................
+
+    #.................... Method: next_update ................
+    # This method returns the time the game next needs to be updated, as
+    # GameEngine.next_update() does, including when the configuration closes
+    #
+    def next_update(self, now):
+        deadline = super(HeadToHeadGame, self).next_update(now)
+        if self.state == CSTATE_AWAITING and self.closing is not None:
+            deadline = min(deadline, self.closing)
+        return deadline
+
+    # ................. end of method: next_update .................
+
+    #.................... Method: show_config ................
+    # This method shows the next configuration with neither player answered
+    #
+    def show_config(self):
+        self.answers = [None, None]
+        self.closing = None
+        super(HeadToHeadGame, self).show_config()
+
+    # ................. end of method: show_config .................
+
+    #.................... Method: process_config ................
+    # This method decides the configuration from the players' answers and
+    # adds the result to each player's results.  The winner is the player
+    # whose correct press has the earliest timestamp, unless the other player
+    # was also correct and the two presses are within the sum of their
+    # uncertainties, when it is a tie.
+    # It is passed
+    #   - configno : the number of the configuration currently being played
+    #   - speed : the speed of this configuration, and hence the timeout too
+    #   - event : not used (the answers have already been taken)
+    #
+    def process_config(self, configno, speed, event):
+        correct_column = self.pattern(configno).correct_column
+        answers = []
+        times = []
+        correct = []
+        for player, results in enumerate(self.player_results):
+            player_answer = 0
+            player_time = speed + 1
+            if self.answers[player] is not None:
+                player_answer, pressed = self.answers[player]
+                # the time taken as for one player, less the system latency
+                player_time = (pressed.timestamp - self.starttime) / CNS_PER_MS
+                player_time = min(max(player_time - self.latency_correction, 0.0), speed)
+                if player_answer == correct_column:
+                    correct.append((pressed.timestamp, player, pressed))
+            results.add(correct_column, player_answer, player_time, speed)
+            answers.append(player_answer)
+            times.append(player_time)
+
+        winner = 0
+        tie = False
+        margin = None
+        if correct:
+            correct.sort()
+            winner = correct[0][1] + 1
+            if len(correct) == 2:
+                first = correct[0][2]
+                second = correct[1][2]
+                margin = (second.timestamp - first.timestamp) / CNS_PER_MS
+                if second.timestamp - first.timestamp <= first.uncertainty + second.uncertainty:
+                    tie = True
+                    winner = 0
+        if tie:
+            self.ties = self.ties + 1
+        elif winner:
+            self.wins[winner - 1] = self.wins[winner - 1] + 1
+            if margin is not None:
+                self.margins.add(margin)
+
+        # the rate configurations are shown is timed from the first one
+        if configno == 1:
+            self.first_shown = self.starttime
+
+        duel = DuelResult(configno, correct_column, tuple(answers), tuple(times), winner, tie, margin)
+        self.duels.append(duel)
+        self.view.show_status(CDUEL_ROW, "\n" + self.describe(duel))
+        if self.feed is not None:
+            self.feed.publish("duel", {"config" : configno, "correct_column" : correct_column,
+                                       "answers" : answers, "times" : times, "winner" : winner,
+                                       "tie" : tie, "margin" : margin})
+        self.turnall_off()
+
+    # end of method: process_config..............................
+
+    #.................... Method: describe ................
+    # This method returns the outcome of a configuration as a line of text
+    #
+    def describe(self, duel):
+        text = "Config " + str(duel.configno) + ": "
+        if duel.tie:
+            text = text + "tie"
+        elif duel.winner:
+            text = text + self.names[duel.winner - 1] + " wins"
+        else:
+            text = text + "nobody wins"
+        if duel.margin is not None:
+            text = text + " by " + str(round(duel.margin, 3)) + " ms"
+        return text
+
+    # ................. end of method: describe .................
+
+    #.................... Method: calculate_statistics ................
+    # This method puts each player's statistics, their wins, the ties and
+    # the margins of victory in the stats panel
+    #
+    def calculate_statistics(self, configs, speed):
+        stats = "Statistics : \n"
+        if configs == 0:
+            # stopped before any configuration was played
+            self.view.show_statistics(stats)
+            return
+
+        stats = stats + "\n\t\t" + self.names[0] + "\t" + self.names[1]
+        lines = (("Wins", lambda player, results: self.wins[player]),
+                 ("Correct", lambda player, results: results.correct_count),
+                 ("Wrong", lambda player, results: results.wrong_count),
+                 ("Timeout", lambda player, results: results.timeout_count),
+                 ("Average time", lambda player, results: round(0.001*results.times.mean, 4)))
+        for name, value in lines:
+            stats = stats + "\n" + name + "\t\t"
+            stats = stats + "\t".join(str(value(player, results))
+                                      for player, results in enumerate(self.player_results))
+        stats = stats + "\n\nTies\t\t" + str(self.ties)
+        stats = stats + "\nTotal\t\t" + str(configs)
+        if self.margins.count:
+            stats = stats + "\n\nAverage margin\t\t" + str(round(self.margins.mean, 3)) + " ms"
+            stats = stats + "\nClosest margin\t\t" + str(round(self.margins.minimum, 3)) + " ms\n"
+
+        self.view.show_statistics(stats)
+
+    # end of method: calculate_statistics..............................
+
+    #.................... Method: calculate_results ................
+    # This method puts the outcome of each of the latest CRESULTSWINDOW
+    # configurations in the results panel: the correct column, each
+    # player's choice and time, the winner and the margin
+    #
+    def calculate_results(self, configs, speed):
+        parts = ["Results : \n",
+                 "Config\tCorrect\tPlayer 1\t\tPlayer 2\t\tWinner\tMargin\n",
+                 "Number\tColumn\tChoice\tTime\tChoice\tTime\t\tms\n"]
+        for duel in self.duels:
+            line = "\n" + str(duel.configno) + "\t" + str(duel.correct_column)
+            for answer, player_time in zip(duel.answers, duel.times):
+                line = line + "\t" + str(answer) + "\t"
+                if answer == 0:
+                    line = line + "Timeout"
+                else:
+                    line = line + str(round(player_time*0.001, 4))
+            if duel.tie:
+                line = line + "\tTie"
+            elif duel.winner:
+                line = line + "\t" + str(duel.winner)
+            else:
+                line = line + "\t-"
+            if duel.margin is not None:
+                line = line + "\t" + str(round(duel.margin, 3))
+            parts.append(line)
+
+        self.view.show_results("".join(parts))
+
+    # end of method: calculate_results..............................
+
+    #.................... Method: end_game ................
+    # This method ends the game as GameEngine.end_game() does, then saves
+    # each player's results in the history as a game of their own
+    #
+    def end_game(self):
+        super(HeadToHeadGame, self).end_game()
+        if self.player_history is not None and self.count > 0:
+            for name, results in zip(self.names, self.player_results):
+                self.player_history.save_game(name, self.started, results.speeds.maximum,
+                                              self.seed, results)
+
+    # ................. end of method: end_game .................
+
+#==============================================================
+
+class DuelView(object):
+    """ A view which prints what a head to head game displays. """
+
+    def __init__(self):
+        # the latest statistics, printed when the game ends
+        self.statistics = ""
+
+    def show_status(self, row, status):
+        if status.strip():
+            print(status.strip())
+
+    def show_statistics(self, stats):
+        self.statistics = stats
+
+    def show_results(self, results):
+        if results.strip():
+            print(results)
+
+    def show_result(self, configno, correct_column, player_answer, player_time, speed):
+        pass
+
+#=================================================================
+# main
+#=================================================================
+
+if __name__ == "__main__":
+    from ledmultiplexv1p0p0 import InputMultiplexer, SocketInput
+    from ledhistoryv1p0p0 import GameHistory
+    from ledcalibratev1p0p0 import calibration_key, load_correction
+    arguments = [argument for argument in sys.argv[1:] if argument != "--polled"]
+    polled = len(arguments) < len(sys.argv) - 1
+    configs = CDEFAULTCONFIGS
+    speed = CDEFAULTSPEED
+    players = list(CDEFAULTPLAYERS)
+    if len(arguments) > 0:
+        configs = int(arguments[0])
+    if len(arguments) > 1:
+        speed = int(arguments[1])
+    players[0:len(arguments[2:4])] = arguments[2:4]
+    geometry = CGEOMETRY
+    init_boards(geometry.numboards)
+    leds = LEDBoards(geometry.numboards)
+    buttons = InputMultiplexer()
+    add_duel_inputs(buttons, geometry.columns, polled = polled)
+    try:
+        buttons.add("socket", SocketInput(commands = duel_commands(geometry.columns)))
+    except OSError:
+        # the port is in use - the game is played without it
+        pass
+    history = GameHistory()
+    view = DuelView()
+    game = HeadToHeadGame(leds, buttons, view, history, geometry)
+    game.latency_correction = load_correction(calibration_key("piface", 0, geometry.numboards))
+    # the game is updated as soon as a button is pressed
+    wakeup = threading.Event()
+    buttons.on_press = lambda event: wakeup.set()
+    print("Press START on the game board")
+    game.start_game(configs, speed, perf_counter_ns(), players = players)
+    try:
+        while game.running():
+            now = perf_counter_ns()
+            timeout = CUPDATETIME
+            deadline = game.next_update(now)
+            if deadline is not None:
+                timeout = min(timeout, max(deadline - now, 0) / CNS_PER_SECOND)
+            wakeup.wait(timeout)
+            wakeup.clear()
+            game.update(perf_counter_ns())
+    except KeyboardInterrupt:
+        game.stop_pressed()
+    print(view.statistics)
+    game.turnall_off()
+    buttons.close()
+    history.close()
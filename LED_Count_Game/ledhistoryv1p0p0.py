@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+
+#==============================================================
+#
+# Authors:      Christine Smythe and Colin Smythe (Dunelm Services Limited)
+# Version:      1.0
+# Release Date: 1st November, 2013
+#
+# Description:  This Python3 module keeps the history of every LED Counting
+#               Game played in a local SQLite database.
+#
+#               Each game is a row in the 'sessions' table (with its totals so
+#               that leaderboards do not need to look at the trials) and each
+#               configuration played is a row in the 'trials' table.  A game is
+#               written in a single transaction when it ends so the SD card is
+#               not written after every configuration.  The trials are passed
+#               to SQLite as they are read back from the results, so saving a
+#               long game does not build a list of all of its trials.
+#
+#               The sessions are indexed by player, date, speed, number of
+#               configurations and correct time so that the leaderboard and
+#               personal best queries stay fast however many games are stored.
+#               Games are ranked on the average time of their correct answers
+#               (the average time of all answers counts a timeout as the speed
+#               + 1, so pressing nothing at a fast speed would win), and only
+#               games with at least CMINACCURACY of their answers correct are
+#               ranked at all.
+#
+# History:      Original release.
+#
+# Copyright:    2013 (c) Premier Farnell Limited
+#
+# License:      GPLv3+
+#
+#==============================================================
+
+import os
+import sqlite3
+
+#==============================================================
+# Declaration of Constants
+
+# the database is kept in the same directory as the game
+CHISTORYFILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ledcountgame.db")
+
+CLEADERBOARDSIZE = 20;  # number of games shown in a leaderboard
+CMINACCURACY = 0.8;     # fraction of a game's configurations which must be correct for it to be ranked
+
+CSCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id      INTEGER PRIMARY KEY,
+    player          TEXT NOT NULL,
+    started         REAL NOT NULL,
+    speed           INTEGER NOT NULL,
+    configs         INTEGER NOT NULL,
+    seed            INTEGER,
+    correct_count   INTEGER NOT NULL,
+    wrong_count     INTEGER NOT NULL,
+    timeout_count   INTEGER NOT NULL,
+    average_time    REAL NOT NULL,
+    correct_time    REAL
+);
+CREATE TABLE IF NOT EXISTS trials (
+    session_id      INTEGER NOT NULL REFERENCES sessions(session_id),
+    configno        INTEGER NOT NULL,
+    correct_column  INTEGER NOT NULL,
+    player_answer   INTEGER NOT NULL,
+    player_correct  INTEGER NOT NULL,
+    player_time     REAL NOT NULL,
+    speed           INTEGER,
+    PRIMARY KEY (session_id, configno)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS sessions_by_date ON sessions(started);
+CREATE INDEX IF NOT EXISTS sessions_by_configs ON sessions(configs);
+"""
+
+# the indexes of the sessions ranked by their correct time, made once the
+# correct times of a history saved before they were kept have been worked out
+CRANKINDEXES = """
+DROP INDEX IF EXISTS sessions_by_player;
+DROP INDEX IF EXISTS sessions_by_speed;
+DROP INDEX IF EXISTS sessions_by_time;
+CREATE INDEX IF NOT EXISTS sessions_by_player_correct ON sessions(player, correct_time);
+CREATE INDEX IF NOT EXISTS sessions_by_speed_correct ON sessions(speed, correct_time);
+CREATE INDEX IF NOT EXISTS sessions_by_correct_time ON sessions(correct_time);
+"""
+
+# the average time of the correct answers of a session, from its trials
+CCORRECT_TIME = """
+UPDATE sessions SET correct_time =
+    (SELECT AVG(player_time) FROM trials
+     WHERE trials.session_id = sessions.session_id AND player_correct = 1)
+"""
+
+# a leaderboard or personal best row: the player, the date the game was
+# played, its speed and number of configurations, the number correct and
+# the average time of the correct answers in ms
+CSESSION_COLUMNS = "player, started, speed, configs, correct_count, correct_time"
+
+# the sessions which are ranked: those with correct answers, enough of them
+CRANKED = "correct_time IS NOT NULL AND correct_count >= configs * ?"
+
+#==============================================================
+
+class GameHistory(object):
+    """ SQLite store of the LED Counting Games played. """
+
+    def __init__(self, filename = CHISTORYFILE):
+        self.db = sqlite3.connect(filename)
+        # write ahead logging means fewer writes to the SD card
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(CSCHEMA)
+        # histories saved before the speed of each trial was kept
+        columns = [row[1] for row in self.db.execute("PRAGMA table_info(trials)")]
+        if "speed" not in columns:
+            self.db.execute("ALTER TABLE trials ADD COLUMN speed INTEGER")
+        # histories saved before the correct time of each game was kept
+        columns = [row[1] for row in self.db.execute("PRAGMA table_info(sessions)")]
+        with self.db:
+            if "correct_time" not in columns:
+                self.db.execute("ALTER TABLE sessions ADD COLUMN correct_time REAL")
+                self.db.execute(CCORRECT_TIME)
+            self.db.executescript(CRANKINDEXES)
+
+    #.................... Method: save_game ................
+    # This method saves a game and all of its results in one transaction.
+    # It is passed the following parameters:
+    #   - player  = the player's name
+    #   - started = the time the game started (as given by time.time())
+    #   - speed   = the speed the player chose (the slowest speed played
+    #               for an adaptive game)
+    #   - seed    = the seed used for the patterns
+    #   - results = the PlayerResults for the game
+    # It returns the session id of the saved game.
+    #
+    def save_game(self, player, started, speed, seed, results):
+        # the results are read back a chunk at a time as they are inserted
+        trials = enumerate(results.rows(), 1)
+        with self.db:
+            cursor = self.db.execute(
+                "INSERT INTO sessions (player, started, speed, configs, seed,"
+                " correct_count, wrong_count, timeout_count, average_time)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (player, started, speed, len(results), seed,
+                 results.correct_count, results.wrong_count,
+                 results.timeout_count, results.times.mean))
+            session_id = cursor.lastrowid
+            self.db.executemany(
+                "INSERT INTO trials (session_id, configno, correct_column,"
+                " player_answer, player_correct, player_time, speed)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                ((session_id, configno) + trial for configno, trial in trials))
+            self.db.execute(CCORRECT_TIME + " WHERE session_id = ?", (session_id,))
+        return session_id
+
+    # ................. end of method: save_game .................
+
+    #.................... Method: leaderboard ................
+    # This method returns the ranked games with the best (lowest) average
+    # times of their correct answers.
+    # It is passed the following parameters:
+    #   - max_speed   = only games played at this speed (ms) or faster count
+    #   - min_configs = only games with at least this many configurations count
+    #   - limit       = the number of games to return
+    #   - accuracy    = only games with at least this fraction correct count
+    # It returns a list of (player, started, speed, configs, correct_count,
+    # correct_time) tuples, best first.
+    #
+    def leaderboard(self, max_speed, min_configs = 1, limit = CLEADERBOARDSIZE,
+                    accuracy = CMINACCURACY):
+        return self.db.execute(
+            "SELECT " + CSESSION_COLUMNS + " FROM sessions"
+            " WHERE speed <= ? AND configs >= ? AND " + CRANKED +
+            " ORDER BY correct_time LIMIT ?",
+            (max_speed, min_configs, accuracy, limit)).fetchall()
+
+    # ................. end of method: leaderboard .................
+
+    #.................... Method: personal_best ................
+    # This method returns a player's best (lowest correct time) ranked games.
+    # It is passed the following parameters:
+    #   - player    = the player's name
+    #   - max_speed = only games played at this speed (ms) or faster count
+    #   - limit     = the number of games to return
+    #   - accuracy  = only games with at least this fraction correct count
+    # It returns a list of rows as for leaderboard(), best first.
+    #
+    def personal_best(self, player, max_speed, limit = CLEADERBOARDSIZE, accuracy = CMINACCURACY):
+        return self.db.execute(
+            "SELECT " + CSESSION_COLUMNS + " FROM sessions"
+            " WHERE player = ? AND speed <= ? AND " + CRANKED +
+            " ORDER BY correct_time LIMIT ?",
+            (player, max_speed, accuracy, limit)).fetchall()
+
+    # ................. end of method: personal_best .................
+
+    #.................... Method: session_range ................
+    # This method returns the (first, last) session ids saved, or
+    # (None, None) if no games have been saved
+    #
+    def session_range(self):
+        return self.db.execute("SELECT MIN(session_id), MAX(session_id) FROM sessions").fetchone()
+
+    # ................. end of method: session_range .................
+
+    #.................... Method: sessions ................
+    # This method returns the (session_id, player, started) of the sessions
+    # first to last, in session id order
+    #
+    def sessions(self, first, last):
+        return self.db.execute(
+            "SELECT session_id, player, started FROM sessions"
+            " WHERE session_id BETWEEN ? AND ? ORDER BY session_id",
+            (first, last)).fetchall()
+
+    # ................. end of method: sessions .................
+
+    #.................... Method: trials ................
+    # This method returns a cursor over the trials of the sessions first to
+    # last, each a (session_id, speed, player_answer, player_correct,
+    # player_time) row, in the order they were played.  The speed is the
+    # speed of the trial (or of its session if it was saved before the speed
+    # of each trial was kept)
+    #
+    def trials(self, first, last):
+        return self.db.execute(
+            "SELECT trials.session_id, COALESCE(trials.speed, sessions.speed),"
+            " player_answer, player_correct, player_time"
+            " FROM trials JOIN sessions ON sessions.session_id = trials.session_id"
+            " WHERE trials.session_id BETWEEN ? AND ?"
+            " ORDER BY trials.session_id, configno",
+            (first, last))
+
+    # ................. end of method: trials .................
+
+    #.................... Method: close ................
+    # This method closes the database
+    #
+    def close(self):
+        self.db.close()
+
+    # ................. end of method: close .................
+
+#=================================================================
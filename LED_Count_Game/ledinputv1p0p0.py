@@ -0,0 +1,275 @@
+#!/usr/bin/env python
+
+#==============================================================
+#
+# Authors:      Christine Smythe and Colin Smythe (Dunelm Services Limited)
+# Version:      1.0
+# Release Date: 1st November, 2013
+#
+# Description:  This Python3 module provides the interrupt driven button input
+#               used by the LED Counting Game.
+#
+#               Instead of polling the buttons with pfio.digital_read() an
+#               InputEventListener is registered on the input port of the board
+#               with the buttons wired.  Each button press is put on an event
+#               queue together with the timestamp taken when the interrupt
+#               occurred.  The game then waits on the queue with a deadline, or
+#               polls it.  An 'on_press' function may also be set which is
+#               called (from the listener's thread) after each press is queued
+#               so that a game which polls can react straight away.
+#
+#               Timestamps are in nanoseconds from the monotonic clock given by
+#               time.perf_counter_ns(), the clock used to time the game.
+#
+#               The queue, waiting and polling are in EventQueue so that other
+#               sources of presses can be used in the same way, and a
+#               ButtonInput can be attached to another EventQueue (e.g. an
+#               InputMultiplexer, see ledmultiplexv1p0p0.py) to put its presses
+#               on that queue instead of its own.
+#
+#               Each press also carries its 'uncertainty': how far (ns) either
+#               side of its timestamp the button may really have been pressed.
+#               An interrupt is timestamped by the listener as it wakes, so
+#               its uncertainty is small (CINTERRUPTUNCERTAINTY).  Where the
+#               interrupts cannot be used PolledButtonInput reads the input
+#               port every CPOLLINTERVAL instead.  A polled press is only known
+#               to have happened between the read before it and the read which
+#               saw it, so it is timestamped at the middle of that window and
+#               its uncertainty is half the window: about +/-0.5 ms at the
+#               default 1 ms interval (plus the time taken to read the port),
+#               and +/-5 ms for the old 10 ms polling of the game loop.  Two
+#               presses closer together than the sum of their uncertainties
+#               cannot be told apart (see ledheadtoheadv1p0p0.py).
+#
+# History:      Original release.
+#
+# Copyright:    2013 (c) Premier Farnell Limited
+#
+# License:      GPLv3+
+#
+#==============================================================
+
+import queue
+import threading
+from collections import namedtuple
+from time import sleep, time_ns, perf_counter_ns
+
+#==============================================================
+# Declaration of Constants
+
+CBOARDwithBUTTONS = 0;  # the piface with the buttons wired is board 0
+CNUMBUTTONS = 8;        # number of inputs on a PiFace board
+
+CINTERRUPTUNCERTAINTY = 100000;  # ns either side of an interrupt's timestamp the press may have been
+CPOLLINTERVAL = 1000000;         # ns between reads of the input port by PolledButtonInput
+
+# a button press: the button (input) number, the time it was pressed and how
+# far (ns) either side of that time it may have been pressed (0 if exactly)
+ButtonEvent = namedtuple("ButtonEvent", "button timestamp uncertainty", defaults = (0,))
+
+#==============================================================
+
+class EventQueue(object):
+    """ A queue of timestamped button presses which the game waits on or polls. """
+
+    def __init__(self):
+        # the queue of button presses waiting to be processed
+        self.events = queue.Queue()
+        # called with the ButtonEvent after each press is queued
+        self.on_press = None
+
+    #.................... Method: post ................
+    # This method queues a button press (it may be called from any thread)
+    # It is passed event = the ButtonEvent
+    #
+    def post(self, event):
+        self.events.put(event)
+        if self.on_press is not None:
+            self.on_press(event)
+
+    # ................. end of method: post .................
+
+    #.................... Method: clear ................
+    # This method throws away any button presses which have not been processed
+    #
+    def clear(self):
+        try:
+            while True:
+                self.events.get_nowait()
+        except queue.Empty:
+            pass
+
+    # ................. end of method: clear .................
+
+    #.................... Method: wait ................
+    # This method waits until one of the chosen buttons is pressed or until
+    # the deadline is reached.  Presses of other buttons are ignored.
+    # It is passed the following parameters:
+    #   - buttons  = the button numbers to wait for
+    #   - deadline = the time (as given by perf_counter_ns()) to stop waiting
+    #   - since    = presses with an earlier timestamp than this are ignored
+    # It returns the ButtonEvent for the press or None if the deadline passed.
+    #
+    def wait(self, buttons, deadline, since = 0):
+        remaining = deadline - perf_counter_ns()
+        while remaining > 0:
+            try:
+                event = self.events.get(timeout = remaining / 1000000000)
+            except queue.Empty:
+                return None
+            if event.button in buttons and event.timestamp >= since:
+                return event
+            remaining = deadline - perf_counter_ns()
+        return None
+
+    # ................. end of method: wait .................
+
+    #.................... Method: poll ................
+    # This method returns the next press of one of the chosen buttons without
+    # waiting.  Presses of other buttons are thrown away.
+    # It is passed the following parameters:
+    #   - buttons  = the button numbers to look for
+    #   - since    = presses with an earlier timestamp than this are ignored
+    # It returns the ButtonEvent for the press or None if there is no press.
+    #
+    def poll(self, buttons, since = 0):
+        try:
+            while True:
+                event = self.events.get_nowait()
+                if event.button in buttons and event.timestamp >= since:
+                    return event
+        except queue.Empty:
+            return None
+
+    # ................. end of method: poll .................
+
+#==============================================================
+
+class ButtonInput(EventQueue):
+    """ Interrupt driven button input for a PiFace board. """
+
+    def __init__(self, board = CBOARDwithBUTTONS, buttons = range(0, CNUMBUTTONS),
+                 chip_select = 0, mapping = None):
+        super(ButtonInput, self).__init__()
+        # the queue the presses are put on (this input's own unless it is
+        # attached to another)
+        self.target = self
+        # the button reported for each input used.  A mapping of button number
+        # to input number may be given if the buttons are not wired to the
+        # inputs with the same numbers
+        if mapping is None:
+            mapping = dict((button, button) for button in buttons)
+        self.buttons_by_pin = dict((pin, button) for button, pin in mapping.items())
+        # listen for a button being pressed (the input falling to 0V)
+        import pifacedigitalio as pfio
+        self.listener = pfio.InputEventListener(
+            chip = pfio.PiFaceDigital(hardware_addr = board, chip_select = chip_select,
+                                      init_board = False))
+        for pin in self.buttons_by_pin:
+            self.listener.register(pin, pfio.IODIR_FALLING_EDGE, self.button_pressed)
+        self.listener.activate()
+
+    #.................... Method: button_pressed ................
+    # This method is called by the event listener when a button is pressed.
+    # It queues the button number (for the input) with the timestamp of the
+    # interrupt on the queue it is attached to.
+    # The listener timestamps the interrupt with the wall clock (time.time())
+    # so it is converted to the game clock by taking off how long ago the
+    # interrupt happened.
+    #
+    def button_pressed(self, event):
+        age = time_ns() - int(event.timestamp * 1000000000)
+        pressed = ButtonEvent(self.buttons_by_pin[event.pin_num], perf_counter_ns() - max(age, 0),
+                              CINTERRUPTUNCERTAINTY)
+        self.target.post(pressed)
+
+    # ................. end of method: button_pressed .................
+
+    #.................... Method: attach ................
+    # This method puts the presses on another EventQueue from now on
+    #
+    def attach(self, target):
+        self.target = target
+
+    # ................. end of method: attach .................
+
+    #.................... Method: close ................
+    # This method stops the event listener
+    #
+    def close(self):
+        self.listener.deactivate()
+
+    # ................. end of method: close .................
+
+#=================================================================
+
+class PolledButtonInput(EventQueue):
+    """ Button input for a PiFace board read at regular intervals, for when
+    its interrupts cannot be used. """
+
+    def __init__(self, board = CBOARDwithBUTTONS, buttons = range(0, CNUMBUTTONS),
+                 chip_select = 0, mapping = None, interval = CPOLLINTERVAL, port = None):
+        super(PolledButtonInput, self).__init__()
+        # the queue the presses are put on, and the button for each input
+        # used, as for ButtonInput
+        self.target = self
+        if mapping is None:
+            mapping = dict((button, button) for button in buttons)
+        self.buttons_by_pin = dict((pin, button) for button, pin in mapping.items())
+        # the input port read (a bit is 1 whilst its button is held down)
+        if port is None:
+            import pifacedigitalio as pfio
+            port = pfio.PiFaceDigital(hardware_addr = board, chip_select = chip_select,
+                                      init_board = False).input_port
+        self.port = port
+        self.interval = interval
+        self.active = True
+        self.thread = threading.Thread(target = self.run, name = "button polling", daemon = True)
+        self.thread.start()
+
+    #.................... Method: run ................
+    # This method (in its own thread) reads the input port until the input
+    # is closed.  A button which is down now but was not at the last read was
+    # pressed some time between the start of the last read and the end of
+    # this one, so its press is timestamped at the middle of that window with
+    # half the window as its uncertainty.
+    #
+    def run(self):
+        before = perf_counter_ns()
+        previous = self.port.value
+        while self.active:
+            sleep(self.interval / 1000000000)
+            started = perf_counter_ns()
+            value = self.port.value
+            finished = perf_counter_ns()
+            pressed = value & ~previous
+            previous = value
+            target = self.target
+            if pressed and target is not None:
+                timestamp = (before + finished) // 2
+                uncertainty = (finished - before + 1) // 2
+                for pin, button in self.buttons_by_pin.items():
+                    if pressed & (1 << pin):
+                        target.post(ButtonEvent(button, timestamp, uncertainty))
+            before = started
+
+    # ................. end of method: run .................
+
+    #.................... Method: attach ................
+    # This method puts the presses on another EventQueue from now on
+    #
+    def attach(self, target):
+        self.target = target
+
+    # ................. end of method: attach .................
+
+    #.................... Method: close ................
+    # This method stops reading the input port
+    #
+    def close(self):
+        self.active = False
+        self.thread.join()
+
+    # ................. end of method: close .................
+
+#=================================================================
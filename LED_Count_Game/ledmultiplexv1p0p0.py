@@ -0,0 +1,305 @@
+#!/usr/bin/env python
+
+#==============================================================
+#
+# Authors:      Christine Smythe and Colin Smythe (Dunelm Services Limited)
+# Version:      1.0
+# Release Date: 1st November, 2013
+#
+# Description:  This Python3 module merges the presses from all of the ways
+#               the LED Counting Game can be played into the one queue the
+#               game waits on or polls:
+#
+#               - the PiFace game board buttons (a ButtonInput, or a
+#                 PolledButtonInput if the interrupts cannot be used);
+#               - keys pressed in the game's window (KeyboardInput);
+#               - commands sent to a local UDP socket (SocketInput), e.g. from
+#                 another program or a test script.
+#
+#               Each press is timestamped where it comes from: the board
+#               buttons by their interrupt, keys by the time the X server gives
+#               the key event and socket commands by the sender (if it gives a
+#               time) or as the command arrives.  All timestamps are on the
+#               game clock (time.perf_counter_ns()) so every source is timed
+#               the same way.
+#
+#               Sources can be added to and removed from an InputMultiplexer at
+#               any time, including whilst a game is being played.
+#
+# History:      Original release.
+#
+# Copyright:    2013 (c) Premier Farnell Limited
+#
+# License:      GPLv3+
+#
+#==============================================================
+
+import socket
+import threading
+from tkinter import TclError
+from time import perf_counter_ns
+from ledboardsv1p0p0 import CLEDSPERBOARD, CNS_PER_MS
+from ledinputv1p0p0 import EventQueue, ButtonEvent, ButtonInput, PolledButtonInput, CBOARDwithBUTTONS
+from ledgameenginev1p0p0 import CSTARTBUTTON, CSTOPBUTTON, column_buttons, game_buttons
+from ledpatternsv1p0p0 import CNUMCOLUMNS
+
+#==============================================================
+# Declaration of Constants
+
+CINPUTHOST = "127.0.0.1";   # commands are only taken from this R-Pi
+CINPUTPORT = 8014;          # the UDP port commands are sent to
+CMAXDATAGRAM = 1024;        # the longest datagram of commands read
+
+CXTIMEWRAP = 1 << 32;       # the X server's ms clock wraps round after this
+
+# the classes of widget which use the keys themselves when they have the
+# focus - typing into an entry, or space pressing a button or ticking a box
+CKEYWIDGETS = frozenset(("Entry", "TEntry", "Button", "TButton",
+                         "Checkbutton", "TCheckbutton"));
+
+# the keys which choose the columns, in column order
+CCOLUMNKEYS = ("1", "2", "3", "4", "5", "6", "7", "8", "9", "0");
+
+#==============================================================
+
+#.................... Function: game_keymap ................
+# This function returns the game button for each key (Tk keysym) in a game
+# of 'columns' columns (only the first 10 columns have a key)
+#
+def game_keymap(columns = CNUMCOLUMNS):
+    keymap = {"s" : CSTARTBUTTON, "space" : CSTARTBUTTON, "x" : CSTOPBUTTON, "Escape" : CSTOPBUTTON}
+    keymap.update(zip(CCOLUMNKEYS, column_buttons(columns)))
+    return keymap
+
+# ..................... end of function : game_keymap .........
+
+#.................... Function: game_commands ................
+# This function returns the game button for each socket command in a game
+# of 'columns' columns: "start", "stop" or the number of a column
+#
+def game_commands(columns = CNUMCOLUMNS):
+    commands = {"start" : CSTARTBUTTON, "stop" : CSTOPBUTTON}
+    for column, button in enumerate(column_buttons(columns)):
+        commands[str(column + 1)] = button
+    return commands
+
+# ..................... end of function : game_commands .........
+
+#.................... Function: add_piface_inputs ................
+# This function adds the PiFace game board buttons for a game of 'columns'
+# columns to a multiplexer: the inputs of the button board and, for the 7th
+# column onwards, those of the board after it.  If 'polled' is True the
+# inputs are read by polling rather than by their interrupts.
+#
+def add_piface_inputs(multiplexer, columns = CNUMCOLUMNS, board = CBOARDwithBUTTONS, polled = False):
+    Input = ButtonInput
+    if polled:
+        Input = PolledButtonInput
+    buttons = game_buttons(columns)
+    multiplexer.add("piface", Input(board, [button for button in buttons if button < CLEDSPERBOARD]))
+    if max(buttons) >= CLEDSPERBOARD:
+        multiplexer.add("piface columns", Input(board + 1,
+            mapping = dict((button, button - CLEDSPERBOARD) for button in buttons
+                           if button >= CLEDSPERBOARD)))
+
+# ..................... end of function : add_piface_inputs .........
+
+# the keys and commands for the 4 columns of one PiRack
+CKEYMAP = game_keymap();
+CCOMMANDS = game_commands();
+
+#==============================================================
+
+class InputMultiplexer(EventQueue):
+    """ One queue of presses from any number of sources. """
+
+    def __init__(self):
+        super(InputMultiplexer, self).__init__()
+        # the sources, by name.  Each has attach(queue) and close()
+        self.sources = {}
+        self.lock = threading.Lock()
+
+    #.................... Method: add ................
+    # This method adds a source of presses, replacing any of the same name
+    # It is passed
+    #   - name : the name of the source
+    #   - source : the source, e.g. a ButtonInput
+    #
+    def add(self, name, source):
+        self.remove(name)
+        with self.lock:
+            self.sources[name] = source
+        source.attach(self)
+
+    # ................. end of method: add .................
+
+    #.................... Method: remove ................
+    # This method removes and closes a source of presses (if it was added)
+    #
+    def remove(self, name):
+        with self.lock:
+            source = self.sources.pop(name, None)
+        if source is not None:
+            source.attach(None)
+            source.close()
+
+    # ................. end of method: remove .................
+
+    #.................... Method: names ................
+    # This method returns the names of the sources
+    #
+    def names(self):
+        with self.lock:
+            return sorted(self.sources)
+
+    # ................. end of method: names .................
+
+    #.................... Method: close ................
+    # This method removes and closes every source
+    #
+    def close(self):
+        for name in self.names():
+            self.remove(name)
+
+    # ................. end of method: close .................
+
+#==============================================================
+
+class KeyboardInput(object):
+    """ Game buttons from keys pressed in a Tk window. """
+
+    def __init__(self, window, keymap = CKEYMAP):
+        self.window = window
+        self.keymap = keymap
+        self.target = None
+        # the game clock less the X server clock (ns), the smallest seen so
+        # far being the key event which was handled soonest after it happened
+        self.offset = None
+        self.binding = window.bind("<KeyPress>", self.key_pressed, add = "+")
+
+    #.................... Method: attach ................
+    # This method puts the presses on the queue given (None for nowhere)
+    #
+    def attach(self, target):
+        self.target = target
+
+    # ................. end of method: attach .................
+
+    #.................... Method: key_pressed ................
+    # This method is called by Tk when a key is pressed.  Keys used by the
+    # widget with the focus (typed into the player's name, or space on a
+    # button, which Tk has already pressed) are not presses.  The press is
+    # timestamped with the time of the key event, moved onto the game clock.
+    #
+    def key_pressed(self, event):
+        button = self.keymap.get(event.keysym)
+        target = self.target
+        if button is None or target is None or event.widget.winfo_class() in CKEYWIDGETS:
+            return
+        now = perf_counter_ns()
+        timestamp = now
+        if event.time:
+            xtime = event.time * CNS_PER_MS
+            offset = now - xtime
+            if self.offset is None or offset < self.offset or \
+               offset > self.offset + (CXTIMEWRAP >> 1) * CNS_PER_MS:
+                # the first key, one handled sooner or the X clock wrapped
+                self.offset = offset
+            timestamp = min(now, xtime + self.offset)
+        target.post(ButtonEvent(button, timestamp))
+
+    # ................. end of method: key_pressed .................
+
+    #.................... Method: close ................
+    # This method stops listening to the keys (if the window is still there)
+    #
+    def close(self):
+        try:
+            self.window.unbind("<KeyPress>", self.binding)
+        except TclError:
+            pass
+
+    # ................. end of method: close .................
+
+#==============================================================
+
+class SocketInput(object):
+    """ Game buttons from commands sent to a local UDP socket. """
+
+    def __init__(self, host = CINPUTHOST, port = CINPUTPORT, commands = CCOMMANDS):
+        self.commands = commands
+        self.target = None
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind((host, port))
+        # the port chosen if 0 was given
+        self.port = self.socket.getsockname()[1]
+        self.thread = threading.Thread(target = self.listen, name = "socket input", daemon = True)
+        self.thread.start()
+
+    #.................... Method: attach ................
+    # This method puts the presses on the queue given (None for nowhere)
+    #
+    def attach(self, target):
+        self.target = target
+
+    # ................. end of method: attach .................
+
+    #.................... Method: listen ................
+    # This method (in its own thread) reads the commands until the socket is
+    # closed.  Each datagram holds one or more lines, each a command and
+    # optionally the time (perf_counter_ns()) it was given.
+    #
+    def listen(self):
+        while True:
+            try:
+                data = self.socket.recv(CMAXDATAGRAM)
+            except OSError:
+                return
+            received = perf_counter_ns()
+            if not data:
+                return
+            for line in data.decode("utf-8", "replace").splitlines():
+                words = line.split()
+                target = self.target
+                if not words or words[0] not in self.commands or target is None:
+                    continue
+                timestamp = received
+                if len(words) > 1:
+                    try:
+                        timestamp = min(int(words[1]), received)
+                    except ValueError:
+                        pass
+                target.post(ButtonEvent(self.commands[words[0]], timestamp))
+
+    # ................. end of method: listen .................
+
+    #.................... Method: close ................
+    # This method stops listening for commands
+    #
+    def close(self):
+        # a shut down socket returns no data, ending listen()
+        try:
+            self.socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.thread.join()
+        self.socket.close()
+
+    # ................. end of method: close .................
+
+#=================================================================
+
+#.................... Function: send_command ................
+# This function sends a command to a SocketInput, timestamped now
+# It is passed
+#   - command : the command, e.g. "start" or "3"
+#   - port : the port the SocketInput is listening on
+#
+def send_command(command, port = CINPUTPORT, host = CINPUTHOST):
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        sender.sendto((command + " " + str(perf_counter_ns())).encode("utf-8"), (host, port))
+    finally:
+        sender.close()
+
+# ..................... end of function : send_command .........
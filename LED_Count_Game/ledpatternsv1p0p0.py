@@ -0,0 +1,202 @@
+#!/usr/bin/env python
+
+#==============================================================
+#
+# Authors:      Christine Smythe and Colin Smythe (Dunelm Services Limited)
+# Version:      1.0
+# Release Date: 1st November, 2013
+#
+# Description:  This Python3 module generates the LED patterns (configurations)
+#               used by the LED Counting Game.
+#
+#               Each pattern has a different number of LEDs (1 to 8) lit in
+#               each of the 4 columns.  The numbers are chosen with
+#               random.sample() and the LEDs lit in each column are chosen from
+#               a table of all the output port values with that many LEDs lit,
+#               so no rejection loops are needed and the cost of each pattern is
+#               fixed.  All of the patterns for a game are generated before the
+#               game starts.
+#
+#               Other board geometries (see BoardGeometry in ledboardsv1p0p0.py)
+#               have as many columns as the boards make, each with a different
+#               number of LEDs (1 to the height of the column) lit.  When a
+#               column is made from several boards, how many of its LEDs are
+#               lit on each board is chosen from the hypergeometric
+#               distribution (as if the LEDs had been chosen one at a time)
+#               and then each board's output port value from its table, so a
+#               pattern still costs one choice per board and never one per LED.
+#
+#               Each Pattern holds the LEDs lit as one integer, one byte per
+#               board (a 32 bit number for one PiRack), which is written to
+#               the boards as it is.  The number of LEDs lit in each column
+#               is counted from the bits of the column and the correct column
+#               is the one with the highest count, so nothing else needs to
+#               be kept with the pattern.
+#
+#               The random number generator can be given a seed so that a game
+#               session can be reproduced exactly.
+#
+# History:      Original release.
+#
+# Copyright:    2013 (c) Premier Farnell Limited
+#
+# License:      GPLv3+
+#
+#==============================================================
+
+import random
+from collections import namedtuple
+from itertools import accumulate
+from math import comb
+from ledboardsv1p0p0 import CGEOMETRY, CLEDSPERBOARD, pack_frame, unpack_frame
+
+#==============================================================
+# Declaration of Constants
+
+CNUMCOLUMNS = 4;        # number of columns on one PiRack (one per PiFace board)
+CLEDSPERCOLUMN = 8;     # number of LEDs in each column on one PiRack
+CMAXSEED = 1000000;     # seeds chosen automatically are less than this
+
+#==============================================================
+
+#.................... Function: values_by_count ................
+# This function returns every output port value for a board of 'leds' LEDs,
+# grouped by the number of LEDs it lights (choosing one of these at random
+# is the same as choosing that many different LEDs)
+#
+def values_by_count(leds):
+    return [[value for value in range(0, 1 << leds) if bin(value).count("1") == count]
+            for count in range(0, leds + 1)]
+
+# ..................... end of function : values_by_count .........
+
+# the values for a board of 8 LEDs
+CVALUES_BY_COUNT = values_by_count(CLEDSPERCOLUMN)
+
+#==============================================================
+
+class Pattern(namedtuple("Pattern", "bits columns width")):
+    """ The LEDs lit in a pattern, as an integer of 'columns' columns each 'width' bits wide. """
+
+    __slots__ = ()
+
+    #.................... Method: from_frame ................
+    # This method returns the pattern of a frame (one output port value for
+    # each board) on the boards of a geometry
+    #
+    @classmethod
+    def from_frame(cls, frame, geometry = CGEOMETRY):
+        return cls(pack_frame(frame), geometry.columns, geometry.boardspercolumn * CLEDSPERBOARD)
+
+    # ................. end of method: from_frame .................
+
+    # the number of LEDs lit in each column, column 1 first
+    @property
+    def LEDs_in_column(self):
+        bits = self.bits
+        mask = (1 << self.width) - 1
+        return [bin((bits >> (column * self.width)) & mask).count("1") for column in range(0, self.columns)]
+
+    # the correct column (1 upwards): the one with most LEDs lit
+    @property
+    def correct_column(self):
+        counts = self.LEDs_in_column
+        return counts.index(max(counts)) + 1
+
+    # the output port value for each board, board 0 first
+    @property
+    def frame(self):
+        return unpack_frame(self.bits, self.columns * self.width // CLEDSPERBOARD)
+
+#==============================================================
+
+class PatternGenerator(object):
+    """ Seedable generator of LED Counting Game patterns. """
+
+    def __init__(self, seed = None, geometry = CGEOMETRY):
+        # choose a seed if none is given so that it can always be reported
+        if seed is None:
+            seed = random.randrange(CMAXSEED)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.geometry = geometry
+        self.counts = range(1, geometry.ledspercolumn + 1)
+        # the bits of each column in a pattern
+        self.width = geometry.boardspercolumn * CLEDSPERBOARD
+        # for each board of a column: the table of its output port values by
+        # the number of LEDs lit and, for all but the last board, how the LEDs
+        # still to be lit are shared with the boards above it.  split[lit] is
+        # the (numbers lit on this board, cumulative weights) to choose from.
+        self.boards = []
+        above = geometry.ledspercolumn
+        for size in geometry.segments:
+            above = above - size
+            split = None
+            if above > 0:
+                split = []
+                for lit in range(0, geometry.ledspercolumn + 1):
+                    numbers = range(max(0, lit - above), min(size, lit) + 1)
+                    weights = [comb(size, number) * comb(above, lit - number) for number in numbers]
+                    split.append((numbers, list(accumulate(weights))))
+            if size == CLEDSPERCOLUMN:
+                table = CVALUES_BY_COUNT
+            else:
+                table = values_by_count(size)
+            self.boards.append((table, split))
+
+    #.................... Method: generate ................
+    # This method generates one pattern.
+    # It chooses a different number of LEDs for each column (so there is
+    # always one column with most LEDs lit), and then which LEDs are lit in
+    # each column.
+    # It returns the Pattern.
+    #
+    def generate(self):
+        choice = self.rng.choice
+        width = self.width
+        bits = 0
+        shift = 0
+        if len(self.boards) == 1:
+            table = self.boards[0][0]
+            for count in self.rng.sample(self.counts, self.geometry.columns):
+                bits = bits | (choice(table[count]) << shift)
+                shift = shift + width
+        else:
+            for count in self.rng.sample(self.counts, self.geometry.columns):
+                bits = bits | (pack_frame(self.column_values(count)) << shift)
+                shift = shift + width
+        return Pattern(bits, self.geometry.columns, width)
+
+    # ................. end of method: generate .................
+
+    #.................... Method: column_values ................
+    # This method chooses the LEDs lit in a column made from several boards
+    # It is passed count = the number of LEDs to light in the column
+    # It returns the output port value for each board of the column.
+    #
+    def column_values(self, count):
+        choice = self.rng.choice
+        choices = self.rng.choices
+        values = []
+        for table, split in self.boards:
+            lit = count
+            if split is not None:
+                numbers, weights = split[count]
+                lit = choices(numbers, cum_weights = weights)[0]
+            values.append(choice(table[lit]))
+            count = count - lit
+        return values
+
+    # ................. end of method: column_values .................
+
+    #.................... Method: generate_batch ................
+    # This method generates the patterns for a whole game.
+    # It is passed configs = the number of configurations to be played
+    # It returns a list of the Patterns.
+    #
+    def generate_batch(self, configs):
+        return [self.generate() for config in range(0, configs)]
+
+    # ................. end of method: generate_batch .................
+
+#=================================================================
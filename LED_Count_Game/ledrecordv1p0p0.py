@@ -0,0 +1,390 @@
+#!/usr/bin/env python
+
+#==============================================================
+#
+# Authors:      Christine Smythe and Colin Smythe (Dunelm Services Limited)
+# Version:      1.0
+# Release Date: 1st November, 2013
+#
+# Description:  This Python3 program records LED Counting Games as compact
+#               binary event logs and replays them, e.g. to check a disputed
+#               result or as a fixed test of the scoring.
+#
+#               A log holds the game header (seed, configurations, speed, the
+#               date and time it was played, the latency correction, the board
+#               geometry and the player), then for each
+#               configuration its pattern and the time it was flipped onto
+#               the LEDs (with the speed it was played at), and every button
+#               press the game acted on with the timestamp of its interrupt.
+#               The log is written to its file in blocks of CWRITESIZE bytes
+#               whilst the game is played, so however long the game is only
+#               the latest block is kept in memory.
+#
+#               A replay feeds the log back through the game's own
+#               process_config() and calculate_results() so the results are
+#               worked out exactly as they were when the game was played.  It
+#               runs as fast as possible, or at the speed the game was played
+#               showing the configurations on the LEDs.
+#
+#               Usage:  python3 ledrecordv1p0p0.py replay <log> [realtime]
+#                           replays a game and prints its results;
+#                       python3 ledrecordv1p0p0.py dump <log>
+#                           prints every record in a log.
+#
+# History:      Original release.
+#
+# Copyright:    2013 (c) Premier Farnell Limited
+#
+# License:      GPLv3+
+#
+#==============================================================
+
+import os
+import struct
+import sys
+from time import perf_counter_ns, sleep, strftime, localtime
+from ledboardsv1p0p0 import BoardGeometry, CGEOMETRY, CNS_PER_SECOND, CNS_PER_MS
+from ledinputv1p0p0 import ButtonEvent
+from ledpatternsv1p0p0 import Pattern
+
+#==============================================================
+# Declaration of Constants
+
+# the games are recorded in this directory beside the game
+CRECORDDIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "recordings")
+CRECORDEXT = ".ledr";
+CWRITESIZE = 65536;     # bytes of the log kept in memory before they are written
+
+CMAGIC = b"LEDR";
+CVERSION = 5;
+
+# the header: magic, version, seed, configurations, speed (ms), started
+# (time.time()), latency correction (ms), number of boards, LEDs in each
+# column and the length of the player's name (utf-8) which follows it.
+# The seed is signed (a seed outside 64 bits is kept as its lowest 64 bits -
+# the patterns themselves are recorded so the game still replays the same).
+# Version 4 logs have an unsigned seed and 32 bit configurations, version 3
+# logs were all played on one PiRack (4 boards of 8 LEDs) and version 2 logs
+# also have no latency correction
+CHEADER = struct.Struct("<4sBqQIddBBH")
+CHEADER_V4 = struct.Struct("<4sBQIIddBBH")
+CHEADER_V3 = struct.Struct("<4sBQIIddH")
+CHEADER_V2 = struct.Struct("<4sBQIIdH")
+# the records, each starting with its type
+CPATTERN = struct.Struct("<c4B4B")  # LEDs in each column, output port value for each board
+CFLIP = struct.Struct("<cIqI")      # configuration number, time (ns) it became visible, speed (ms)
+CBUTTON = struct.Struct("<cBq")     # button number, time (ns) of its interrupt
+CEND = struct.Struct("<cIB")        # configurations played, 1 if the game was stopped
+
+CPATTERN_RECORD = b"P";
+CFLIP_RECORD = b"F";
+CBUTTON_RECORD = b"B";
+CEND_RECORD = b"E";
+
+CSEEDWRAP = 1 << 64;    # seeds are recorded modulo this, as signed 64 bit numbers
+
+#==============================================================
+
+#.................... Function: pattern_struct ................
+# This function returns the struct of the pattern records for a board
+# geometry: the LEDs lit in each column and the output port value for each board
+#
+def pattern_struct(geometry):
+    if geometry.columns == 4 and geometry.numboards == 4:
+        return CPATTERN
+    return struct.Struct("<c" + str(geometry.columns) + "B" + str(geometry.numboards) + "B")
+
+# ..................... end of function : pattern_struct .........
+
+#==============================================================
+
+class GameRecorder(object):
+    """ Records the games played by a GameEngine as binary event logs. """
+
+    def __init__(self, directory = CRECORDDIR):
+        # where the logs are written (None to only keep the last one in memory)
+        self.directory = directory
+        # the part of the log of the game being played not yet written, and
+        # the file it is written to
+        self.data = bytearray()
+        self.filename = None
+        self.logfile = None
+        self.pattern = CPATTERN
+
+    #.................... Method: start ................
+    # This method starts the log of a new game with its header.  The file
+    # is named after the date and time (to the ms) the game was played and
+    # the player but is not created until there is something to write to it.
+    # It is passed game = the GameEngine which has just started the game
+    #
+    def start(self, game):
+        self.close()
+        name = game.player.encode("utf-8")
+        geometry = game.geometry
+        seed = (game.seed + (CSEEDWRAP >> 1)) % CSEEDWRAP - (CSEEDWRAP >> 1)
+        data = bytearray(CHEADER.pack(CMAGIC, CVERSION, seed, game.configs,
+                                      game.speed, game.started, game.latency_correction,
+                                      geometry.numboards, geometry.ledspercolumn, len(name)))
+        data += name
+        self.data = data
+        self.pattern = pattern_struct(geometry)
+        self.filename = None
+        if self.directory is not None:
+            name = strftime("%Y%m%d-%H%M%S", localtime(game.started)) + \
+                   "%03d" % (int(game.started * 1000) % 1000) + "-" + \
+                   "".join(c for c in game.player if c.isalnum()) + CRECORDEXT
+            self.filename = os.path.join(self.directory, name)
+
+    # ................. end of method: start .................
+
+    #.................... Method: flip ................
+    # This method records the pattern of a configuration, the time it became
+    # visible on the LEDs and the speed it is played at
+    #
+    def flip(self, configno, timestamp, speed, pattern):
+        self.data += self.pattern.pack(CPATTERN_RECORD, *(tuple(pattern.LEDs_in_column) + tuple(pattern.frame)))
+        self.data += CFLIP.pack(CFLIP_RECORD, configno, timestamp, speed)
+        if len(self.data) >= CWRITESIZE:
+            self.write()
+
+    # ................. end of method: flip .................
+
+    #.................... Method: button ................
+    # This method records a button press acted on by the game
+    #
+    def button(self, event):
+        self.data += CBUTTON.pack(CBUTTON_RECORD, event.button, event.timestamp)
+
+    # ................. end of method: button .................
+
+    #.................... Method: end ................
+    # This method ends the log and writes the rest of it to its file
+    # It is passed game = the GameEngine whose game has just ended
+    #
+    def end(self, game):
+        self.data += CEND.pack(CEND_RECORD, game.count, int(game.StopSwitch))
+        self.write()
+        self.close()
+
+    # ................. end of method: end .................
+
+    #.................... Method: write ................
+    # This method writes the part of the log in memory to its file, creating
+    # the file for the first part written.  A file already there (another
+    # game started in the same ms) is never overwritten - a number is added
+    # to the name instead.  If there is no file the log is just kept in
+    # memory.
+    #
+    def write(self):
+        if self.filename is None:
+            return
+        if self.logfile is None:
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory)
+            stem, ext = os.path.splitext(self.filename)
+            number = 1
+            while self.logfile is None:
+                try:
+                    self.logfile = open(self.filename, "xb")
+                except FileExistsError:
+                    number += 1
+                    self.filename = stem + "-" + str(number) + ext
+        self.logfile.write(self.data)
+        self.data = bytearray()
+
+    # ................. end of method: write .................
+
+    #.................... Method: close ................
+    # This method closes the file of the log (a game which was never ended,
+    # e.g. stopped before any configuration was played, is left as far as
+    # it was written)
+    #
+    def close(self):
+        if self.logfile is not None:
+            self.logfile.close()
+            self.logfile = None
+
+    # ................. end of method: close .................
+
+#==============================================================
+
+class GameLog(object):
+    """ A recorded game read back from its binary event log. """
+
+    def __init__(self, data):
+        magic, version = struct.unpack_from("<4sB", data, 0)
+        if magic != CMAGIC or version not in (2, 3, 4, CVERSION):
+            raise ValueError("not an LED Counting Game log")
+        # the geometry the game was played on
+        self.geometry = CGEOMETRY
+        if version == 2:
+            header = CHEADER_V2
+            self.seed, self.configs, self.speed, self.started, length = header.unpack_from(data, 0)[2:]
+            self.latency_correction = 0.0
+        elif version == 3:
+            header = CHEADER_V3
+            self.seed, self.configs, self.speed, self.started, self.latency_correction, length = \
+                header.unpack_from(data, 0)[2:]
+        else:
+            header = CHEADER
+            if version == 4:
+                header = CHEADER_V4
+            self.seed, self.configs, self.speed, self.started, self.latency_correction, \
+                numboards, ledspercolumn, length = header.unpack_from(data, 0)[2:]
+            self.geometry = BoardGeometry(numboards, ledspercolumn)
+        pattern = pattern_struct(self.geometry)
+        columns = self.geometry.columns
+        offset = header.size
+        self.player = bytes(data[offset:offset + length]).decode("utf-8")
+        offset = offset + length
+        self.patterns = []
+        # each configuration shown: (configuration number, flip time, speed,
+        # the button presses made whilst it was showing)
+        self.trials = []
+        # the button presses made before the first configuration was shown
+        self.presses = []
+        self.count = 0
+        self.stopped = False
+        while offset < len(data):
+            kind = data[offset:offset + 1]
+            if kind == CPATTERN_RECORD:
+                # the counts are kept in the record to be read by people, the
+                # pattern counts them from its bits
+                values = pattern.unpack_from(data, offset)[1:]
+                self.patterns.append(Pattern.from_frame(values[columns:], self.geometry))
+                offset = offset + pattern.size
+            elif kind == CFLIP_RECORD:
+                configno, timestamp, speed = CFLIP.unpack_from(data, offset)[1:]
+                self.trials.append((configno, timestamp, speed, []))
+                offset = offset + CFLIP.size
+            elif kind == CBUTTON_RECORD:
+                event = ButtonEvent(*CBUTTON.unpack_from(data, offset)[1:])
+                if self.trials:
+                    self.trials[-1][3].append(event)
+                else:
+                    self.presses.append(event)
+                offset = offset + CBUTTON.size
+            elif kind == CEND_RECORD:
+                self.count, stopped = CEND.unpack_from(data, offset)[1:]
+                self.stopped = (stopped == 1)
+                offset = offset + CEND.size
+            else:
+                raise ValueError("unknown record " + repr(kind) + " at " + str(offset))
+
+    #.................... Method: read ................
+    # This method reads a log from a file
+    #
+    @classmethod
+    def read(cls, filename):
+        with open(filename, "rb") as logfile:
+            return cls(logfile.read())
+
+    # ................. end of method: read .................
+
+#==============================================================
+
+#.................... Function: replay ................
+# This function replays a recorded game through a GameEngine, working out
+# its results and statistics and displaying them in the engine's view.
+# It is passed
+#   - log : the GameLog to replay
+#   - game : the GameEngine (with the LEDs and view to use), which must have
+#            the same geometry as the log
+#   - realtime : True to replay at the speed the game was played, showing
+#                each configuration on the LEDs, or False to replay at once
+# It returns the engine, from which the results can be read.
+#
+def replay(log, game, realtime = False):
+    game.configs = log.configs
+    game.speed = log.speed
+    game.seed = log.seed
+    game.player = log.player
+    game.started = log.started
+    game.latency_correction = log.latency_correction
+    game.patterns = log.patterns
+    game.first_pattern = 1
+    game.StopSwitch = False
+    game.adaptive = None
+    game.results.reset()
+    game.turnall_off()
+    # the replay clock starts at the first flip
+    origin = perf_counter_ns()
+    if log.trials:
+        origin = origin - log.trials[0][1]
+    for configno, flipped, speed, presses in log.trials:
+        game.count = configno
+        game.trial_speed = speed
+        game.generate_random_LEDs(configno)
+        if realtime:
+            wait_until(origin + flipped)
+            game.leds.flip()
+        game.starttime = flipped
+        game.timeout = flipped + speed * CNS_PER_MS
+        # the first press acted on whilst the configuration was showing,
+        # unless it was too late
+        event = None
+        if presses and presses[0].timestamp <= game.timeout:
+            event = presses[0]
+        if realtime:
+            if event is not None:
+                wait_until(origin + event.timestamp)
+            else:
+                wait_until(origin + game.timeout)
+        game.process_config(configno, speed, event)
+        game.calculate_statistics(configno, log.speed)
+    game.count = len(log.trials)
+    game.calculate_results(game.count, log.speed)
+    game.calculate_statistics(game.count, log.speed)
+    return game
+
+# ..................... end of function : replay .........
+
+#.................... Function: wait_until ................
+# This function sleeps until the given time (ns, as given by perf_counter_ns())
+#
+def wait_until(deadline):
+    remaining = deadline - perf_counter_ns()
+    if remaining > 0:
+        sleep(remaining / CNS_PER_SECOND)
+
+# ..................... end of function : wait_until .........
+
+#=================================================================
+# main
+#=================================================================
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "replay":
+        from ledgameenginev1p0p0 import GameEngine
+        from ledboardsv1p0p0 import LEDBoards, init_boards
+        from ledsimulatorv1p0p0 import SimulatedBoard, TextView
+        log = GameLog.read(sys.argv[2])
+        realtime = len(sys.argv) > 3 and sys.argv[3] == "realtime"
+        if realtime:
+            # show the configurations on the PiRack
+            init_boards(log.geometry.numboards)
+            leds = LEDBoards(log.geometry.numboards)
+        else:
+            leds = LEDBoards(boards = [SimulatedBoard() for board in range(0, log.geometry.numboards)])
+        view = TextView()
+        replay(log, GameEngine(leds, None, view, geometry = log.geometry), realtime)
+        print(log.player + " - " + strftime("%d/%m/%Y %H:%M", localtime(log.started))
+              + " - seed " + str(log.seed))
+        print(view.results)
+        print(view.statistics)
+    elif len(sys.argv) > 2 and sys.argv[1] == "dump":
+        log = GameLog.read(sys.argv[2])
+        print("player", log.player, "seed", log.seed, "configs", log.configs, "speed", log.speed,
+              "correction", log.latency_correction, "boards", log.geometry.numboards,
+              "leds", log.geometry.ledspercolumn)
+        for number, pattern in enumerate(log.patterns):
+            print("pattern", number + 1, pattern.LEDs_in_column, pattern.correct_column)
+        for event in log.presses:
+            print("button", event.button, event.timestamp)
+        for configno, flipped, speed, presses in log.trials:
+            print("flip", configno, flipped, speed)
+            for event in presses:
+                print("button", event.button, event.timestamp)
+        print("end", log.count, "stopped" if log.stopped else "finished")
+    else:
+        print("Usage: python3 ledrecordv1p0p0.py replay <log> [realtime] | dump <log>")
@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+
+#==============================================================
+#
+# Authors:      Christine Smythe and Colin Smythe (Dunelm Services Limited)
+# Version:      1.0
+# Release Date: 1st November, 2013
+#
+# Description:  This Python3 module provides the results table of the LED
+#               Counting Game GUI.
+#
+#               The table is a ttk.Treeview with one row for each
+#               configuration played.  A row is added as each configuration
+#               is answered, so the table is never rebuilt, and the Treeview
+#               only draws the rows which can be seen however many there are.
+#               Only the latest CTABLEROWS configurations are kept in the
+#               table (the oldest row is removed as each new one is added) so
+#               a long game does not slow the GUI down.
+#
+#               Clicking a column heading sorts the table by that column
+#               (clicking it again reverses the order).  The rows are moved
+#               into order rather than being made again, and whilst the table
+#               is sorted each new row is put straight into its place.
+#
+#               When a game is longer than the table the summary of each chunk
+#               of configurations (the number correct, wrong and timed out and
+#               the average time) is shown under the table at the end.
+#
+# History:      Original release.
+#
+# Copyright:    2013 (c) Premier Farnell Limited
+#
+# License:      GPLv3+
+#
+#==============================================================
+
+from bisect import bisect
+from collections import deque
+from tkinter import Frame, Text, N, S, E, W, VERTICAL, END, NORMAL, DISABLED
+from tkinter import ttk
+
+#==============================================================
+# Declaration of Constants
+
+CTABLEROWS = 1000;      # the most configurations kept in the table
+CSUMMARYLINES = 6;      # the height of the chunk summary (lines)
+
+# the columns: name, heading and width (pixels)
+CTABLECOLUMNS = (("config", "Config", 60),
+                 ("column", "Correct Column", 100),
+                 ("choice", "Player Choice", 90),
+                 ("correct", "Correct Y/N", 80),
+                 ("time", "Player Time", 90),
+                 ("speed", "Speed ms", 70));
+
+#==============================================================
+
+#.................... Function: sort_key ................
+# This function returns the value a row is sorted on for a column.  The
+# configuration number is added so rows with the same value stay in the
+# order they were played, and timeouts sort after every time.
+# It is passed
+#   - column : the name of the column
+#   - row : the (configno, correct_column, player_answer, correct,
+#           player_time, speed) of the row
+#
+def sort_key(column, row):
+    configno, correct_column, player_answer, correct, player_time, speed = row
+    if column == "time":
+        if player_answer == 0:
+            return (1, 0, configno)
+        return (0, player_time, configno)
+    elif column == "correct":
+        return (not correct, configno)
+    elif column == "column":
+        return (correct_column, configno)
+    elif column == "choice":
+        return (player_answer, configno)
+    elif column == "speed":
+        return (speed, configno)
+    return (configno,)
+
+# ..................... end of function : sort_key .........
+
+#==============================================================
+
+class ResultsTable(Frame):
+    """ Table of the results of each configuration, with sorting. """
+
+    def __init__(self, master, height = 25):
+        super(ResultsTable, self).__init__(master)
+        self.tree = ttk.Treeview(self, columns = [column[0] for column in CTABLECOLUMNS],
+                                 show = "headings", height = height, selectmode = "browse")
+        for name, heading, width in CTABLECOLUMNS:
+            self.tree.heading(name, text = heading, command = lambda name = name: self.sort(name))
+            self.tree.column(name, width = width, anchor = E)
+        scrollbar = ttk.Scrollbar(self, orient = VERTICAL, command = self.tree.yview)
+        self.tree.configure(yscrollcommand = scrollbar.set)
+        self.tree.grid(row = 0, column = 0, sticky = N+S+E+W)
+        scrollbar.grid(row = 0, column = 1, sticky = N+S)
+        self.summary = Text(self, height = CSUMMARYLINES, width = 60, state = DISABLED)
+        self.summary.grid(row = 1, column = 0, columnspan = 2, sticky = E+W)
+        self.clear()
+
+    #.................... Method: clear ................
+    # This method removes every row, ready for a new game
+    #
+    def clear(self):
+        self.tree.delete(*self.tree.get_children())
+        # the rows in the order they were added, each (item, row)
+        self.added = deque()
+        # the column sorted on (None for the order played) and, whilst the
+        # table is sorted, the (key, item) of every row in ascending order
+        self.sort_column = None
+        self.descending = False
+        self.order = []
+        self.show_summary("")
+
+    # ................. end of method: clear .................
+
+    #.................... Method: show_summary ................
+    # This method shows the summary of the chunks of configurations under
+    # the table, or hides it if there is none
+    #
+    def show_summary(self, summary):
+        self.summary.configure(state = NORMAL)
+        self.summary.delete(0.0, END)
+        self.summary.insert(0.0, summary)
+        self.summary.configure(state = DISABLED)
+        if summary.strip() == "":
+            self.summary.grid_remove()
+        else:
+            self.summary.grid()
+
+    # ................. end of method: show_summary .................
+
+    #.................... Method: add ................
+    # This method adds the row for a configuration which has been answered,
+    # removing the oldest row if the table is full.
+    # It is passed
+    #   - configno : the number of the configuration
+    #   - correct_column : the column with most LEDs lit (1 to 4)
+    #   - player_answer : the column chosen by the player or 0 for a timeout
+    #   - player_time : the player's time in ms
+    #   - speed : the speed (timeout) in ms used for the configuration
+    #
+    def add(self, configno, correct_column, player_answer, player_time, speed):
+        if len(self.added) == CTABLEROWS:
+            self.remove_oldest()
+        correct = (player_answer == correct_column)
+        row = (configno, correct_column, player_answer, correct, player_time, speed)
+        if player_answer == 0:
+            shown_time = "Timeout"
+        else:
+            shown_time = str(round(player_time*0.001, 4))
+        values = (configno, correct_column, player_answer, "Y" if correct else "N", shown_time, speed)
+        if self.sort_column is None:
+            item = self.tree.insert("", "end", values = values)
+            self.tree.see(item)
+        else:
+            key = sort_key(self.sort_column, row)
+            place = bisect(self.order, (key, ""))
+            index = place
+            if self.descending:
+                index = len(self.order) - place
+            item = self.tree.insert("", index, values = values)
+            self.order.insert(place, (key, item))
+        self.added.append((item, row))
+
+    # ................. end of method: add .................
+
+    #.................... Method: remove_oldest ................
+    # This method removes the row of the earliest configuration in the table
+    #
+    def remove_oldest(self):
+        item, row = self.added.popleft()
+        self.tree.delete(item)
+        if self.sort_column is not None:
+            self.order.remove((sort_key(self.sort_column, row), item))
+
+    # ................. end of method: remove_oldest .................
+
+    #.................... Method: sort ................
+    # This method sorts the table by a column, or reverses the order if the
+    # table is already sorted by it.  The rows are moved, not made again.
+    # It is passed column = the name of the column
+    #
+    def sort(self, column):
+        if column == self.sort_column:
+            self.descending = not self.descending
+        else:
+            self.sort_column = column
+            self.descending = False
+            self.order = sorted((sort_key(column, row), item) for item, row in self.added)
+        order = self.order
+        if self.descending:
+            order = reversed(order)
+        for index, (key, item) in enumerate(order):
+            self.tree.move(item, "", index)
+
+    # ................. end of method: sort .................
+
+#=================================================================
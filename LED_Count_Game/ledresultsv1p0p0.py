@@ -0,0 +1,334 @@
+#!/usr/bin/env python
+
+#==============================================================
+#
+# Authors:      Christine Smythe and Colin Smythe (Dunelm Services Limited)
+# Version:      1.0
+# Release Date: 1st November, 2013
+#
+# Description:  This Python3 module stores the player results for the LED
+#               Counting Game.
+#
+#               The results are kept in columns - one compact array each for
+#               the correct column, the player's answer, whether the player
+#               was correct and the player's time - with one entry for each
+#               configuration played.  The statistics are updated as each
+#               result is added (the mean and variance of the times use
+#               Welford's method) so they can be displayed at any time without
+#               looking through the results again.
+#
+#               Only the latest chunk of results (CCHUNKSIZE configurations)
+#               is kept in the arrays.  When it is full it is written to a
+#               temporary file and the arrays start again, so a game of any
+#               length uses the same memory.  rows() reads the results back in
+#               order, a chunk at a time, and a short summary of each chunk
+#               written is kept so the whole game can be shown in outline.
+#
+#               RollingWindow keeps the accuracy and average time of just the
+#               latest few results in a ring buffer, updated in constant time
+#               as each result is added (used for the adaptive speed).
+#
+# History:      Original release.
+#
+# Copyright:    2013 (c) Premier Farnell Limited
+#
+# License:      GPLv3+
+#
+#==============================================================
+
+import tempfile
+from array import array
+from collections import namedtuple
+from math import sqrt
+
+#==============================================================
+# Declaration of Constants
+
+CCHUNKSIZE = 256;       # results kept in memory before they are written to disk
+
+# the typecodes of the result columns, in the order they are written to disk
+CCOLUMN_TYPES = ('B', 'B', 'B', 'd', 'l');
+CROWBYTES = sum(array(code).itemsize for code in CCOLUMN_TYPES);   # bytes on disk for each result
+
+# the summary of a chunk of results: the first configuration in it (from 1),
+# the number of results and of correct, wrong and timed out answers and the
+# average time (ms)
+ChunkSummary = namedtuple("ChunkSummary", "first count correct wrong timeout mean_time")
+
+#==============================================================
+
+class RunningStats(object):
+    """ Running count, mean, variance, minimum and maximum of some values. """
+
+    def __init__(self):
+        self.reset()
+
+    #.................... Method: reset ................
+    # This method forgets all the values added so far
+    #
+    def reset(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0           # sum of squared differences from the mean
+        self.minimum = None
+        self.maximum = None
+
+    # ................. end of method: reset .................
+
+    #.................... Method: add ................
+    # This method adds a value, updating the statistics (Welford's method)
+    #
+    def add(self, value):
+        self.count = self.count + 1
+        delta = value - self.mean
+        self.mean = self.mean + delta / self.count
+        self.m2 = self.m2 + delta * (value - self.mean)
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+
+    # ................. end of method: add .................
+
+    #.................... Method: variance ................
+    # This method returns the (sample) variance of the values added
+    #
+    def variance(self):
+        if self.count < 2:
+            return 0.0
+        return self.m2 / (self.count - 1)
+
+    # ................. end of method: variance .................
+
+    #.................... Method: stdev ................
+    # This method returns the (sample) standard deviation of the values added
+    #
+    def stdev(self):
+        return sqrt(self.variance())
+
+    # ................. end of method: stdev .................
+
+#==============================================================
+
+class RollingWindow(object):
+    """ Accuracy and average time of the latest results, in a ring buffer. """
+
+    def __init__(self, size):
+        self.size = size
+        self.reset()
+
+    #.................... Method: reset ................
+    # This method empties the window
+    #
+    def reset(self):
+        # one slot for each result in the window: whether it was correct and
+        # its time (None for a timeout, which has no reaction time)
+        self.correct = [0] * self.size
+        self.times = [None] * self.size
+        self.next = 0           # the slot the next result goes in
+        self.count = 0          # the number of results in the window
+        self.correct_total = 0
+        self.time_total = 0.0
+        self.timed = 0          # the number of results in the window with a time
+
+    # ................. end of method: reset .................
+
+    #.................... Method: add ................
+    # This method adds a result, dropping the oldest if the window is full.
+    # It is passed the following parameters:
+    #   - correct = 1 if the player was correct otherwise 0
+    #   - player_time = the player's time in ms, or None for a timeout
+    #
+    def add(self, correct, player_time):
+        slot = self.next
+        if self.count == self.size:
+            # take off the result being dropped
+            self.correct_total = self.correct_total - self.correct[slot]
+            if self.times[slot] is not None:
+                self.time_total = self.time_total - self.times[slot]
+                self.timed = self.timed - 1
+        else:
+            self.count = self.count + 1
+        self.correct[slot] = correct
+        self.times[slot] = player_time
+        self.correct_total = self.correct_total + correct
+        if player_time is not None:
+            self.time_total = self.time_total + player_time
+            self.timed = self.timed + 1
+        self.next = (slot + 1) % self.size
+
+    # ................. end of method: add .................
+
+    #.................... Method: accuracy ................
+    # This method returns the fraction of the results in the window correct
+    #
+    def accuracy(self):
+        if self.count == 0:
+            return 0.0
+        return self.correct_total / self.count
+
+    # ................. end of method: accuracy .................
+
+    #.................... Method: mean_time ................
+    # This method returns the average time (ms) of the results in the window
+    # which have a time, or None if none of them have
+    #
+    def mean_time(self):
+        if self.timed == 0:
+            return None
+        return self.time_total / self.timed
+
+    # ................. end of method: mean_time .................
+
+#==============================================================
+
+class PlayerResults(object):
+    """ Column store of the player results with running statistics. """
+
+    def __init__(self, chunksize = CCHUNKSIZE):
+        self.chunksize = chunksize
+        self.spill = None
+        self.reset()
+
+    #.................... Method: reset ................
+    # This method empties the results table ready for a new game
+    #
+    def reset(self):
+        # one entry in each column for each configuration in the latest chunk
+        # correct_column   values 1,2,3,4
+        # player_answer    values 1,2,3,4 or 0 (if no answer given)
+        # player_correct   value 1 if player_answer = correct_column otherwise 0
+        # player_time      time the player took to press button in ms (with
+        #                  sub-millisecond precision) or the maximum time
+        #                  (i.e. speed chosen) + 1 if timed out
+        # trial_speed      the speed (timeout) in ms used for the configuration
+        self.correct_column = array('B')
+        self.player_answer = array('B')
+        self.player_correct = array('B')
+        self.player_time = array('d')
+        self.trial_speed = array('l')
+        # the chunks already written to disk, and the summary of each
+        self.close()
+        self.written = 0
+        self.chunks = []
+        # the running statistics
+        self.correct_count = 0
+        self.wrong_count = 0
+        self.timeout_count = 0
+        self.times = RunningStats()
+        self.speeds = RunningStats()
+
+    # ................. end of method: reset .................
+
+    #.................... Method: close ................
+    # This method removes the file the chunks were written to
+    #
+    def close(self):
+        if self.spill is not None:
+            self.spill.close()
+            self.spill = None
+
+    # ................. end of method: close .................
+
+    #.................... Method: add ................
+    # This method adds the result of the next configuration played and
+    # updates the statistics.
+    # It is passed the following parameters:
+    #   - correct_column = the column with most LEDs lit (1 to 4)
+    #   - player_answer  = the column chosen by the player or 0 for a timeout
+    #   - player_time    = the player's time in ms (speed + 1 for a timeout)
+    #   - speed          = the speed (timeout) in ms used for the configuration
+    #
+    def add(self, correct_column, player_answer, player_time, speed):
+        correct = (player_answer == correct_column)
+        self.correct_column.append(correct_column)
+        self.player_answer.append(player_answer)
+        self.player_correct.append(correct)
+        self.player_time.append(player_time)
+        self.trial_speed.append(speed)
+        if player_answer == 0:
+            self.timeout_count = self.timeout_count + 1
+        elif correct:
+            self.correct_count = self.correct_count + 1
+        else:
+            self.wrong_count = self.wrong_count + 1
+        self.times.add(player_time)
+        self.speeds.add(speed)
+        if len(self.player_answer) == self.chunksize:
+            self.write_chunk()
+
+    # ................. end of method: add .................
+
+    #.................... Method: columns ................
+    # This method returns the arrays of the latest chunk, in the order
+    # they are written to disk
+    #
+    def columns(self):
+        return (self.correct_column, self.player_answer, self.player_correct,
+                self.player_time, self.trial_speed)
+
+    # ................. end of method: columns .................
+
+    #.................... Method: write_chunk ................
+    # This method writes the (full) latest chunk to disk, keeps its summary
+    # and empties the arrays for the next chunk
+    #
+    def write_chunk(self):
+        if self.spill is None:
+            self.spill = tempfile.TemporaryFile(prefix = "ledresults")
+        self.spill.seek(len(self.chunks) * self.chunksize * CROWBYTES)
+        for column in self.columns():
+            column.tofile(self.spill)
+        answered = self.chunksize - self.player_answer.count(0)
+        correct = sum(self.player_correct)
+        self.chunks.append(ChunkSummary(self.written + 1, self.chunksize, correct,
+                                        answered - correct, self.chunksize - answered,
+                                        sum(self.player_time) / self.chunksize))
+        self.written = self.written + self.chunksize
+        for column in self.columns():
+            del column[:]
+
+    # ................. end of method: write_chunk .................
+
+    #.................... Method: read_chunk ................
+    # This method reads a chunk back from disk
+    # It is passed number = the number of the chunk (from 0)
+    # It returns the arrays of the chunk, as columns()
+    #
+    def read_chunk(self, number):
+        self.spill.seek(number * self.chunksize * CROWBYTES)
+        chunk = tuple(array(code) for code in CCOLUMN_TYPES)
+        for column in chunk:
+            column.fromfile(self.spill, self.chunksize)
+        return chunk
+
+    # ................. end of method: read_chunk .................
+
+    #.................... Method: rows ................
+    # This method returns the results in the order they were played, one
+    # chunk in memory at a time.
+    # It is passed first = the number of results to skip
+    # It yields (correct_column, player_answer, player_correct, player_time,
+    # trial_speed) for each result
+    #
+    def rows(self, first = 0):
+        for number in range(first // self.chunksize, len(self.chunks)):
+            chunk = self.read_chunk(number)
+            start = max(0, first - number * self.chunksize)
+            for row in zip(*[column[start:] for column in chunk]):
+                yield row
+        start = max(0, first - self.written)
+        for row in zip(*[column[start:] for column in self.columns()]):
+            yield row
+
+    # ................. end of method: rows .................
+
+    #.................... Method: __len__ ................
+    # This method returns the number of configurations with a result
+    #
+    def __len__(self):
+        return self.written + len(self.player_answer)
+
+    # ................. end of method: __len__ .................
+
+#=================================================================
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+
+#==============================================================
+#
+# Authors:      Christine Smythe and Colin Smythe (Dunelm Services Limited)
+# Version:      1.0
+# Release Date: 1st November, 2013
+#
+# Description:  This Python3 module draws the LED columns of the LED Counting
+#               Game in a Tk window, so the game can be played (with the
+#               keyboard) or demonstrated without the PiRack and PiFace boards.
+#
+#               Each ScreenBoard has an output_port like a PiFace board, so
+#               LEDBoards writes the frames to the screen just as it writes
+#               them to the boards.  The columns are drawn as the BoardGeometry
+#               makes them, a column taller than a board from several boards.
+#
+# History:      Original release.
+#
+# Copyright:    2013 (c) Premier Farnell Limited
+#
+# License:      GPLv3+
+#
+#==============================================================
+
+from tkinter import Frame, Canvas, Label
+from ledboardsv1p0p0 import CGEOMETRY
+
+#==============================================================
+# Declaration of Constants
+
+CLEDSIZE = 24;          # the diameter of each LED (pixels)
+CLEDGAP = 8;            # the space around each LED (pixels)
+CLEDONCOLOUR = "red";   # the colour of an LED which is lit
+CLEDOFFCOLOUR = "gray25"; # the colour of an LED which is off
+CBACKGROUND = "black"; # the colour behind the LEDs
+
+#==============================================================
+
+class ScreenPort(object):
+    """ The output port of a board drawn on the screen. """
+
+    def __init__(self, canvas, leds):
+        self.canvas = canvas
+        # the canvas item for each LED, LED 0 first
+        self.leds = leds
+        self._value = 0
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        # only the LEDs which have changed are drawn again
+        changed = self._value ^ value
+        self._value = value
+        while changed:
+            bit = changed & -changed
+            changed = changed ^ bit
+            self.canvas.itemconfigure(self.leds[bit.bit_length() - 1],
+                                      fill = CLEDONCOLOUR if value & bit else CLEDOFFCOLOUR)
+
+#==============================================================
+
+class ScreenBoard(object):
+    """ A board of LEDs drawn as one column on the screen. """
+
+    def __init__(self, canvas, leds):
+        self.output_port = ScreenPort(canvas, leds)
+
+#==============================================================
+
+class LEDScreen(Frame):
+    """ The columns of LEDs drawn in a window, from the boards of a geometry. """
+
+    def __init__(self, master, geometry = CGEOMETRY):
+        super(LEDScreen, self).__init__(master)
+        pitch = CLEDSIZE + CLEDGAP
+        columns = geometry.columns
+        height = geometry.ledspercolumn
+        self.canvas = Canvas(self, width = columns * pitch + CLEDGAP,
+                             height = height * pitch + CLEDGAP, bg = CBACKGROUND)
+        self.canvas.grid(row = 0, column = 0, columnspan = columns)
+        self.boards = []
+        for column in range(0, columns):
+            left = CLEDGAP + column * pitch
+            led = 0
+            for size in geometry.segments:
+                # LED 0 of the column is at the bottom, on the first board
+                leds = []
+                for bit in range(0, size):
+                    top = CLEDGAP + (height - 1 - led) * pitch
+                    leds.append(self.canvas.create_oval(left, top, left + CLEDSIZE, top + CLEDSIZE,
+                                                        fill = CLEDOFFCOLOUR, outline = ""))
+                    led = led + 1
+                self.boards.append(ScreenBoard(self.canvas, leds))
+            Label(self, text = str(column + 1)).grid(row = 1, column = column)
+
+#=================================================================
@@ -0,0 +1,1093 @@
+#!/usr/bin/env python
+
+#==============================================================
+#
+# Authors:      Christine Smythe and Colin Smythe (Dunelm Services Limited)
+# Version:      1.0
+# Release Date: 1st November, 2013
+#
+# Description:  This Python3 program runs the LED Counting Game without a PiRack,
+#               without the GUI and without a human player.
+#
+#               The same game logic (GameEngine) is run against simulated PiFace
+#               boards and buttons using a virtual clock, so no time is spent
+#               waiting - the clock jumps straight to the next thing that will
+#               happen.  The player is simulated by one of the player models:
+#
+#               FixedLatencyPlayer  - always answers correctly after a fixed time;
+#               RandomLatencyPlayer - answers correctly after a random time;
+#               ErrorPronePlayer    - like RandomLatencyPlayer but sometimes
+#                                     chooses the wrong column.
+#
+#               A head to head game (see ledheadtoheadv1p0p0.py) is played by
+#               two of them at once in a DuelSimulation.
+#
+#               Usage:  python3 ledsimulatorv1p0p0.py check
+#                           runs the correctness checks;
+#                       python3 ledsimulatorv1p0p0.py play [configs] [speed] [seed]
+#                           plays one game and prints the results.
+#
+#               The throughput benchmark is in ledbenchmarkv1p0p0.py.
+#
+# History:      Original release.
+#
+# Copyright:    2013 (c) Premier Farnell Limited
+#
+# License:      GPLv3+
+#
+#==============================================================
+
+import heapq
+import json
+import random
+import socket
+import sys
+import tempfile
+from time import sleep, perf_counter, perf_counter_ns
+from ledboardsv1p0p0 import LEDBoards, BoardGeometry, CGEOMETRY, CLEDSPERBOARD, CNS_PER_SECOND, CNS_PER_MS
+from ledboardsv1p0p0 import pack_frame, unpack_frame
+from ledinputv1p0p0 import ButtonEvent, PolledButtonInput
+from ledgameenginev1p0p0 import GameEngine, CSTARTBUTTON, CSTOPBUTTON, CLEDCOL_BUTTONS, CSTATE_AWAITING
+from ledgameenginev1p0p0 import CSTATE_ATTRACT, CSTARTTIMEOUT, CRESULTSWINDOW, CGAME_BUTTONS
+from ledpatternsv1p0p0 import PatternGenerator, Pattern
+from ledanimationv1p0p0 import AnimationPlayer, CCOMPILED, CATTRACT_ANIMATION, compile_animations
+from ledrecordv1p0p0 import GameRecorder, GameLog, replay
+from ledresultsv1p0p0 import RollingWindow, CCHUNKSIZE
+from ledhistoryv1p0p0 import GameHistory
+from ledtrialsv1p0p0 import TrialScheduler, CFIXATION_FRAME
+from ledcalibratev1p0p0 import simulated_calibrator
+from ledspectatorv1p0p0 import SpectatorFeed
+from ledmultiplexv1p0p0 import InputMultiplexer, KeyboardInput, SocketInput, CINPUTHOST
+from ledadaptivev1p0p0 import CMINSPEED
+from ledheadtoheadv1p0p0 import HeadToHeadGame
+
+#==============================================================
+# Declaration of Constants
+
+CSTARTDELAY = 0.8;      # seconds the simulated player takes to press start
+CDEFAULTCONFIGS = 10;   # number of configurations in a game played from the command line
+CDEFAULTSPEED = 2000;   # speed (ms) of a game played from the command line
+
+#==============================================================
+
+class VirtualClock(object):
+    """ A clock (in nanoseconds) which only moves when it is told to. """
+
+    def __init__(self, now = 0):
+        self.now = now
+
+    #.................... Method: read ................
+    # This method returns the time now, used as the game clock
+    #
+    def read(self):
+        return self.now
+
+    # ................. end of method: read .................
+
+    #.................... Method: advance_to ................
+    # This method moves the clock on to the given time (it never goes back)
+    #
+    def advance_to(self, when):
+        if when > self.now:
+            self.now = when
+
+    # ................. end of method: advance_to .................
+
+#==============================================================
+
+class PacedClock(VirtualClock):
+    """ A virtual clock which waits in real time as it moves on, so a
+    simulated game can be watched. """
+
+    def advance_to(self, when):
+        if when > self.now:
+            sleep((when - self.now) / CNS_PER_SECOND)
+        super(PacedClock, self).advance_to(when)
+
+#==============================================================
+
+class SimulatedPort(object):
+    """ The output port of a simulated PiFace board. """
+
+    def __init__(self):
+        self.value = 0
+
+#==============================================================
+
+class SimulatedBoard(object):
+    """ A simulated PiFace board, used in place of pfio.PiFaceDigital. """
+
+    def __init__(self):
+        self.output_port = SimulatedPort()
+
+#==============================================================
+
+class SimulatedButtons(object):
+    """ Simulated game board buttons, used in place of ButtonInput. """
+
+    def __init__(self, clock):
+        self.clock = clock
+        # the (timestamp, button, uncertainty) presses which have been made
+        # but not yet processed, kept in time order
+        self.presses = []
+
+    #.................... Method: press ................
+    # This method presses a button at the given time, timestamped to within
+    # 'uncertainty' ns
+    #
+    def press(self, button, timestamp, uncertainty = 0):
+        heapq.heappush(self.presses, (timestamp, button, uncertainty))
+
+    # ................. end of method: press .................
+
+    #.................... Method: next_press ................
+    # This method returns the time of the next press, or None if there is none
+    #
+    def next_press(self):
+        if self.presses:
+            return self.presses[0][0]
+        return None
+
+    # ................. end of method: next_press .................
+
+    #.................... Method: clear ................
+    # This method throws away any presses which have already happened
+    #
+    def clear(self):
+        while self.presses and self.presses[0][0] <= self.clock.now:
+            heapq.heappop(self.presses)
+
+    # ................. end of method: clear .................
+
+    #.................... Method: poll ................
+    # This method returns the next press (which has happened by now) of one
+    # of the chosen buttons, as ButtonInput.poll() does.
+    #
+    def poll(self, buttons, since = 0):
+        while self.presses and self.presses[0][0] <= self.clock.now:
+            timestamp, button, uncertainty = heapq.heappop(self.presses)
+            if button in buttons and timestamp >= since:
+                return ButtonEvent(button, timestamp, uncertainty)
+        return None
+
+    # ................. end of method: poll .................
+
+#==============================================================
+
+class SimulatedWindow(object):
+    """ A simulated Tk window which keys are pressed in, for KeyboardInput. """
+
+    def __init__(self):
+        self.handlers = {}
+
+    def bind(self, sequence, handler, add = None):
+        self.handlers[sequence] = handler
+        return "key handler"
+
+    def unbind(self, sequence, funcid = None):
+        del self.handlers[sequence]
+
+    #.................... Method: press ................
+    # This method presses a key
+    # It is passed
+    #   - keysym : the name of the key, e.g. "s"
+    #   - time : the X server time of the key event (ms)
+    #   - widget_class : the class of the widget with the focus
+    #
+    def press(self, keysym, time, widget_class = "Frame"):
+        if "<KeyPress>" in self.handlers:
+            self.handlers["<KeyPress>"](SimulatedKey(keysym, time, widget_class))
+
+    # ................. end of method: press .................
+
+#==============================================================
+
+class SimulatedKey(object):
+    """ A simulated Tk key event, which is also the widget it was typed in. """
+
+    def __init__(self, keysym, time, widget_class):
+        self.keysym = keysym
+        self.time = time
+        self.widget = self
+        self.widget_class = widget_class
+
+    def winfo_class(self):
+        return self.widget_class
+
+#==============================================================
+
+class NullView(object):
+    """ A view which throws away everything the game displays. """
+
+    def show_status(self, row, status):
+        pass
+
+    def show_statistics(self, stats):
+        pass
+
+    def show_results(self, results):
+        pass
+
+    def show_result(self, configno, correct_column, player_answer, player_time, speed):
+        pass
+
+#==============================================================
+
+class TextView(NullView):
+    """ A view which keeps the latest text displayed in each panel. """
+
+    def __init__(self):
+        self.status = ""
+        self.statistics = ""
+        self.results = ""
+
+    def show_status(self, row, status):
+        self.status = self.status + status
+
+    def show_statistics(self, stats):
+        self.statistics = stats
+
+    def show_results(self, results):
+        self.results = results
+
+#==============================================================
+
+class CollectingFeed(object):
+    """ A spectator feed which keeps the (kind, fields) of every event published. """
+
+    def __init__(self):
+        self.events = []
+
+    def publish(self, kind, fields):
+        self.events.append((kind, fields))
+
+#==============================================================
+
+class FixedLatencyPlayer(object):
+    """ A player who always chooses the correct column after a fixed time. """
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    #.................... Method: respond ................
+    # This method decides how the player responds to a pattern.
+    # It returns the column chosen (1 upwards) and how long (in seconds)
+    # the player takes to press its button.
+    #
+    def respond(self, pattern):
+        return pattern.correct_column, self.latency
+
+    # ................. end of method: respond .................
+
+#==============================================================
+
+class RandomLatencyPlayer(object):
+    """ A player who chooses the correct column after a random time. """
+
+    def __init__(self, mean, sd, seed = None, minimum = 0.1):
+        self.mean = mean
+        self.sd = sd
+        self.minimum = minimum
+        self.rng = random.Random(seed)
+
+    #.................... Method: latency ................
+    # This method returns a random time (in seconds) for the player to respond,
+    # normally distributed but never less than the minimum
+    #
+    def latency(self):
+        return max(self.minimum, self.rng.gauss(self.mean, self.sd))
+
+    # ................. end of method: latency .................
+
+    #.................... Method: respond ................
+    # This method returns the column chosen and the time taken, as for
+    # FixedLatencyPlayer
+    #
+    def respond(self, pattern):
+        return pattern.correct_column, self.latency()
+
+    # ................. end of method: respond .................
+
+#==============================================================
+
+class ErrorPronePlayer(RandomLatencyPlayer):
+    """ A player who sometimes chooses a wrong column, after a random time. """
+
+    def __init__(self, mean, sd, error_rate, seed = None, minimum = 0.1):
+        super(ErrorPronePlayer, self).__init__(mean, sd, seed, minimum)
+        self.error_rate = error_rate
+
+    #.................... Method: respond ................
+    # This method returns the column chosen and the time taken, choosing a
+    # wrong column at the player's error rate
+    #
+    def respond(self, pattern):
+        column = pattern.correct_column
+        if self.rng.random() < self.error_rate:
+            # choose one of the wrong columns
+            columns = range(1, len(pattern.LEDs_in_column) + 1)
+            column = self.rng.choice([wrong for wrong in columns if wrong != column])
+        return column, self.latency()
+
+    # ................. end of method: respond .................
+
+#==============================================================
+
+class Simulation(object):
+    """ The LED Counting Game played by a simulated player on simulated boards. """
+
+    def __init__(self, player, view = None, clock = None, geometry = CGEOMETRY):
+        self.player = player
+        if clock is None:
+            clock = VirtualClock()
+        self.clock = clock
+        self.boards = [SimulatedBoard() for board in range(0, geometry.numboards)]
+        self.leds = LEDBoards(geometry.numboards, self.boards, self.clock.read)
+        self.buttons = SimulatedButtons(self.clock)
+        if view is None:
+            view = NullView()
+        self.view = view
+        self.game = GameEngine(self.leds, self.buttons, view, geometry = geometry)
+
+    #.................... Method: play ................
+    # This method plays one whole game.
+    # It is passed
+    #   - configs : the number of configurations to be played
+    #   - speed : the speed (timeout) in ms
+    #   - seed : the seed for the patterns, or None for a random game
+    #   - stop_at : the configuration at which the player presses STOP, if any
+    #   - adaptive : True for an adaptive game starting at the speed given
+    # It returns the GameEngine, from which the results can be read.
+    #
+    def play(self, configs, speed, seed = None, stop_at = None, adaptive = False):
+        clock = self.clock
+        game = self.game
+        buttons = self.buttons
+        game.start_game(configs, speed, clock.now, seed, adaptive = adaptive)
+        buttons.press(CSTARTBUTTON, clock.now + int(CSTARTDELAY * CNS_PER_SECOND))
+        answered = 0
+        while game.running():
+            if game.state == CSTATE_AWAITING and answered != game.count:
+                # a new configuration is showing so the player responds to it
+                answered = game.count
+                if answered == stop_at:
+                    buttons.press(CSTOPBUTTON, game.starttime)
+                else:
+                    column, latency = self.player.respond(game.pattern(answered))
+                    buttons.press(game.column_buttons[column-1], game.starttime + int(latency * CNS_PER_SECOND))
+            # move the clock on to whatever happens next
+            when = game.next_update(clock.now)
+            press = buttons.next_press()
+            if press is not None and press < when:
+                when = press
+            clock.advance_to(when)
+            game.update(clock.now)
+        return game
+
+    # ................. end of method: play .................
+
+#==============================================================
+
+class DuelSimulation(Simulation):
+    """ A head to head game played by two simulated players on simulated boards. """
+
+    def __init__(self, players, view = None, clock = None, geometry = CGEOMETRY, uncertainty = 0):
+        super(DuelSimulation, self).__init__(players[0], view, clock, geometry)
+        self.players = players
+        # how far (ns) either side of its timestamp each press may have been
+        self.uncertainty = uncertainty
+        self.game = HeadToHeadGame(self.leds, self.buttons, self.view, geometry = geometry)
+
+    #.................... Method: play ................
+    # This method plays one whole head to head game, each player pressing
+    # their own button for their answer to each configuration.
+    # It returns the HeadToHeadGame, from which the results can be read.
+    #
+    def play(self, configs, speed, seed = None):
+        game = self.game
+        game.start_game(configs, speed, self.clock.now, seed)
+        self.buttons.press(CSTARTBUTTON, self.clock.now + int(CSTARTDELAY * CNS_PER_SECOND))
+        answered = 0
+        while game.running():
+            if game.state == CSTATE_AWAITING and answered != game.count:
+                answered = game.count
+                for player, buttons in zip(self.players, game.players_buttons):
+                    column, latency = player.respond(game.pattern(answered))
+                    self.buttons.press(buttons[column-1], game.starttime + int(latency * CNS_PER_SECOND),
+                                       self.uncertainty)
+            self.advance()
+        return game
+
+    # ................. end of method: play .................
+
+    #.................... Method: advance ................
+    # This method moves the clock on to whatever happens next and updates
+    # the game
+    #
+    def advance(self):
+        when = self.game.next_update(self.clock.now)
+        press = self.buttons.next_press()
+        if press is not None and (when is None or press < when):
+            when = press
+        self.clock.advance_to(when)
+        self.game.update(self.clock.now)
+
+    # ................. end of method: advance .................
+
+#=================================================================
+# the correctness checks
+#=================================================================
+
+#.................... Function: check ................
+# This function prints the result of one check and returns whether it passed
+#
+def check(name, passed):
+    if passed:
+        print("PASS  " + name)
+    else:
+        print("FAIL  " + name)
+    return passed
+
+# ..................... end of function : check .........
+
+#.................... Function: watch_feed ................
+# This function connects to a spectator feed's event stream
+# It returns the connected socket
+#
+def watch_feed(feed):
+    connection = socket.create_connection(("127.0.0.1", feed.port), timeout = 5)
+    connection.sendall(b"GET /events HTTP/1.1\r\nHost: localhost\r\n\r\n")
+    return connection
+
+# ..................... end of function : watch_feed .........
+
+#.................... Function: read_feed ................
+# This function reads the events from a spectator feed's event stream until
+# an event of the kind given arrives
+# It returns the events, each a dictionary
+#
+def read_feed(connection, last_kind):
+    data = b""
+    events = []
+    headers = True
+    while not events or events[-1]["kind"] != last_kind:
+        data = data + connection.recv(65536)
+        if headers and b"\r\n\r\n" in data:
+            data = data.split(b"\r\n\r\n", 1)[1]
+            headers = False
+        while b"\n\n" in data:
+            message, data = data.split(b"\n\n", 1)
+            if message.startswith(b"data: "):
+                events.append(json.loads(message[6:].decode("utf-8")))
+    return events
+
+# ..................... end of function : read_feed .........
+
+#.................... Function: run_checks ................
+# This function runs the correctness checks.  Everything is seeded so the
+# checks give the same results every time.
+# It returns True if all of the checks passed.
+#
+def run_checks():
+    passed = True
+
+    # a perfect player gets everything right in the time they take
+    game = Simulation(FixedLatencyPlayer(0.25)).play(50, 1000, seed = 1)
+    results = game.results
+    passed &= check("perfect player is always correct",
+                    results.correct_count == 50 and results.wrong_count == 0)
+    passed &= check("perfect player times are measured",
+                    list(results.player_time) == [250.0] * 50)
+
+    # a player slower than the speed always times out
+    game = Simulation(FixedLatencyPlayer(0.6)).play(20, 500, seed = 2)
+    passed &= check("slow player always times out",
+                    game.results.timeout_count == 20 and
+                    list(game.results.player_time) == [501] * 20)
+
+    # a player who is always wrong never gets a column right
+    game = Simulation(ErrorPronePlayer(0.4, 0.1, 1.0, seed = 3)).play(30, 2000, seed = 3)
+    passed &= check("always wrong player is never correct",
+                    game.results.wrong_count == 30 and game.results.correct_count == 0)
+
+    # the same seeds give the same game
+    first = Simulation(ErrorPronePlayer(0.5, 0.2, 0.2, seed = 4)).play(40, 1000, seed = 4)
+    second = Simulation(ErrorPronePlayer(0.5, 0.2, 0.2, seed = 4)).play(40, 1000, seed = 4)
+    passed &= check("same seeds give the same game",
+                    first.results.player_answer == second.results.player_answer and
+                    first.results.player_time == second.results.player_time and
+                    first.results.correct_column == second.results.correct_column)
+
+    # the correct column is the one with most LEDs lit
+    passed &= check("correct column has most LEDs lit",
+                    all(max(pattern.LEDs_in_column) ==
+                        pattern.LEDs_in_column[pattern.correct_column-1] and
+                        len(set(pattern.LEDs_in_column)) == 4
+                        for pattern in first.patterns))
+
+    # the statistics agree with the results
+    results = first.results
+    passed &= check("statistics agree with results",
+                    results.correct_count + results.wrong_count + results.timeout_count == 40 and
+                    abs(results.times.mean - sum(results.player_time) / 40.0) < 1e-6)
+
+    # pressing STOP ends the game and counts that configuration as a timeout
+    simulation = Simulation(FixedLatencyPlayer(0.3), TextView())
+    game = simulation.play(10, 1000, seed = 5, stop_at = 4)
+    passed &= check("stop ends the game",
+                    len(game.results) == 4 and game.results.player_answer[3] == 0 and
+                    "Game stopped" in simulation.view.status)
+    passed &= check("stop turns all the LEDs off",
+                    [board.output_port.value for board in simulation.boards] == [0, 0, 0, 0])
+
+    # STOP pressed after the configuration timed out, but before the game
+    # next looked at the buttons, still ends the game
+    simulation = Simulation(FixedLatencyPlayer(0.3), TextView())
+    game = simulation.game
+    clock = simulation.clock
+    game.start_game(10, 1000, clock.now, 5)
+    simulation.buttons.press(CSTARTBUTTON, clock.now)
+    while game.state != CSTATE_AWAITING:
+        clock.advance_to(game.next_update(clock.now))
+        game.update(clock.now)
+    simulation.buttons.press(CSTOPBUTTON, game.timeout + CNS_PER_MS)
+    clock.advance_to(game.timeout + 5 * CNS_PER_MS)
+    game.update(clock.now)
+    passed &= check("stop after the timeout ends the game",
+                    not game.running() and game.StopSwitch and game.count == 1 and
+                    game.results.timeout_count == 1 and "Game stopped" in simulation.view.status)
+
+    # a configuration is composed without touching the LEDs and then drawn
+    # with at most 4 board writes, timed from the flip
+    simulation = Simulation(FixedLatencyPlayer(0.3))
+    game = simulation.game
+    game.start_game(1, 1000, simulation.clock.now, 6)
+    writes = simulation.leds.writes
+    game.generate_random_LEDs(1)
+    passed &= check("a configuration is composed off screen",
+                    simulation.leds.writes == writes and
+                    [board.output_port.value for board in simulation.boards] == [0, 0, 0, 0])
+    simulation.clock.advance_to(12345)
+    game.show_config()
+    passed &= check("a configuration is drawn with at most 4 writes",
+                    simulation.leds.writes - writes <= 4 and
+                    bytes(board.output_port.value for board in simulation.boards) == game.patterns[0].frame)
+    passed &= check("timing starts when the frame is visible",
+                    game.starttime == simulation.leds.visible == 12345)
+
+    # a late animation frame does not delay the frames after it
+    animation = CCOMPILED[CATTRACT_ANIMATION]
+    player = AnimationPlayer(animation)
+    player.start(1000)
+    shown = [player.due(1000), player.due(1001), player.due(1000 + animation.period + 3000000)]
+    passed &= check("animation frames are shown on absolute deadlines",
+                    shown == [animation.frames[0], None, animation.frames[1]] and
+                    player.deadline == 1000 + 2 * animation.period)
+
+    # the attract animation runs until the start timeout, which is in seconds
+    simulation = Simulation(FixedLatencyPlayer(0.3))
+    game = simulation.game
+    game.start_game(1, 1000, 0, 6)
+    frames = []
+    while game.running():
+        simulation.clock.advance_to(game.next_update(simulation.clock.now))
+        game.update(simulation.clock.now)
+        if game.running():
+            frames.append(tuple(board.output_port.value for board in simulation.boards))
+    passed &= check("start timeout is " + str(CSTARTTIMEOUT) + " seconds",
+                    simulation.clock.now == int(CSTARTTIMEOUT * CNS_PER_SECOND) and
+                    len(frames) == CSTARTTIMEOUT * CNS_PER_SECOND // animation.period and
+                    frames[:4] == list(animation.frames))
+
+    # pressing start takes effect at the press, not at the next frame
+    simulation = Simulation(FixedLatencyPlayer(0.3))
+    game = simulation.game
+    game.start_game(1, 1000, 0, 6)
+    simulation.buttons.press(CSTARTBUTTON, 1234567)
+    simulation.clock.advance_to(simulation.buttons.next_press())
+    game.update(simulation.clock.now)
+    passed &= check("start reacts straight away",
+                    game.state != CSTATE_ATTRACT and
+                    [board.output_port.value for board in simulation.boards] == [0, 0, 0, 0])
+
+    # a recorded game replays to exactly the same results, whether it
+    # finished or was stopped
+    for stop_at in (None, 7):
+        simulation = Simulation(ErrorPronePlayer(0.6, 0.3, 0.2, seed = 8), TextView())
+        simulation.game.recorder = GameRecorder(None)
+        game = simulation.play(12, 800, seed = 9, stop_at = stop_at)
+        log = GameLog(bytes(simulation.game.recorder.data))
+        replayed = Simulation(FixedLatencyPlayer(0.3), TextView())
+        replay(log, replayed.game)
+        passed &= check("replay gives the same results" + (" after a stop" if stop_at else ""),
+                        log.seed == 9 and log.patterns == game.patterns[:game.count] and
+                        replayed.game.results.player_time == game.results.player_time and
+                        replayed.game.results.player_answer == game.results.player_answer and
+                        replayed.view.results == simulation.view.results and
+                        replayed.view.statistics == simulation.view.statistics)
+
+    # games started at the same time are each recorded in a file of their own
+    with tempfile.TemporaryDirectory() as directory:
+        recorder = GameRecorder(directory)
+        filenames = []
+        for number in range(0, 2):
+            recorder.start(game)
+            recorder.end(game)
+            filenames.append(recorder.filename)
+        logs = [GameLog(open(filename, "rb").read()) for filename in filenames]
+        passed &= check("games started at the same time are recorded in separate files",
+                        filenames[0] != filenames[1] and
+                        all(log.started == game.started for log in logs))
+
+    # the rolling window always agrees with the latest results
+    rng = random.Random(10)
+    window = RollingWindow(5)
+    latest = []
+    agrees = True
+    for result in range(0, 50):
+        correct = rng.randint(0, 1)
+        player_time = rng.choice([None, rng.uniform(200, 900)])
+        window.add(correct, player_time)
+        latest = (latest + [(correct, player_time)])[-5:]
+        times = [t for c, t in latest if t is not None]
+        agrees &= (window.count == len(latest) and
+                   window.correct_total == sum(c for c, t in latest) and
+                   (window.mean_time() is None) == (not times) and
+                   (not times or abs(window.mean_time() - sum(times) / len(times)) < 1e-6))
+    passed &= check("rolling window keeps the latest results", agrees)
+
+    # an adaptive game speeds up for a good player and slows down for a
+    # player who keeps timing out, and keeps the speed of every configuration
+    game = Simulation(FixedLatencyPlayer(0.25)).play(30, 2000, seed = 11, adaptive = True)
+    speeds = list(game.results.trial_speed)
+    passed &= check("adaptive speed gets faster for a good player",
+                    speeds[0] == 2000 and speeds[-1] < 1000 and speeds[-1] >= 0.25 * 1000 and
+                    game.results.correct_count == 30)
+    game = Simulation(FixedLatencyPlayer(1.5)).play(20, 1000, seed = 11, adaptive = True)
+    speeds = list(game.results.trial_speed)
+    passed &= check("adaptive speed gets slower for a slow player",
+                    speeds[0] == 1000 and speeds[-1] > 1500 and
+                    game.results.player_answer[-1] != 0 and min(speeds) >= CMINSPEED)
+    simulation = Simulation(ErrorPronePlayer(0.5, 0.2, 0.3, seed = 12), TextView())
+    simulation.game.recorder = GameRecorder(None)
+    game = simulation.play(25, 1500, seed = 13, adaptive = True)
+    replayed = Simulation(FixedLatencyPlayer(0.3), TextView())
+    replay(GameLog(bytes(simulation.game.recorder.data)), replayed.game)
+    passed &= check("adaptive game replays with its speeds",
+                    replayed.game.results.trial_speed == game.results.trial_speed and
+                    replayed.view.results == simulation.view.results and
+                    "Speed" in simulation.view.results)
+
+    # any seed the game takes is recorded, one outside 64 bits by its
+    # lowest 64 bits, and the game replays from its recorded patterns
+    logs = []
+    for seed in (-5, (1 << 64) + 7):
+        simulation = Simulation(FixedLatencyPlayer(0.3), TextView())
+        simulation.game.recorder = GameRecorder(None)
+        game = simulation.play(3, 1000, seed = seed)
+        logs.append(GameLog(bytes(simulation.game.recorder.data)))
+    passed &= check("games with any seed are recorded",
+                    game.count == 3 and [log.seed for log in logs] == [-5, 7] and
+                    logs[1].patterns == game.patterns[:3])
+
+    # a long game keeps only its latest chunk of results in memory but reads
+    # back, saves, replays and displays the same as a short one
+    simulation = Simulation(ErrorPronePlayer(0.5, 0.2, 0.1, seed = 14), TextView())
+    simulation.game.recorder = GameRecorder(None)
+    simulation.game.history = GameHistory(":memory:")
+    game = simulation.play(1000, 800, seed = 15)
+    results = game.results
+    rows = list(results.rows())
+    patterns = PatternGenerator(15).generate_batch(1000)
+    passed &= check("a long game keeps one chunk of results in memory",
+                    len(results) == len(rows) == 1000 and
+                    len(results.chunks) == 1000 // CCHUNKSIZE and
+                    len(results.player_time) == 1000 % CCHUNKSIZE)
+    passed &= check("a long game reads back all of its results in order",
+                    [row[0] for row in rows] == [pattern.correct_column for pattern in patterns] and
+                    sum(row[2] for row in rows) == results.correct_count and
+                    list(results.rows(990)) == rows[990:] and
+                    sum(chunk.correct for chunk in results.chunks) ==
+                    sum(row[2] for row in rows[:len(results.chunks) * CCHUNKSIZE]))
+    saved = simulation.game.history.db.execute(
+        "SELECT configno, correct_column, player_answer, player_correct, player_time, speed"
+        " FROM trials ORDER BY configno").fetchall()
+    passed &= check("a long game is saved with all of its results",
+                    saved == [(configno,) + tuple(row) for configno, row in enumerate(rows, 1)])
+    passed &= check("a long game shows the latest results and a summary of the rest",
+                    ("Configurations " + str(1001 - CRESULTSWINDOW) + " to 1000") in simulation.view.results and
+                    simulation.view.results.count("\n" + str(1001 - CRESULTSWINDOW) + "\t") == 1 and
+                    ("\n" + str(1000 - CRESULTSWINDOW) + "\t") not in simulation.view.results and
+                    "\n1-" + str(CCHUNKSIZE) + "\t" in simulation.view.results)
+    # a view which shows each result as it is given is only sent the
+    # summary of the chunks, not the text of each result
+    view = TextView()
+    view.results_text = False
+    Simulation(ErrorPronePlayer(0.5, 0.2, 0.1, seed = 14), view).play(1000, 800, seed = 15)
+    passed &= check("results text is only built for views which show it",
+                    view.results.startswith("Results : \n") and
+                    "\n1-" + str(CCHUNKSIZE) + "\t" in view.results and
+                    view.results.count("\n") == 3 + len(results.chunks) and
+                    "Configurations" not in view.results)
+    replayed = Simulation(FixedLatencyPlayer(0.3), TextView())
+    replay(GameLog(bytes(simulation.game.recorder.data)), replayed.game)
+    passed &= check("a long game replays to the same results",
+                    list(replayed.game.results.rows()) == rows and
+                    replayed.view.results == simulation.view.results)
+
+    # the leaderboard ranks games on the time of their correct answers, and
+    # a game which is mostly timeouts is not ranked however fast its speed
+    history = GameHistory(":memory:")
+    for player, latency, speed, seed in (("Slow", 0.45, 1000, 31), ("Fast", 0.3, 1000, 32),
+                                         ("Idle", 0.25, 200, 33)):
+        game = Simulation(FixedLatencyPlayer(latency)).play(10, speed, seed = seed)
+        if player == "Idle":
+            # only the first configuration is answered (and in time)
+            game.results.reset()
+            game.results.add(1, 1, 150.0, speed)
+            for configno in range(2, 11):
+                game.results.add(1, 0, speed + 1, speed)
+        history.save_game(player, 0.0, speed, seed, game.results)
+    board = history.leaderboard(1000)
+    passed &= check("the leaderboard ranks accurate games on their correct times",
+                    [row[0] for row in board] == ["Fast", "Slow"] and
+                    [round(row[5], 3) for row in board] == [300.0, 450.0] and
+                    history.leaderboard(1000, accuracy = 0.1)[0][0] == "Idle" and
+                    history.personal_best("Idle", 1000) == [])
+    history.close()
+
+    # with a fixed gap the configurations follow each other with no time
+    # lost beyond the blank and the player's time
+    simulation = Simulation(FixedLatencyPlayer(0.25), TextView())
+    simulation.game.schedule = TrialScheduler(1.0, 0.0, 0.0)
+    simulation.play(10, 1000, seed = 17)
+    passed &= check("configurations are shown at the rate the gap allows",
+                    "Trials per minute\t\t48.0" in simulation.view.statistics)
+
+    # by default the gap before each configuration is jittered, so the
+    # player cannot tell when the next one will appear
+    simulation = Simulation(FixedLatencyPlayer(0.25))
+    simulation.game.recorder = GameRecorder(None)
+    simulation.play(10, 1000, seed = 17)
+    flips = [trial[1] for trial in GameLog(bytes(simulation.game.recorder.data)).trials]
+    gaps = set(later - earlier for earlier, later in zip(flips, flips[1:]))
+    passed &= check("the default gap between configurations varies",
+                    len(gaps) > 1 and min(gaps) >= 1250 * CNS_PER_MS and
+                    max(gaps) <= 1750 * CNS_PER_MS)
+
+    # the fixation frame is shown after the blank and the configuration after
+    # the fixation, each lengthened by at most its jitter
+    simulation = Simulation(FixedLatencyPlayer(0.25))
+    game = simulation.game
+    game.schedule = TrialScheduler(0.5, 0.2, 0.3, 0.1)
+    game.start_game(2, 1000, 0, 18)
+    simulation.buttons.press(CSTARTBUTTON, 1000)
+    simulation.clock.advance_to(1000)
+    game.update(simulation.clock.now)
+    frames = []
+    times = []
+    while game.state != CSTATE_AWAITING:
+        simulation.clock.advance_to(game.next_update(simulation.clock.now))
+        game.update(simulation.clock.now)
+        frames.append([board.output_port.value for board in simulation.boards])
+        times.append(simulation.clock.now - 1000)
+    passed &= check("fixation frame is shown between the blank and the configuration",
+                    frames == [list(CFIXATION_FRAME), list(game.pattern(1).frame)] and
+                    0.5 * CNS_PER_SECOND <= times[0] <= 0.8 * CNS_PER_SECOND and
+                    0.2 * CNS_PER_SECOND <= times[1] - times[0] <= 0.3 * CNS_PER_SECOND and
+                    game.starttime == simulation.clock.now)
+    simulation = Simulation(FixedLatencyPlayer(0.25))
+    simulation.game.schedule = TrialScheduler(0.5, 0.0, 0.3)
+    simulation.game.recorder = GameRecorder(None)
+    simulation.play(20, 1000, seed = 19)
+    flips = [trial[1] for trial in GameLog(bytes(simulation.game.recorder.data)).trials]
+    gaps = [(later - earlier) / CNS_PER_SECOND - 0.75 for earlier, later in zip(flips, flips[1:])]
+    passed &= check("the blank is jittered",
+                    min(gaps) >= 0 and max(gaps) <= 0.3 and len(set(gaps)) == len(gaps))
+
+    # the calibration measures the latency injected into simulated boards,
+    # and the correction is taken off the reaction times (also on replay)
+    clock = VirtualClock()
+    calibration = simulated_calibrator(clock, SimulatedButtons(clock), seed = 20,
+                                       read_time = 0.0002, listener_time = 0.0).calibrate(50)
+    passed &= check("calibration measures the system latency",
+                    len(calibration.samples) == 50 and calibration.missed == 0 and
+                    abs(calibration.correction() - 0.2) < 1e-6 and
+                    abs(calibration.stats.maximum - 0.2) < 1e-6)
+    clock = VirtualClock()
+    calibration = simulated_calibrator(clock, SimulatedButtons(clock), seed = 20).calibrate(200)
+    passed &= check("calibration reports the latency distribution",
+                    calibration.stats.minimum >= 0.08 and calibration.stats.maximum <= 1.08 and
+                    calibration.percentile(10) < calibration.correction() < calibration.percentile(90))
+    simulation = Simulation(FixedLatencyPlayer(0.25), TextView())
+    simulation.game.recorder = GameRecorder(None)
+    simulation.game.latency_correction = 0.5
+    game = simulation.play(10, 1000, seed = 21)
+    replayed = Simulation(FixedLatencyPlayer(0.3), TextView())
+    replay(GameLog(bytes(simulation.game.recorder.data)), replayed.game)
+    passed &= check("latency correction is taken off reaction times",
+                    list(game.results.player_time) == [249.5] * 10 and
+                    replayed.view.results == simulation.view.results)
+
+    # spectators are sent every event of the game, and a spectator who never
+    # reads only misses events itself without holding up the game
+    feed = SpectatorFeed("127.0.0.1", 0)
+    feed.start()
+    watcher = watch_feed(feed)
+    stalled = watch_feed(feed)
+    stalled.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    started = perf_counter()
+    while len(feed.clients) < 2 and perf_counter() - started < 5:
+        sleep(0.01)
+    simulation = Simulation(FixedLatencyPlayer(0.25))
+    simulation.game.feed = feed
+    game = simulation.play(10, 1000, seed = 22)
+    events = read_feed(watcher, "end")
+    passed &= check("spectators are sent the game as it is played",
+                    [event["kind"] for event in events] ==
+                    ["start"] + ["trial", "answer", "stats"] * 10 + ["stats", "end"] and
+                    [event["frame"] for event in events if event["kind"] == "trial"] ==
+                    [list(game.pattern(config).frame) for config in range(1, 11)] and
+                    events[-2]["correct"] == 10 and events[-2]["average"] == 250.0 and
+                    events[0]["columns"] == 4 and events[0]["segments"] == [8])
+    started = perf_counter()
+    for number in range(0, 2000):
+        feed.publish("stats", {"padding" : "x" * 10000})
+    publish_time = perf_counter() - started
+    sleep(0.5)
+    passed &= check("a slow spectator misses events without holding up the game",
+                    publish_time < 0.5 and len(feed.pending) <= feed.pending.maxlen and
+                    max(client.dropped for client in list(feed.clients)) > 0)
+    watcher.close()
+    stalled.close()
+    feed.stop()
+
+    # the geometry is sent to the spectators so columns made from several
+    # boards are drawn as one column each
+    simulation = Simulation(FixedLatencyPlayer(0.25), geometry = BoardGeometry(8, 16))
+    simulation.game.feed = CollectingFeed()
+    game = simulation.play(2, 1000, seed = 22)
+    kinds = dict(simulation.game.feed.events)
+    passed &= check("spectators are sent the geometry of the columns",
+                    kinds["start"]["columns"] == 4 and kinds["start"]["segments"] == [8, 8] and
+                    len(kinds["trial"]["frame"]) == 8)
+
+    # presses from the keyboard and the input socket reach the one queue
+    # timestamped where they were made, and sources can be removed and added
+    # whilst the queue is in use
+    inputs = InputMultiplexer()
+    window = SimulatedWindow()
+    inputs.add("keyboard", KeyboardInput(window))
+    inputs.add("socket", SocketInput(port = 0))
+    window.press("s", 1000)
+    sleep(0.05)
+    window.press("3", 1010)
+    window.press("2", 1020, "Entry")
+    window.press("space", 1025, "TButton")
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sender.sendto(b"2 12345\nstop", (CINPUTHOST, inputs.sources["socket"].port))
+    buttons = CGAME_BUTTONS
+    pressed = [inputs.wait(buttons, perf_counter_ns() + CNS_PER_SECOND) for number in range(0, 4)]
+    passed &= check("presses from every input are timestamped at the source",
+                    None not in pressed and
+                    [event.button for event in pressed] ==
+                    [CSTARTBUTTON, CLEDCOL_BUTTONS[2], CLEDCOL_BUTTONS[1], CSTOPBUTTON] and
+                    pressed[1].timestamp - pressed[0].timestamp == 10 * CNS_PER_MS and
+                    pressed[2].timestamp == 12345 and
+                    inputs.poll(buttons) is None)
+    removed = inputs.sources["socket"]
+    inputs.remove("socket")
+    window.press("x", 1030)
+    inputs.add("socket", SocketInput(port = 0))
+    sender.sendto(b"start", (CINPUTHOST, inputs.sources["socket"].port))
+    pressed = [inputs.wait(buttons, perf_counter_ns() + CNS_PER_SECOND) for number in range(0, 2)]
+    sender.close()
+    inputs.close()
+    window.press("s", 1040)
+    passed &= check("inputs can be removed and added whilst in use",
+                    None not in pressed and
+                    [event.button for event in pressed] == [CSTOPBUTTON, CSTARTBUTTON] and
+                    not removed.thread.is_alive() and inputs.names() == [] and
+                    inputs.poll(buttons) is None)
+
+    # a pattern is one integer, a byte for each board, which is drawn as it
+    # is and from which the counts and the correct column are worked out
+    patterns = PatternGenerator(28).generate_batch(200)
+    boards = [SimulatedBoard() for board in range(0, 4)]
+    leds = LEDBoards(4, boards)
+    drawn = True
+    for pattern in patterns:
+        leds.write_bits(pattern.bits)
+        drawn &= (pack_frame(board.output_port.value for board in boards) == pattern.bits and
+                  Pattern.from_frame(pattern.frame) == pattern)
+    passed &= check("patterns are held and drawn as one 32 bit integer",
+                    drawn and all(pattern.bits < (1 << 32) for pattern in patterns) and
+                    Pattern(0x01030F07, 4, 8).LEDs_in_column == [3, 4, 2, 1] and
+                    Pattern(0x01030F07, 4, 8).correct_column == 2 and
+                    unpack_frame(0x01030F07) == bytes([7, 15, 3, 1]))
+
+    # patterns for columns made from several boards light a different number
+    # of LEDs in each column, and the animations and fixation frame follow
+    # the columns
+    geometry = BoardGeometry(8, 16)
+    patterns = PatternGenerator(23, geometry).generate_batch(500)
+    valid = True
+    for pattern in patterns:
+        columns = [pattern.frame[column * 2] | pattern.frame[column * 2 + 1] << CLEDSPERBOARD
+                   for column in range(0, 4)]
+        valid &= (len(pattern.frame) == 8 and len(set(pattern.LEDs_in_column)) == 4 and
+                  [bin(value).count("1") for value in columns] == pattern.LEDs_in_column and
+                  pattern.LEDs_in_column[pattern.correct_column - 1] == max(pattern.LEDs_in_column))
+    passed &= check("patterns fill columns taller than a board",
+                    valid and max(max(pattern.LEDs_in_column) for pattern in patterns) == 16 and
+                    any(pattern.frame[1] for pattern in patterns) and
+                    compile_animations(geometry)[CATTRACT_ANIMATION].frames[0] ==
+                    (0, 0xFF, 0, 0xFF, 0, 0, 0, 0) and
+                    geometry.fixation_frame() == (0, 0x80) * 4)
+
+    # a game on 8 boards has 8 columns, all of which can be chosen, and is
+    # recorded and replayed on the same geometry
+    geometry = BoardGeometry(8, 8)
+    simulation = Simulation(ErrorPronePlayer(0.5, 0.2, 0.3, seed = 24), TextView(), geometry = geometry)
+    simulation.game.recorder = GameRecorder(None)
+    game = simulation.play(40, 1500, seed = 25)
+    log = GameLog(bytes(simulation.game.recorder.data))
+    replayed = Simulation(FixedLatencyPlayer(0.3), TextView(), geometry = log.geometry)
+    replay(log, replayed.game)
+    rows = list(game.results.rows())
+    passed &= check("a game is played on 8 boards",
+                    len(rows) == 40 and len(game.pattern(1).frame) == 8 and
+                    max(row[0] for row in rows) > 4 and max(row[1] for row in rows) > 4 and
+                    game.results.correct_count + game.results.wrong_count == 40)
+    passed &= check("a game on 8 boards replays the same",
+                    log.geometry.numboards == 8 and log.patterns == game.patterns[:40] and
+                    replayed.view.results == simulation.view.results)
+
+    # a game played in its own process displays everything in the GUI's
+    # view and takes presses sent by the GUI
+    from ledbenchmarkv1p0p0 import jitter_game
+    from ledgameprocessv1p0p0 import GameProcess
+    view = TextView()
+    process = GameProcess(view, jitter_game)
+    process.start_game(3, 1000, perf_counter_ns(), 26)
+    while process.running():
+        sleep(0.01)
+        process.update(perf_counter_ns())
+    finished = process.fetch("jitter")
+    results = view.results
+    process.start_game(0, 1000, perf_counter_ns(), 27)
+    sleep(1.2)
+    process.post(ButtonEvent(CSTOPBUTTON, perf_counter_ns()))
+    while process.running():
+        sleep(0.01)
+        process.update(perf_counter_ns())
+    count = process.fetch("count")
+    process.close()
+    passed &= check("a game is played in its own process",
+                    len(finished["response"]) == 3 and "Game finished" in view.status and
+                    results.count("\tY\t") == 3 and "Game stopped" in view.status and
+                    count == 1 and not process.process.is_alive())
+
+    # in a head to head game the first correct press wins, by the time
+    # between the two presses, however close they are
+    game = DuelSimulation((FixedLatencyPlayer(0.25), FixedLatencyPlayer(0.3)), TextView()).play(20, 1000, 28)
+    passed &= check("the first correct press wins a head to head",
+                    game.wins == [20, 0] and game.ties == 0 and game.margins.count == 20 and
+                    round(game.margins.mean, 6) == 50.0 and
+                    list(game.player_results[1].player_time) == [300.0] * 20 and
+                    "Player 1 wins by 50.0 ms" in game.view.status)
+    game = DuelSimulation((FixedLatencyPlayer(0.2502), FixedLatencyPlayer(0.25)),
+                          uncertainty = 50000).play(20, 1000, 29)
+    close = game.wins == [0, 20] and round(game.margins.maximum, 3) == 0.2
+    game = DuelSimulation((FixedLatencyPlayer(0.2502), FixedLatencyPlayer(0.25)),
+                          uncertainty = 500000).play(20, 1000, 29)
+    passed &= check("presses within their uncertainty are a tie",
+                    close and game.ties == 20 and game.wins == [0, 0] and
+                    all(duel.tie and duel.winner == 0 for duel in game.duels))
+
+    # a wrong press locks a player out of the configuration, and a player
+    # who is alone in being correct wins with no margin
+    simulation = DuelSimulation((FixedLatencyPlayer(0.3), FixedLatencyPlayer(0.5)), TextView())
+    game = simulation.game
+    game.start_game(2, 1000, simulation.clock.now, 30)
+    simulation.buttons.press(CSTARTBUTTON, simulation.clock.now)
+    while game.state != CSTATE_AWAITING:
+        simulation.advance()
+    correct = game.pattern(1).correct_column
+    player2 = game.players_buttons[1]
+    simulation.buttons.press(player2[correct % 4], game.starttime + 100 * CNS_PER_MS)
+    simulation.buttons.press(player2[correct - 1], game.starttime + 150 * CNS_PER_MS)
+    simulation.buttons.press(game.players_buttons[0][correct - 1], game.starttime + 300 * CNS_PER_MS)
+    while game.count == 1 or game.state != CSTATE_AWAITING:
+        simulation.advance()
+    shown = game.starttime
+    simulation.buttons.press(game.players_buttons[0][game.pattern(2).correct_column - 1],
+                             shown + 200 * CNS_PER_MS)
+    while game.running():
+        simulation.advance()
+    first, second = game.duels
+    passed &= check("a wrong press locks a player out of a head to head",
+                    first.winner == 1 and first.margin is None and first.answers[1] == correct % 4 + 1 and
+                    first.times[1] == 100.0 and game.player_results[1].wrong_count == 1 and
+                    second.winner == 1 and second.answers == (game.pattern(2).correct_column, 0) and
+                    game.player_results[1].timeout_count == 1 and
+                    simulation.clock.now == shown + 1000 * CNS_PER_MS)
+
+    # a polled button is timestamped within half the polling interval of
+    # the press, which is taken once however long it is held
+    port = SimulatedPort()
+    polled = PolledButtonInput(mapping = {2 : 2, 9 : 3}, port = port)
+    sleep(0.01)
+    pressed = perf_counter_ns()
+    port.value = 1 << 3
+    released = perf_counter_ns()
+    event = polled.wait((9,), perf_counter_ns() + CNS_PER_SECOND)
+    sleep(0.01)
+    port.value = 0
+    sleep(0.01)
+    port.value = 1 << 2
+    second = polled.wait((2,), perf_counter_ns() + CNS_PER_SECOND)
+    polled.close()
+    passed &= check("polled buttons are timestamped to within their uncertainty",
+                    event is not None and second is not None and polled.events.empty() and
+                    0 < event.uncertainty < 50 * CNS_PER_MS and
+                    event.timestamp - event.uncertainty <= released and
+                    event.timestamp + event.uncertainty >= pressed)
+
+    # a game of 0 configurations is played until STOP is pressed
+    game = Simulation(FixedLatencyPlayer(0.25)).play(0, 1000, seed = 16, stop_at = 300)
+    passed &= check("an endless game plays until stopped",
+                    len(game.results) == 300 and game.results.correct_count == 299)
+
+    return passed
+
+# ..................... end of function : run_checks .........
+
+#=================================================================
+# main
+#=================================================================
+
+if __name__ == "__main__":
+    command = "check"
+    if len(sys.argv) > 1:
+        command = sys.argv[1]
+    if command == "check":
+        if not run_checks():
+            sys.exit(1)
+    elif command == "play":
+        configs = CDEFAULTCONFIGS
+        speed = CDEFAULTSPEED
+        seed = None
+        if len(sys.argv) > 2:
+            configs = int(sys.argv[2])
+        if len(sys.argv) > 3:
+            speed = int(sys.argv[3])
+        if len(sys.argv) > 4:
+            seed = int(sys.argv[4])
+        simulation = Simulation(ErrorPronePlayer(0.6, 0.25, 0.1), TextView())
+        simulation.play(configs, speed, seed)
+        print(simulation.view.status.strip())
+        print(simulation.view.results)
+        print(simulation.view.statistics)
+    else:
+        print("Usage: python3 ledsimulatorv1p0p0.py check | play [configs] [speed] [seed]")
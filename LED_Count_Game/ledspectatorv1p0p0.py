@@ -0,0 +1,331 @@
+#!/usr/bin/env python
+
+#==============================================================
+#
+# Authors:      Christine Smythe and Colin Smythe (Dunelm Services Limited)
+# Version:      1.0
+# Release Date: 1st November, 2013
+#
+# Description:  This Python3 module publishes a live feed of the LED Counting
+#               Game to spectators' browsers on the local network.
+#
+#               The game publishes each change as a small event (a game
+#               starting, each configuration shown, each answer, the running
+#               statistics and the game ending).  A SpectatorFeed runs a small
+#               asyncio web server in its own thread which sends the events to
+#               every browser connected to /events as Server-Sent Events (JSON
+#               in each message), and serves a page at / which shows them.
+#
+#               Publishing never blocks the game: the event is added to a
+#               bounded queue and the server thread is woken to send it.  If
+#               the server falls behind the oldest events are dropped, and
+#               each browser has its own bounded queue so a slow browser only
+#               misses events itself - it never holds up the game or the
+#               other spectators.
+#
+#               Each frame is sent as it is written to the boards, a byte for
+#               each board.  The "start" event gives the number of columns and
+#               the LEDs on each board of a column ("segments", see
+#               BoardGeometry) so the page draws the columns of any geometry.
+#
+#               Usage:  python3 ledspectatorv1p0p0.py [port]
+#                       plays simulated games on the feed for trying it out
+#
+# History:      Original release.
+#
+# Copyright:    2013 (c) Premier Farnell Limited
+#
+# License:      GPLv3+
+#
+#==============================================================
+
+import asyncio
+import json
+import sys
+import threading
+from collections import deque
+
+#==============================================================
+# Declaration of Constants
+
+CFEEDHOST = "0.0.0.0";  # the feed is served to the whole local network
+CFEEDPORT = 8013;       # the port the feed is served on
+CQUEUESIZE = 256;       # events waiting to be sent before the oldest are dropped
+CCLIENTQUEUESIZE = 64;  # events waiting for one browser before its newest are dropped
+
+CSSE_HEADERS = (b"HTTP/1.1 200 OK\r\n"
+                b"Content-Type: text/event-stream\r\n"
+                b"Cache-Control: no-cache\r\n"
+                b"Connection: keep-alive\r\n"
+                b"Access-Control-Allow-Origin: *\r\n\r\n")
+
+CPAGE = """<!DOCTYPE html>
+<html><head><title>LED Counting Game</title>
+<style>
+body { font-family: sans-serif; background: #111; color: #eee; }
+#leds { display: flex; gap: 1em; margin: 1em 0; }
+.column { display: flex; flex-direction: column-reverse; gap: 4px; }
+.led { width: 28px; height: 28px; border-radius: 14px; background: #333; }
+.on { background: #f33; }
+#answer, #stats { font-size: 1.5em; white-space: pre; }
+</style></head>
+<body>
+<h1 id="title">LED Counting Game</h1>
+<div id="leds"></div>
+<div id="answer"></div>
+<div id="stats"></div>
+<script>
+// the columns and the LEDs on each board of a column, as sent when a game
+// starts (one PiRack until then)
+var geometry = {columns: 4, segments: [8]};
+function show(frame) {
+  var leds = document.getElementById("leds");
+  leds.innerHTML = "";
+  for (var number = 0; number < geometry.columns; number++) {
+    var column = document.createElement("div");
+    column.className = "column";
+    geometry.segments.forEach(function (size, segment) {
+      // a frame has a byte for each board, the boards of each column together
+      var value = frame ? frame[number * geometry.segments.length + segment] : 0;
+      for (var bit = 0; bit < size; bit++) {
+        var led = document.createElement("div");
+        led.className = (value >> bit) & 1 ? "led on" : "led";
+        column.appendChild(led);
+      }
+    });
+    leds.appendChild(column);
+  }
+}
+var source = new EventSource("/events");
+source.onmessage = function (message) {
+  var event = JSON.parse(message.data);
+  if (event.kind == "start") {
+    document.getElementById("title").textContent = event.player + " - " + event.speed + " ms";
+    document.getElementById("answer").textContent = "";
+    geometry = {columns: event.columns, segments: event.segments};
+    show(null);
+  } else if (event.kind == "trial") {
+    show(event.frame);
+    document.getElementById("answer").textContent = "Configuration " + event.config;
+  } else if (event.kind == "answer") {
+    document.getElementById("answer").textContent = "Configuration " + event.config + ": " +
+      (event.answer == 0 ? "Timeout" : (event.correct ? "Correct " : "Wrong ") +
+       (event.time / 1000).toFixed(3) + " s");
+  } else if (event.kind == "stats") {
+    document.getElementById("stats").textContent = "Correct " + event.correct +
+      "  Wrong " + event.wrong + "  Timeout " + event.timeout +
+      "  Average " + (event.average / 1000).toFixed(3) + " s";
+  } else if (event.kind == "end") {
+    show(null);
+    document.getElementById("answer").textContent = event.stopped ? "Game stopped" : "Game finished";
+  }
+};
+</script>
+</body></html>
+"""
+
+#==============================================================
+
+class SpectatorClient(object):
+    """ One browser connected to the feed and the events waiting for it. """
+
+    def __init__(self, size):
+        self.queue = asyncio.Queue(size)
+        # the number of events this browser missed because it was too slow
+        self.dropped = 0
+
+#==============================================================
+
+class SpectatorFeed(object):
+    """ Publishes game events to browsers from its own thread. """
+
+    def __init__(self, host = CFEEDHOST, port = CFEEDPORT, size = CQUEUESIZE,
+                 client_size = CCLIENTQUEUESIZE):
+        self.host = host
+        self.port = port
+        self.client_size = client_size
+        # the events published but not yet sent to the browsers.  Appending
+        # to a deque is thread safe and drops the oldest event when it is full
+        self.pending = deque(maxlen = size)
+        self.wake_pending = False
+        # the latest event of each kind, sent to a browser when it connects
+        self.latest = {}
+        self.clients = set()
+        self.loop = None
+        self.server = None
+        self.thread = None
+        self.ready = threading.Event()
+        self.error = None
+
+    #.................... Method: start ................
+    # This method starts the server in its own thread and returns once it is
+    # listening.  If port 0 was given the port chosen is put in self.port.
+    # It raises OSError if the server cannot listen on the port.
+    #
+    def start(self):
+        self.error = None
+        self.thread = threading.Thread(target = self.run, name = "spectator feed", daemon = True)
+        self.thread.start()
+        self.ready.wait()
+        if self.error is not None:
+            raise self.error
+
+    # ................. end of method: start .................
+
+    #.................... Method: run ................
+    # This method runs the server's event loop (in the feed's thread)
+    #
+    def run(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            self.server = loop.run_until_complete(
+                asyncio.start_server(self.serve, self.host, self.port))
+        except OSError as error:
+            self.error = error
+            loop.close()
+            self.ready.set()
+            return
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.loop = loop
+        self.ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            # close the server and every browser's connection
+            self.server.close()
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions = True))
+            loop.close()
+
+    # ................. end of method: run .................
+
+    #.................... Method: stop ................
+    # This method stops the server (it may be called from any thread)
+    #
+    def stop(self):
+        loop = self.loop
+        if loop is not None:
+            # nothing more is published once the loop is stopping
+            self.loop = None
+            loop.call_soon_threadsafe(loop.stop)
+            self.thread.join()
+
+    # ................. end of method: stop .................
+
+    #.................... Method: publish ................
+    # This method publishes an event to the spectators.  It never blocks, so
+    # it may be called from the game at any time.
+    # It is passed
+    #   - kind : the kind of event ("start", "trial", "answer", "stats", "end")
+    #   - fields : a dictionary of the event's details (not changed after)
+    #
+    def publish(self, kind, fields):
+        loop = self.loop
+        if loop is None:
+            return
+        self.pending.append((kind, fields))
+        if not self.wake_pending:
+            self.wake_pending = True
+            try:
+                loop.call_soon_threadsafe(self.send_pending)
+            except RuntimeError:
+                # the feed was stopped meanwhile
+                pass
+
+    # ................. end of method: publish .................
+
+    #.................... Method: send_pending ................
+    # This method (in the feed's thread) hands the events published to each
+    # browser's queue, dropping them for any browser whose queue is full
+    #
+    def send_pending(self):
+        self.wake_pending = False
+        pending = self.pending
+        while pending:
+            kind, fields = pending.popleft()
+            event = dict(fields)
+            event["kind"] = kind
+            message = ("data: " + json.dumps(event) + "\n\n").encode("utf-8")
+            self.latest[kind] = message
+            for client in self.clients:
+                try:
+                    client.queue.put_nowait(message)
+                except asyncio.QueueFull:
+                    client.dropped = client.dropped + 1
+
+    # ................. end of method: send_pending .................
+
+    #.................... Method: serve ................
+    # This coroutine answers one connection: the page, or the event stream
+    # which is kept open until the browser goes away
+    #
+    async def serve(self, reader, writer):
+        try:
+            request = await reader.readline()
+            while (await reader.readline()).strip():
+                pass
+            parts = request.split()
+            path = parts[1].decode("latin-1") if len(parts) > 1 else "/"
+            if path == "/events":
+                await self.stream(writer)
+            elif path == "/":
+                page = CPAGE.encode("utf-8")
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/html; charset=utf-8\r\n"
+                             b"Content-Length: " + str(len(page)).encode("ascii") +
+                             b"\r\nConnection: close\r\n\r\n" + page)
+                await writer.drain()
+            else:
+                writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            # the browser went away or the feed is stopping
+            pass
+        finally:
+            writer.close()
+
+    # ................. end of method: serve .................
+
+    #.................... Method: stream ................
+    # This coroutine sends the events to one browser as they are published,
+    # starting with the latest game, configuration and statistics
+    #
+    async def stream(self, writer):
+        client = SpectatorClient(self.client_size)
+        writer.write(CSSE_HEADERS)
+        for kind in ("start", "trial", "answer", "stats", "end"):
+            if kind in self.latest:
+                writer.write(self.latest[kind])
+        self.clients.add(client)
+        try:
+            while True:
+                await writer.drain()
+                writer.write(await client.queue.get())
+        finally:
+            self.clients.discard(client)
+
+    # ................. end of method: stream .................
+
+#=================================================================
+# main
+#=================================================================
+
+if __name__ == "__main__":
+    from ledsimulatorv1p0p0 import Simulation, ErrorPronePlayer, PacedClock
+    port = CFEEDPORT
+    if len(sys.argv) > 1:
+        port = int(sys.argv[1])
+    feed = SpectatorFeed(port = port)
+    feed.start()
+    print("Spectator feed on http://localhost:" + str(feed.port) + "/ - Ctrl-C to stop")
+    try:
+        while True:
+            # the simulated game is played in real time so it can be watched
+            simulation = Simulation(ErrorPronePlayer(0.6, 0.2, 0.1), clock = PacedClock())
+            simulation.game.feed = feed
+            simulation.play(10, 2000)
+    except KeyboardInterrupt:
+        pass
+    feed.stop()
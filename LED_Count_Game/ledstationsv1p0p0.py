@@ -0,0 +1,279 @@
+#!/usr/bin/env python
+
+#==============================================================
+#
+# Authors:      Christine Smythe and Colin Smythe (Dunelm Services Limited)
+# Version:      1.0
+# Release Date: 1st November, 2013
+#
+# Description:  This Python3 program runs several LED Counting Game stations
+#               from one R-Pi, e.g. at events.
+#
+#               A station is one game board: its set of PiFace boards, the
+#               board and inputs its buttons are wired to, its own game (and
+#               so its own results) and its own timing.  Each station waits
+#               in the attract animation for its player to press start, and
+#               starts again a short time after each game ends.
+#
+#               All of the stations are run by one StationScheduler so all of
+#               the board writes are made from one thread and never contend
+#               for the SPI bus.  Each pass the scheduler updates every station
+#               (a station with nothing to do returns straight away), starting
+#               with a different station each time so that none is always
+#               served first, and then sleeps until the next station is due
+#               or a button is pressed.  Each station is
+#               timed from its own frame flips and button interrupts, so its
+#               timing does not depend on how many other stations there are.
+#               The lateness of every frame flip is kept for each station.
+#
+#               The benchmark of the scheduler with 1 to 16 stations is in
+#               ledbenchmarkv1p0p0.py.
+#
+#               Usage:  python3 ledstationsv1p0p0.py [configs] [speed]
+#                       runs the stations in CSTATIONS until Ctrl-C is pressed
+#
+# History:      Original release.
+#
+# Copyright:    2013 (c) Premier Farnell Limited
+#
+# License:      GPLv3+
+#
+#==============================================================
+
+import sys
+import threading
+from collections import namedtuple
+from time import perf_counter_ns
+from ledboardsv1p0p0 import LEDBoards, BoardGeometry, CGEOMETRY, CNS_PER_SECOND, CNS_PER_MS
+from ledinputv1p0p0 import ButtonInput
+from ledgameenginev1p0p0 import GameEngine, game_buttons, CSTATE_ARMED, CSTATE_AWAITING
+from ledresultsv1p0p0 import RunningStats
+from ledcalibratev1p0p0 import calibration_key, load_correction
+
+#==============================================================
+# Declaration of Constants
+
+CDEFAULTCONFIGS = 10;   # number of configurations in each game
+CDEFAULTSPEED = 5000;   # speed (ms) of each game
+CRESTARTTIME = 5.0;     # seconds the results are left showing before the next game
+CPOLLTIME = 0.01;       # most seconds between passes of the scheduler
+
+# a station: its name, the SPI chip select and hardware addresses of its
+# boards, the board (address) its buttons are wired to and a mapping of game
+# button to input number (None if button n is wired to input n)
+StationConfig = namedtuple("StationConfig", "name chip_select boards button_board buttons")
+
+# a PiRack holds 4 boards on each of the two chip selects
+CSTATIONS = [StationConfig("Station 1", 0, (0, 1, 2, 3), 0, None),
+             StationConfig("Station 2", 1, (0, 1, 2, 3), 0, None)]
+
+#==============================================================
+
+class StationView(object):
+    """ A view which prints what a station's game displays. """
+
+    def __init__(self, name):
+        self.name = name
+
+    def show_status(self, row, status):
+        if status.strip():
+            print(self.name + ": " + status.strip())
+
+    def show_statistics(self, stats):
+        pass
+
+    def show_results(self, results):
+        if results.strip():
+            print(self.name + ":\n" + results)
+
+    def show_result(self, configno, correct_column, player_answer, player_time, speed):
+        pass
+
+#==============================================================
+
+class Station(object):
+    """ One LED Counting Game station: its boards, buttons, game and timing. """
+
+    def __init__(self, name, leds, buttons, view, history = None,
+                 configs = CDEFAULTCONFIGS, speed = CDEFAULTSPEED, geometry = CGEOMETRY):
+        self.name = name
+        self.leds = leds
+        self.buttons = buttons
+        self.game = GameEngine(leds, buttons, view, history, geometry)
+        self.configs = configs
+        self.speed = speed
+        # when the next game may be started
+        self.restart = 0
+        # how late (ns) each configuration was shown after it was due
+        self.lateness = RunningStats()
+
+    #.................... Method: next_update ................
+    # This method returns the time (ns) at which the station next needs to be
+    # updated if no button is pressed before then.
+    #
+    def next_update(self, now):
+        if self.game.running():
+            return self.game.next_update(now)
+        return self.restart
+
+    # ................. end of method: next_update .................
+
+    #.................... Method: service ................
+    # This method updates the station's game, starting a new game if the
+    # last one finished long enough ago.
+    # It is passed now = the current time (ns)
+    #
+    def service(self, now):
+        game = self.game
+        if not game.running():
+            if now < self.restart:
+                return
+            game.start_game(self.configs, self.speed, now, player = self.name)
+        due = None
+        if game.state == CSTATE_ARMED:
+            due = game.timeout
+        game.update(now)
+        if due is not None and game.state == CSTATE_AWAITING:
+            self.lateness.add(game.starttime - due)
+        if not game.running():
+            self.restart = now + int(CRESTARTTIME * CNS_PER_SECOND)
+
+    # ................. end of method: service .................
+
+#==============================================================
+
+class StationScheduler(object):
+    """ Runs several stations fairly from one thread. """
+
+    def __init__(self, stations, clock = perf_counter_ns):
+        self.stations = list(stations)
+        self.clock = clock
+        # the station served first in the next pass
+        self.first = 0
+        self.running = False
+        # set when a button is pressed on any station
+        self.wakeup = threading.Event()
+        for station in self.stations:
+            if hasattr(station.buttons, "on_press"):
+                station.buttons.on_press = self.button_pressed
+
+    #.................... Method: button_pressed ................
+    # This method is called (in the button listener's thread) when a button
+    # is pressed on any station, so the scheduler wakes straight away
+    #
+    def button_pressed(self, event):
+        self.wakeup.set()
+
+    # ................. end of method: button_pressed .................
+
+    #.................... Method: service ................
+    # This method makes one pass over the stations, updating each of them.
+    # Each station is given the time just before it is updated.
+    #
+    def service(self):
+        stations = self.stations
+        numstations = len(stations)
+        for turn in range(0, numstations):
+            stations[(self.first + turn) % numstations].service(self.clock())
+        self.first = (self.first + 1) % numstations
+
+    # ................. end of method: service .................
+
+    #.................... Method: next_update ................
+    # This method returns the time (ns) by which the next pass must be made
+    #
+    def next_update(self, now):
+        deadline = now + int(CPOLLTIME * CNS_PER_SECOND)
+        for station in self.stations:
+            due = station.next_update(now)
+            if due is not None and due < deadline:
+                deadline = due
+        return deadline
+
+    # ................. end of method: next_update .................
+
+    #.................... Method: run ................
+    # This method runs the stations until stop() is called or, if given,
+    # until the time (ns) 'until'
+    #
+    def run(self, until = None):
+        self.running = True
+        while self.running:
+            now = self.clock()
+            if until is not None and now >= until:
+                break
+            self.wakeup.clear()
+            self.service()
+            wait = self.next_update(self.clock()) - self.clock()
+            if wait > 0:
+                self.wakeup.wait(wait / CNS_PER_SECOND)
+        self.running = False
+
+    # ................. end of method: run .................
+
+    #.................... Method: stop ................
+    # This method stops run() (it may be called from any thread)
+    #
+    def stop(self):
+        self.running = False
+        self.wakeup.set()
+
+    # ................. end of method: stop .................
+
+#=================================================================
+
+#.................... Function: build_station ................
+# This function sets up the boards and buttons of a station on the PiRack.
+# It is passed
+#   - config : the StationConfig of the station
+#   - history : the GameHistory the games are saved in, if any
+#   - configs, speed : the number of configurations and speed of each game
+# It returns the Station
+#
+def build_station(config, history = None, configs = CDEFAULTCONFIGS, speed = CDEFAULTSPEED):
+    import pifacedigitalio as pfio
+    boards = [pfio.PiFaceDigital(hardware_addr = board, chip_select = config.chip_select,
+                                 init_board = False) for board in config.boards]
+    leds = LEDBoards(len(boards), boards)
+    # a column of 8 LEDs on each of the station's boards
+    geometry = BoardGeometry(len(boards))
+    buttons = ButtonInput(config.button_board, game_buttons(geometry.columns), config.chip_select,
+                          config.buttons)
+    station = Station(config.name, leds, buttons, StationView(config.name), history, configs, speed,
+                      geometry)
+    # the latency found by calibrating this station's boards
+    station.game.latency_correction = load_correction(
+        calibration_key("piface", config.chip_select, len(boards)))
+    return station
+
+# ..................... end of function : build_station .........
+
+#=================================================================
+# main
+#=================================================================
+
+if __name__ == "__main__":
+    import pifacedigitalio as pfio
+    from ledhistoryv1p0p0 import GameHistory
+    configs = CDEFAULTCONFIGS
+    speed = CDEFAULTSPEED
+    if len(sys.argv) > 1:
+        configs = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        speed = int(sys.argv[2])
+    # initialise the boards on each chip select used
+    for chip_select in sorted(set(config.chip_select for config in CSTATIONS)):
+        pfio.init(True, 0, chip_select)
+    history = GameHistory()
+    stations = [build_station(config, history, configs, speed) for config in CSTATIONS]
+    scheduler = StationScheduler(stations)
+    try:
+        scheduler.run()
+    except KeyboardInterrupt:
+        pass
+    for station in stations:
+        station.leds.all_off()
+        station.buttons.close()
+        print(station.name + ": configurations shown %.3f ms late on average (worst %.3f ms)"
+              % (station.lateness.mean / CNS_PER_MS, (station.lateness.maximum or 0) / CNS_PER_MS))
+    history.close()
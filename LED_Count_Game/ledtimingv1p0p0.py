@@ -0,0 +1,305 @@
+#!/usr/bin/env python
+
+#==============================================================
+#
+# Authors:      Christine Smythe and Colin Smythe (Dunelm Services Limited)
+# Version:      1.0
+# Release Date: 1st November, 2013
+#
+# Description:  This Python3 program times the hot paths of the LED Counting
+#               Game loop (as run by ledcountgamev1p0p0.py) whilst whole games
+#               are played in real time by a simulated player:
+#
+#               frame      - flipping a configuration onto the LEDs
+#               blank      - turning all the LEDs off
+#               poll       - polling the buttons
+#               pattern    - looking up (and generating) the next pattern
+#               results    - recording and showing each answer
+#               statistics - working out and showing the statistics
+#               report     - showing the results at the end of the game
+#
+#               For each path it reports the calls per trial and the
+#               percentiles of the time each call took, and for the game it
+#               reports the board (SPI) writes and the CPU time per trial and
+#               how late the loop woke up after each timer (the overshoot).
+#               The measurements are written as JSON so that those of two
+#               versions of the game can be compared.
+#
+#               The game can be played on simulated boards (which take as long
+#               to write as the SPI bus) or on the PiRack, where the PiFace
+#               buttons are polled as well and a real press is used in place
+#               of the simulated player's.
+#
+#               Usage:  python3 ledtimingv1p0p0.py [simulated|piface] [configs] [file]
+#                           times a game and writes the JSON to the file (or
+#                           prints it if no file is given);
+#                       python3 ledtimingv1p0p0.py compare old.json new.json
+#                           prints the change in each measurement and exits
+#                           with 1 if any became more than CREGRESSION slower.
+#
+# History:      Original release.
+#
+# Copyright:    2013 (c) Premier Farnell Limited
+#
+# License:      GPLv3+
+#
+#==============================================================
+
+from bisect import bisect
+import json
+import platform
+import sys
+from time import perf_counter_ns, process_time_ns, sleep
+from ledboardsv1p0p0 import LEDBoards, CNUMBOARDS, CNS_PER_SECOND, CNS_PER_MS
+from ledbenchmarkv1p0p0 import RealClock, SlowBoard, PlayerButtons, CSPIWRITETIME, CSEED
+from ledgameenginev1p0p0 import GameEngine, CGAME_BUTTONS
+from ledsimulatorv1p0p0 import FixedLatencyPlayer, NullView
+from ledtrialsv1p0p0 import TrialScheduler
+
+#==============================================================
+# Declaration of Constants
+
+CTIMINGVERSION = 1;     # the version of the JSON written
+CDEFAULTCONFIGS = 20;   # configurations played by default
+CTIMINGSPEED = 1000;    # speed (ms) of the game
+CTIMINGLATENCY = 0.3;   # seconds the simulated player takes to answer
+CTIMINGBLANK = 0.2;     # seconds the LEDs are blank between configurations
+CFRAMETIME = 10;        # most ms between updates, as in ledcountgamev1p0p0.py
+CPERCENTILES = (50, 90, 99);
+# the upper edges (us) of the bins of the overshoot histogram
+COVERSHOOTBINS = (50, 100, 200, 500, 1000, 2000, 5000);
+CREGRESSION = 0.2;      # the fractional slow down reported as a regression
+
+# the hot paths: the name reported and the game engine method timed
+CPATHS = (("frame", "show_config"), ("blank", "turnall_off"), ("poll", "poll_buttons"),
+          ("pattern", "generate_random_LEDs"), ("results", "process_config"),
+          ("statistics", "calculate_statistics"), ("report", "calculate_results"));
+
+#==============================================================
+
+#.................... Function: percentile ................
+# This function returns a percentile of some sorted samples, interpolating
+# between the nearest two (0 if there are none)
+#
+def percentile(samples, percent):
+    if not samples:
+        return 0
+    position = (len(samples) - 1) * percent / 100.0
+    below = int(position)
+    above = min(below + 1, len(samples) - 1)
+    return samples[below] + (position - below) * (samples[above] - samples[below])
+
+# ..................... end of function : percentile .........
+
+#.................... Function: distribution ................
+# This function returns the count, mean, percentiles and maximum (us) of
+# some times (ns) as a dictionary
+#
+def distribution(times):
+    times = sorted(times)
+    summary = {"count" : len(times), "mean_us" : 0.0, "max_us" : 0.0}
+    if times:
+        summary["mean_us"] = sum(times) / len(times) / 1000.0
+        summary["max_us"] = times[-1] / 1000.0
+    for percent in CPERCENTILES:
+        summary["p" + str(percent) + "_us"] = percentile(times, percent) / 1000.0
+    return summary
+
+# ..................... end of function : distribution .........
+
+#==============================================================
+
+class TimedGame(object):
+    """ A game whose hot paths are timed as it is played. """
+
+    def __init__(self, leds, buttons, configs, speed = CTIMINGSPEED):
+        self.leds = leds
+        self.buttons = buttons
+        self.configs = configs
+        self.speed = speed
+        self.game = GameEngine(leds, buttons, NullView())
+        self.game.schedule = TrialScheduler(CTIMINGBLANK)
+        buttons.game = self.game
+        # the times (ns) of each call of each path, and how late (ns) the
+        # loop woke after each timer
+        self.times = dict((name, []) for name, method in CPATHS)
+        self.overshoot = []
+        for name, method in CPATHS:
+            setattr(self.game, method, self.timed(name, getattr(self.game, method)))
+
+    #.................... Method: timed ................
+    # This method returns a method of the game which records how long each
+    # call takes in the times of a path
+    #
+    def timed(self, name, method):
+        times = self.times[name]
+        def timed_method(*args):
+            start = perf_counter_ns()
+            result = method(*args)
+            times.append(perf_counter_ns() - start)
+            return result
+        return timed_method
+
+    # ................. end of method: timed .................
+
+    #.................... Method: play ................
+    # This method plays the game in real time, waking when the game next
+    # needs to be updated or after CFRAMETIME ms as the GUI does.
+    # It returns the measurements as a dictionary.
+    #
+    def play(self):
+        game = self.game
+        writes = self.leds.writes
+        cpu = process_time_ns()
+        game.start_game(self.configs, self.speed, perf_counter_ns(), CSEED)
+        while game.running():
+            now = perf_counter_ns()
+            wake = now + CFRAMETIME * CNS_PER_MS
+            deadline = game.next_update(now)
+            if deadline is not None:
+                wake = min(wake, deadline)
+            if wake > now:
+                sleep((wake - now) / CNS_PER_SECOND)
+                self.overshoot.append(max(perf_counter_ns() - wake, 0))
+            game.update(perf_counter_ns())
+        cpu = process_time_ns() - cpu
+        writes = self.leds.writes - writes
+        return self.measurements(game.count, writes, cpu)
+
+    # ................. end of method: play .................
+
+    #.................... Method: measurements ................
+    # This method returns the measurements of a game of 'trials'
+    # configurations as a dictionary
+    #
+    def measurements(self, trials, writes, cpu):
+        paths = {}
+        for name, method in CPATHS:
+            paths[name] = distribution(self.times[name])
+            paths[name]["calls_per_trial"] = len(self.times[name]) / trials
+        overshoot = distribution(self.overshoot)
+        # the number of overshoots below each bin edge (and above the last)
+        histogram = [0] * (len(COVERSHOOTBINS) + 1)
+        for late in self.overshoot:
+            histogram[bisect(COVERSHOOTBINS, late / 1000.0)] += 1
+        overshoot["histogram_edges_us"] = list(COVERSHOOTBINS)
+        overshoot["histogram"] = histogram
+        return {"trials" : trials, "spi_writes_per_trial" : writes / trials,
+                "cpu_us_per_trial" : cpu / trials / 1000.0,
+                "paths" : paths, "overshoot" : overshoot}
+
+    # ................. end of method: measurements .................
+
+#==============================================================
+
+class HardwareButtons(PlayerButtons):
+    """ The PiFace buttons, with the simulated player answering if they are not pressed. """
+
+    def __init__(self, clock, player, input):
+        super(HardwareButtons, self).__init__(clock, player)
+        self.input = input
+
+    def poll(self, buttons, since = 0):
+        event = self.input.poll(buttons, since)
+        if event is not None:
+            return event
+        return super(HardwareButtons, self).poll(buttons, since)
+
+#=================================================================
+
+#.................... Function: time_game ................
+# This function plays a game on the boards chosen and returns the
+# measurements, with the details of the run, as a dictionary
+# It is passed
+#   - backend : "simulated" or "piface"
+#   - configs : the number of configurations to play
+#
+def time_game(backend, configs):
+    clock = RealClock()
+    player = FixedLatencyPlayer(CTIMINGLATENCY)
+    input = None
+    if backend == "piface":
+        import pifacedigitalio as pfio
+        from ledinputv1p0p0 import ButtonInput
+        pfio.init(True, 0, 0)
+        leds = LEDBoards(CNUMBOARDS)
+        input = ButtonInput(0, CGAME_BUTTONS)
+        buttons = HardwareButtons(clock, player, input)
+    else:
+        leds = LEDBoards(CNUMBOARDS, [SlowBoard() for board in range(0, CNUMBOARDS)])
+        buttons = PlayerButtons(clock, player)
+    try:
+        measurements = TimedGame(leds, buttons, configs).play()
+    finally:
+        leds.all_off()
+        if input is not None:
+            input.close()
+    measurements["version"] = CTIMINGVERSION
+    measurements["backend"] = backend
+    measurements["python"] = platform.python_version()
+    measurements["machine"] = platform.machine()
+    measurements["speed"] = CTIMINGSPEED
+    if backend != "piface":
+        measurements["spi_write_us"] = CSPIWRITETIME * 1e6
+    return measurements
+
+# ..................... end of function : time_game .........
+
+#.................... Function: compare ................
+# This function prints the change in the times between two sets of
+# measurements and returns the names of those more than CREGRESSION slower
+#
+def compare(old, new):
+    regressions = []
+    measures = [("cpu per trial", old["cpu_us_per_trial"], new["cpu_us_per_trial"]),
+                ("spi writes per trial", old["spi_writes_per_trial"], new["spi_writes_per_trial"])]
+    for name, method in CPATHS:
+        for percent in CPERCENTILES:
+            key = "p" + str(percent) + "_us"
+            measures.append((name + " " + key, old["paths"][name][key], new["paths"][name][key]))
+    for percent in CPERCENTILES:
+        key = "p" + str(percent) + "_us"
+        measures.append(("overshoot " + key, old["overshoot"][key], new["overshoot"][key]))
+    print("  %-26s %12s %12s %8s" % ("measurement", "old", "new", "change"))
+    for name, before, after in measures:
+        change = 0.0
+        if before > 0:
+            change = (after - before) / before
+        flag = ""
+        if change > CREGRESSION:
+            flag = "  SLOWER"
+            regressions.append(name)
+        print("  %-26s %12.3f %12.3f %+7.0f%%%s" % (name, before, after, change * 100, flag))
+    return regressions
+
+# ..................... end of function : compare .........
+
+#=================================================================
+# main
+#=================================================================
+
+if __name__ == "__main__":
+    if len(sys.argv) > 3 and sys.argv[1] == "compare":
+        with open(sys.argv[2]) as file:
+            old = json.load(file)
+        with open(sys.argv[3]) as file:
+            new = json.load(file)
+        if compare(old, new):
+            sys.exit(1)
+    else:
+        backend = "simulated"
+        configs = CDEFAULTCONFIGS
+        if len(sys.argv) > 1:
+            backend = sys.argv[1]
+        if len(sys.argv) > 2:
+            configs = int(sys.argv[2])
+        if backend not in ("simulated", "piface"):
+            print("Usage: python3 ledtimingv1p0p0.py [simulated|piface] [configs] [file]")
+            print("       python3 ledtimingv1p0p0.py compare old.json new.json")
+            sys.exit(1)
+        measurements = json.dumps(time_game(backend, configs), indent = 2, sort_keys = True)
+        if len(sys.argv) > 3:
+            with open(sys.argv[3], "w") as file:
+                file.write(measurements + "\n")
+        else:
+            print(measurements)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+
+#==============================================================
+#
+# Authors:      Christine Smythe and Colin Smythe (Dunelm Services Limited)
+# Version:      1.0
+# Release Date: 1st November, 2013
+#
+# Description:  This Python3 module schedules the gap between the
+#               configurations of the LED Counting Game.
+#
+#               Before each configuration the LEDs are blank for the blank
+#               time and then, if a fixation time is set, a fixation frame
+#               (the top LED of every column) is shown for the fixation time
+#               so the player knows where to look.  A random jitter of up to
+#               blank_jitter and fixation_jitter seconds can be added to each
+#               interval so the player cannot predict when the configuration
+#               will appear.  The jitter is drawn from a generator seeded with
+#               the game's seed so the same game always has the same timing.
+#
+#               The next configuration is composed as soon as the blank starts
+#               so nothing is left to do when it is due but flip it onto the
+#               LEDs.
+#
+#               The game's timing is read from CTIMINGFILE (if there is one)
+#               by load_schedule(), e.g.
+#                   {"blank" : 1.0, "blank_jitter" : 0.5,
+#                    "fixation" : 0.3, "fixation_jitter" : 0.1}
+#               and any value not given there takes its default, which has a
+#               jittered blank so the configurations never appear on a beat.
+#
+# History:      Original release.
+#
+# Copyright:    2013 (c) Premier Farnell Limited
+#
+# License:      GPLv3+
+#
+#==============================================================
+
+import json
+import os
+import random
+from ledboardsv1p0p0 import CGEOMETRY, CNS_PER_SECOND
+
+#==============================================================
+# Declaration of Constants
+
+CBLANKTIME = 1.0;       # seconds the LEDs are blank before each configuration
+CBLANKJITTER = 0.5;     # most seconds added at random to each blank
+CFIXATIONTIME = 0.0;    # seconds the fixation frame is shown (0 for none)
+CFIXATIONJITTER = 0.0;  # most seconds added at random to each fixation
+
+# the timing of the game is read from this file beside the game
+CTIMINGFILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "timing.json")
+
+# the fixation frame on one PiRack: the top LED (LED 7) of every column
+CFIXATION_FRAME = CGEOMETRY.fixation_frame();
+
+#==============================================================
+
+class TrialScheduler(object):
+    """ Blank, fixation and jitter timing between configurations. """
+
+    def __init__(self, blank = CBLANKTIME, fixation = CFIXATIONTIME,
+                 blank_jitter = CBLANKJITTER, fixation_jitter = CFIXATIONJITTER):
+        self.blank = blank
+        self.fixation = fixation
+        self.blank_jitter = blank_jitter
+        self.fixation_jitter = fixation_jitter
+        self.rng = random.Random()
+
+    #.................... Method: start ................
+    # This method starts the timing of a new game
+    # It is passed seed = the game's seed, so the jitter can be repeated
+    #
+    def start(self, seed):
+        self.rng.seed(seed)
+
+    # ................. end of method: start .................
+
+    #.................... Method: plan ................
+    # This method works out when the fixation frame and the next
+    # configuration are due after the LEDs are blanked.
+    # It is passed now = the time (ns) the blank starts
+    # It returns (fixation_at, show_at) in ns, fixation_at being None if no
+    # fixation frame is shown.
+    #
+    def plan(self, now):
+        blank = self.blank
+        if self.blank_jitter > 0:
+            blank = blank + self.rng.uniform(0, self.blank_jitter)
+        fixation_at = None
+        show_at = now + int(blank * CNS_PER_SECOND)
+        if self.fixation > 0:
+            fixation = self.fixation
+            if self.fixation_jitter > 0:
+                fixation = fixation + self.rng.uniform(0, self.fixation_jitter)
+            fixation_at = show_at
+            show_at = fixation_at + int(fixation * CNS_PER_SECOND)
+        return fixation_at, show_at
+
+    # ................. end of method: plan .................
+
+    #.................... Method: interval ................
+    # This method returns the average seconds from the blank starting to the
+    # configuration being shown
+    #
+    def interval(self):
+        interval = self.blank + 0.5 * self.blank_jitter
+        if self.fixation > 0:
+            interval = interval + self.fixation + 0.5 * self.fixation_jitter
+        return interval
+
+    # ................. end of method: interval .................
+
+#=================================================================
+
+#.................... Function: load_schedule ................
+# This function returns a TrialScheduler with the timing given in a file, or
+# the default timing if there is no file
+#
+def load_schedule(filename = CTIMINGFILE):
+    if not os.path.exists(filename):
+        return TrialScheduler()
+    with open(filename) as file:
+        timing = json.load(file)
+    return TrialScheduler(timing.get("blank", CBLANKTIME), timing.get("fixation", CFIXATIONTIME),
+                          timing.get("blank_jitter", CBLANKJITTER),
+                          timing.get("fixation_jitter", CFIXATIONJITTER))
+
+# ..................... end of function : load_schedule .........